@@ -5,7 +5,7 @@ from app.api.routes import (
     connections, messages, documents, support,
     notifications, admin, superadmin, universities, lead_intelligence,
     knowledge_base, ads, career_roadmap, course_intelligence, heatmap,
-    fundraiser
+    fundraiser, uploads, realtime
 )
 
 # Create main API router
@@ -20,8 +20,10 @@ api_router.include_router(groups.router, prefix="/groups", tags=["Groups"])
 api_router.include_router(connections.router, prefix="/connections", tags=["Connections"])
 api_router.include_router(messages.router, prefix="/messages", tags=["Messages"])
 api_router.include_router(documents.router, prefix="/documents", tags=["Documents"])
+api_router.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
 api_router.include_router(support.router, prefix="/support", tags=["Support"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
+api_router.include_router(realtime.router, prefix="/realtime", tags=["Realtime"])
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
 api_router.include_router(superadmin.router, prefix="/superadmin", tags=["Super Admin"])
 api_router.include_router(lead_intelligence.router, prefix="/lead-intelligence", tags=["Lead Intelligence"])
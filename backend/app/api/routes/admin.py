@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
 
 from app.core.database import get_db
-from app.core.security import get_current_active_user, get_password_hash
+from app.core.security import get_current_active_user, hash_password_async
 from app.models.user import User, UserRole, UserProfile
 from app.models.university import University
 from app.services.email_service import EmailService
+from app.services.alumni_import import ImportRow, import_alumni, save_upload, start_import_job, IMPORT_WORKER_ID
+from app.models.import_job import AlumniImportJob
 from app.models.event import Event
 from app.models.group import Group
 from app.models.document import DocumentRequest, DocumentStatus
@@ -20,7 +23,7 @@ from app.models.ad import Ad
 from app.models.notification import Notification, NotificationType
 from app.schemas.admin import (
     AdminDashboardStats, AlumniUserCreate, AlumniUserResponse,
-    AlumniUserListResponse, BulkImportResponse, PasswordResetRequest,
+    AlumniUserListResponse, BulkImportResponse, ImportJobResponse, PasswordResetRequest,
     PasswordResetListResponse, AdminTicketResponse, AdminTicketListResponse,
     AdminTicketDetailResponse, TicketResponseItem,
     AdminDocumentRequestResponse, AdminDocumentListResponse,
@@ -219,7 +222,7 @@ async def create_user(
         user = User(
             email=user_data.email,
             username=username,  # Set username for database compatibility
-            hashed_password=get_password_hash(user_data.password),
+            hashed_password=await hash_password_async(user_data.password),
             name=user_data.name,
             university_id=current_user.university_id,
             graduation_year=user_data.graduation_year,
@@ -243,11 +246,11 @@ async def create_user(
         university = db.query(University).filter(University.id == current_user.university_id).first()
         university_name = university.name if university else None
         
-        # Send welcome email using university-specific SMTP settings (or global fallback)
+        # Queue welcome email using university-specific sender settings (or global fallback)
         # Wrap in try-except to ensure email failure doesn't break user creation
         try:
             # Use university-specific email service if configured, otherwise use global
-            uni_email_service = EmailService.from_university(university) if university else EmailService()
+            uni_email_service = EmailService.from_university(university, db=db)
             
             if uni_email_service.enabled:
                 uni_email_service.send_welcome_email(
@@ -256,11 +259,13 @@ async def create_user(
                     password=user_data.password,  # Send plain password for initial login
                     university_name=university_name
                 )
-                logger.info(f"Welcome email sent to {user.email}")
+                db.commit()
+                logger.info(f"Welcome email queued for {user.email}")
             else:
                 logger.warning(f"Email service not enabled. SMTP not configured. Email not sent to {user.email}")
         except Exception as e:
             # Log error but don't fail user creation if email fails
+            db.rollback()
             import traceback
             error_trace = traceback.format_exc()
             logger.error(f"Failed to send welcome email to {user.email}: {str(e)}\n{error_trace}")
@@ -301,73 +306,77 @@ async def bulk_import_users(
 ):
     """
     Bulk import alumni users with welcome emails.
+    Emails are queued with each user and sent by the email dispatcher.
+    For large imports use the CSV endpoint, which runs in the background.
     """
-    success_count = 0
-    failed_count = 0
-    errors = []
+    rows = [ImportRow(row_number=None, data=user_data.model_dump()) for user_data in users]
+    result = await run_in_threadpool(import_alumni, db, rows, current_user.university_id)
     
-    # Get university for email
-    university = db.query(University).filter(University.id == current_user.university_id).first()
-    university_name = university.name if university else None
+    return BulkImportResponse(
+        success_count=result.success_count,
+        failed_count=result.failed_count,
+        errors=result.errors
+    )
+
+
+@router.post("/users/bulk-import/csv", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_import_users_csv(
+    file: UploadFile = File(...),
+    send_emails: bool = Query(True, description="Queue welcome emails with the credentials"),
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Start a background import of alumni from a CSV file.
+    Columns: email, password, name, graduation_year (optional), major (optional).
+    Poll /users/bulk-import/jobs/{job_id} for progress and per-row errors.
+    """
+    if not file.filename or not file.filename.lower().endswith('.csv'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File must be a .csv file"
+        )
     
-    for user_data in users:
-        try:
-            existing = db.query(User).filter(User.email == user_data.email).first()
-            if existing:
-                failed_count += 1
-                errors.append(f"{user_data.email}: Already exists")
-                continue
-            
-            # Generate username from email
-            username = user_data.email.split('@')[0] if user_data.email else None
-            
-            user = User(
-                email=user_data.email,
-                username=username,
-                hashed_password=get_password_hash(user_data.password),
-                name=user_data.name,
-                university_id=current_user.university_id,
-                graduation_year=user_data.graduation_year,
-                major=user_data.major,
-                role=UserRole.ALUMNI
-            )
-            
-            # Add both user and profile before committing to ensure atomicity
-            db.add(user)
-            db.flush()  # Flush to get user.id without committing
-            
-            profile = UserProfile(user_id=user.id)
-            db.add(profile)
-            
-            # Commit both user and profile together
-            db.commit()
-            
-            # Send welcome email with credentials
-            try:
-                uni_email_service = EmailService.from_university(university) if university else EmailService()
-                if uni_email_service.enabled:
-                    uni_email_service.send_welcome_email(
-                        to_email=user.email,
-                        user_name=user.name,
-                        password=user_data.password,  # Send plain password
-                        university_name=university_name
-                    )
-                    logger.info(f"Welcome email sent to {user.email}")
-            except Exception as e:
-                logger.error(f"Failed to send welcome email to {user.email}: {str(e)}")
-                # Don't fail the import if email fails
-            
-            success_count += 1
-        except Exception as e:
-            db.rollback()  # Rollback on any failure to prevent orphaned records
-            failed_count += 1
-            errors.append(f"{user_data.email}: {str(e)}")
+    path = await run_in_threadpool(save_upload, file.file)
     
-    return BulkImportResponse(
-        success_count=success_count,
-        failed_count=failed_count,
-        errors=errors
+    job = AlumniImportJob(
+        university_id=current_user.university_id,
+        created_by=current_user.id,
+        filename=file.filename,
+        owner=IMPORT_WORKER_ID,
+        heartbeat_at=datetime.now(timezone.utc)
     )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    start_import_job(job.id, path, send_emails)
+    logger.info(f"Alumni import job {job.id} queued by {current_user.id} ({file.filename})")
+    
+    return ImportJobResponse.model_validate(job)
+
+
+@router.get("/users/bulk-import/jobs/{job_id}", response_model=ImportJobResponse)
+async def get_bulk_import_job(
+    job_id: str,
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the status and progress of a CSV import job.
+    """
+    job = db.query(AlumniImportJob).filter(
+        AlumniImportJob.id == job_id,
+        AlumniImportJob.university_id == current_user.university_id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    
+    return ImportJobResponse.model_validate(job)
 
 
 @router.delete("/users/{user_id}")
@@ -480,7 +489,7 @@ async def reset_user_password(
             detail="User not found"
         )
     
-    user.hashed_password = get_password_hash(password_data.new_password)
+    user.hashed_password = await hash_password_async(password_data.new_password)
     user.password_reset_requested = False
     user.password_reset_requested_at = None
     db.commit()
@@ -11,6 +11,7 @@ from app.core.database import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User
 from app.models.ad import Ad
+from app.services.ad_counters import record_ad_event
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -149,7 +150,7 @@ async def record_impression(
     Record an ad impression (view).
     Called when an ad is displayed to a user.
     """
-    ad = db.query(Ad).filter(Ad.id == ad_id).first()
+    ad = db.query(Ad.id).filter(Ad.id == ad_id).first()
     
     if not ad:
         raise HTTPException(
@@ -157,8 +158,8 @@ async def record_impression(
             detail="Ad not found"
         )
     
-    ad.impressions = (ad.impressions or 0) + 1
-    db.commit()
+    # Buffered and applied in batches (app.services.ad_counters)
+    record_ad_event(db, ad_id, "impressions")
     
     return {"success": True}
 
@@ -173,7 +174,7 @@ async def record_click(
     Record an ad click.
     Called when a user clicks on an ad.
     """
-    ad = db.query(Ad).filter(Ad.id == ad_id).first()
+    ad = db.query(Ad.id).filter(Ad.id == ad_id).first()
     
     if not ad:
         raise HTTPException(
@@ -181,8 +182,8 @@ async def record_click(
             detail="Ad not found"
         )
     
-    ad.clicks = (ad.clicks or 0) + 1
-    db.commit()
+    # Buffered and applied in batches (app.services.ad_counters)
+    record_ad_event(db, ad_id, "clicks")
     
     return {"success": True}
 
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 import json
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_active_user
+    verify_password_async, hash_password_async, password_needs_rehash,
+    create_access_token, get_current_active_user_async
 )
 from app.models.user import User, UserRole, UserProfile
 from app.models.university import University
@@ -60,13 +61,13 @@ def get_university_branding(university: University) -> UniversityBrandingRespons
 @router.post("/register", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Register a new user (alumni).
     """
     # Check if email already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email).limit(1))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,7 +77,7 @@ async def register(
     # Verify university exists if provided
     university = None
     if user_data.university_id:
-        university = db.query(University).filter(University.id == user_data.university_id).first()
+        university = await db.scalar(select(University).where(University.id == user_data.university_id).limit(1))
         if not university:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,7 +96,7 @@ async def register(
     user = User(
         email=user_data.email,
         username=username,  # Set username for database compatibility
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         name=user_data.name,
         university_id=user_data.university_id,
         graduation_year=user_data.graduation_year,
@@ -104,13 +105,13 @@ async def register(
     )
     
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # Create profile
     profile = UserProfile(user_id=user.id)
     db.add(profile)
-    db.commit()
+    await db.commit()
     
     # Generate token
     access_token = create_access_token(data={"sub": user.id})
@@ -142,7 +143,7 @@ async def register(
 @router.post("/login", response_model=Token)
 async def login(
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login and get access token.
@@ -152,15 +153,20 @@ async def login(
     - For Super Admin: list of all universities to manage/switch between
     - force_password_reset: true if user must change password on first login
     """
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await db.scalar(select(User).where(User.email == login_data.email).limit(1))
     
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade the hash if the configured bcrypt cost has changed
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = await hash_password_async(login_data.password)
+        await db.commit()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -181,12 +187,12 @@ async def login(
     
     if user.role == UserRole.SUPERADMIN:
         # Super Admin gets list of all universities
-        all_universities = db.query(University).all()
+        all_universities = (await db.scalars(select(University))).all()
         universities_list = [get_university_branding(uni) for uni in all_universities]
     else:
         # Alumni and Admin get their university branding
         if user.university_id:
-            university = db.query(University).filter(University.id == user.university_id).first()
+            university = await db.scalar(select(University).where(University.id == user.university_id).limit(1))
             
             if university and not university.is_enabled:
                 raise HTTPException(
@@ -227,8 +233,8 @@ async def login(
 @router.post("/force-password-change", response_model=ForcePasswordChangeResponse)
 async def force_password_change(
     password_data: ForcePasswordChangeRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Change password for users who are required to change password on first login.
@@ -247,12 +253,12 @@ async def force_password_change(
         )
     
     # Update password
-    current_user.hashed_password = get_password_hash(password_data.new_password)
+    current_user.hashed_password = await hash_password_async(password_data.new_password)
     current_user.force_password_reset = False
     current_user.temp_password_expires_at = None
     current_user.last_password_change = datetime.utcnow()
     
-    db.commit()
+    await db.commit()
     
     # Generate new token
     access_token = create_access_token(data={"sub": current_user.id})
@@ -266,19 +272,19 @@ async def force_password_change(
 
 @router.get("/me", response_model=UserWithProfileResponse)
 async def get_current_user_info(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get current user information with profile and university branding.
     """
-    profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id).limit(1))
     
     university_name = None
     university_branding = None
     
     if current_user.university_id:
-        university = db.query(University).filter(University.id == current_user.university_id).first()
+        university = await db.scalar(select(University).where(University.id == current_user.university_id).limit(1))
         if university:
             university_name = university.name
             university_branding = get_university_branding(university)
@@ -322,13 +328,13 @@ async def get_current_user_info(
 
 @router.get("/universities")
 async def get_available_universities(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get list of available universities for registration.
     Only returns enabled universities.
     """
-    universities = db.query(University).filter(University.is_enabled == True).all()
+    universities = (await db.scalars(select(University).where(University.is_enabled == True))).all()
     
     return [
         {
@@ -343,14 +349,14 @@ async def get_available_universities(
 @router.post("/request-password-reset", response_model=PasswordResetResponse)
 async def request_password_reset(
     request_data: PasswordResetRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Request a password reset.
     - Alumni requests go to their University Admin
     - Admin requests go to Super Admin
     """
-    user = db.query(User).filter(User.email == request_data.email).first()
+    user = await db.scalar(select(User).where(User.email == request_data.email).limit(1))
     
     if not user:
         # Don't reveal if email exists
@@ -362,7 +368,7 @@ async def request_password_reset(
     # Mark password reset as requested
     user.password_reset_requested = True
     user.password_reset_requested_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Different messages based on role
     if user.role == UserRole.ADMIN:
@@ -372,7 +378,7 @@ async def request_password_reset(
     else:
         university_name = "your university"
         if user.university_id:
-            university = db.query(University).filter(University.id == user.university_id).first()
+            university = await db.scalar(select(University).where(University.id == user.university_id).limit(1))
             if university:
                 university_name = university.name
         message = f"Password reset request sent to {university_name} administrator."
@@ -393,8 +399,8 @@ async def logout():
 
 @router.post("/refresh-branding")
 async def refresh_branding(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Refresh university branding for the current user.
@@ -402,7 +408,7 @@ async def refresh_branding(
     """
     if current_user.role == UserRole.SUPERADMIN:
         # Return all universities for superadmin
-        all_universities = db.query(University).all()
+        all_universities = (await db.scalars(select(University))).all()
         return {
             "universities": [get_university_branding(uni) for uni in all_universities]
         }
@@ -410,7 +416,7 @@ async def refresh_branding(
     if not current_user.university_id:
         return {"university": None}
     
-    university = db.query(University).filter(University.id == current_user.university_id).first()
+    university = await db.scalar(select(University).where(University.id == current_user.university_id).limit(1))
     
     if not university:
         return {"university": None}
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from sqlalchemy import select, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 from datetime import datetime
 
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.database import get_async_db
+from app.core.security import get_current_active_user_async
 from app.models.user import User, UserProfile
 from app.models.connection import Connection, ConnectionRequest, ConnectionStatus
 from app.models.university import University
@@ -20,24 +20,24 @@ router = APIRouter()
 @router.get("/", response_model=ConnectionListResponse)
 async def list_connections(
     search: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List all connections for the current user.
     """
-    connections = db.query(Connection).filter(
+    connections = (await db.scalars(select(Connection).where(
         or_(
             Connection.user_id == current_user.id,
             Connection.connected_user_id == current_user.id
         )
-    ).all()
+    ))).all()
     
     connection_responses = []
     for conn in connections:
         # Get the other user in the connection
         other_user_id = conn.connected_user_id if conn.user_id == current_user.id else conn.user_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
+        other_user = await db.scalar(select(User).where(User.id == other_user_id).limit(1))
         
         if not other_user:
             continue
@@ -50,12 +50,12 @@ async def list_connections(
                 continue
         
         # Get profile info
-        profile = db.query(UserProfile).filter(UserProfile.user_id == other_user.id).first()
+        profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == other_user.id).limit(1))
         
         # Get university name
         university_name = "Unknown"
         if other_user.university_id:
-            university = db.query(University).filter(University.id == other_user.university_id).first()
+            university = await db.scalar(select(University).where(University.id == other_user.university_id).limit(1))
             if university:
                 university_name = university.name
         
@@ -83,14 +83,14 @@ async def list_connections(
 @router.post("/request", status_code=status.HTTP_201_CREATED)
 async def send_connection_request(
     request_data: ConnectionRequestCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a connection request to another user.
     """
     # Check if target user exists
-    target_user = db.query(User).filter(User.id == request_data.to_user_id).first()
+    target_user = await db.scalar(select(User).where(User.id == request_data.to_user_id).limit(1))
     if not target_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -98,12 +98,12 @@ async def send_connection_request(
         )
     
     # Check if already connected
-    existing_connection = db.query(Connection).filter(
+    existing_connection = await db.scalar(select(Connection).where(
         or_(
             and_(Connection.user_id == current_user.id, Connection.connected_user_id == request_data.to_user_id),
             and_(Connection.user_id == request_data.to_user_id, Connection.connected_user_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if existing_connection:
         raise HTTPException(
@@ -112,13 +112,13 @@ async def send_connection_request(
         )
     
     # Check if request already exists
-    existing_request = db.query(ConnectionRequest).filter(
+    existing_request = await db.scalar(select(ConnectionRequest).where(
         or_(
             and_(ConnectionRequest.from_user_id == current_user.id, ConnectionRequest.to_user_id == request_data.to_user_id),
             and_(ConnectionRequest.from_user_id == request_data.to_user_id, ConnectionRequest.to_user_id == current_user.id)
         ),
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).first()
+    ).limit(1))
     
     if existing_request:
         raise HTTPException(
@@ -133,8 +133,8 @@ async def send_connection_request(
     )
     
     db.add(connection_request)
-    db.commit()
-    db.refresh(connection_request)
+    await db.commit()
+    await db.refresh(connection_request)
     
     # Create notification for the target user
     from app.models.notification import Notification, NotificationType
@@ -149,7 +149,7 @@ async def send_connection_request(
         related_id=connection_request.id
     )
     db.add(notification)
-    db.commit()
+    await db.commit()
     
     return {
         "message": f"Connection request sent to {target_user.name}",
@@ -160,26 +160,26 @@ async def send_connection_request(
 
 @router.get("/requests/received", response_model=List[ConnectionRequestResponse])
 async def get_received_requests(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get connection requests received by the current user.
     """
-    requests = db.query(ConnectionRequest).filter(
+    requests = (await db.scalars(select(ConnectionRequest).where(
         ConnectionRequest.to_user_id == current_user.id,
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).all()
+    ))).all()
     
     responses = []
     for req in requests:
-        from_user = db.query(User).filter(User.id == req.from_user_id).first()
+        from_user = await db.scalar(select(User).where(User.id == req.from_user_id).limit(1))
         if not from_user:
             continue
         
         university_name = None
         if from_user.university_id:
-            university = db.query(University).filter(University.id == from_user.university_id).first()
+            university = await db.scalar(select(University).where(University.id == from_user.university_id).limit(1))
             if university:
                 university_name = university.name
         
@@ -202,20 +202,20 @@ async def get_received_requests(
 
 @router.get("/requests/sent", response_model=List[ConnectionRequestResponse])
 async def get_sent_requests(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get connection requests sent by the current user.
     """
-    requests = db.query(ConnectionRequest).filter(
+    requests = (await db.scalars(select(ConnectionRequest).where(
         ConnectionRequest.from_user_id == current_user.id,
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).all()
+    ))).all()
     
     responses = []
     for req in requests:
-        to_user = db.query(User).filter(User.id == req.to_user_id).first()
+        to_user = await db.scalar(select(User).where(User.id == req.to_user_id).limit(1))
         if not to_user:
             continue
         
@@ -239,17 +239,17 @@ async def get_sent_requests(
 @router.put("/requests/{request_id}/accept")
 async def accept_connection_request(
     request_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Accept a connection request.
     """
-    connection_request = db.query(ConnectionRequest).filter(
+    connection_request = await db.scalar(select(ConnectionRequest).where(
         ConnectionRequest.id == request_id,
         ConnectionRequest.to_user_id == current_user.id,
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).first()
+    ).limit(1))
     
     if not connection_request:
         raise HTTPException(
@@ -269,15 +269,15 @@ async def accept_connection_request(
     db.add(connection)
     
     # Update user profiles' connection counts
-    from_profile = db.query(UserProfile).filter(UserProfile.user_id == connection_request.from_user_id).first()
+    from_profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == connection_request.from_user_id).limit(1))
     if from_profile:
         from_profile.connections_count += 1
     
-    to_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    to_profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id).limit(1))
     if to_profile:
         to_profile.connections_count += 1
     
-    from_user = db.query(User).filter(User.id == connection_request.from_user_id).first()
+    from_user = await db.scalar(select(User).where(User.id == connection_request.from_user_id).limit(1))
     
     # Create notification for the requester that their request was accepted
     from app.models.notification import Notification, NotificationType
@@ -293,7 +293,7 @@ async def accept_connection_request(
     )
     db.add(notification)
     
-    db.commit()
+    await db.commit()
     
     return {
         "message": f"You are now connected with {from_user.name if from_user else 'user'}",
@@ -304,17 +304,17 @@ async def accept_connection_request(
 @router.put("/requests/{request_id}/reject")
 async def reject_connection_request(
     request_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Reject a connection request.
     """
-    connection_request = db.query(ConnectionRequest).filter(
+    connection_request = await db.scalar(select(ConnectionRequest).where(
         ConnectionRequest.id == request_id,
         ConnectionRequest.to_user_id == current_user.id,
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).first()
+    ).limit(1))
     
     if not connection_request:
         raise HTTPException(
@@ -323,7 +323,7 @@ async def reject_connection_request(
         )
     
     connection_request.status = ConnectionStatus.REJECTED
-    db.commit()
+    await db.commit()
     
     return {"message": "Connection request rejected", "success": True}
 
@@ -331,19 +331,19 @@ async def reject_connection_request(
 @router.delete("/{connection_id}")
 async def remove_connection(
     connection_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Remove a connection.
     """
-    connection = db.query(Connection).filter(
+    connection = await db.scalar(select(Connection).where(
         Connection.id == connection_id,
         or_(
             Connection.user_id == current_user.id,
             Connection.connected_user_id == current_user.id
         )
-    ).first()
+    ).limit(1))
     
     if not connection:
         raise HTTPException(
@@ -355,16 +355,16 @@ async def remove_connection(
     other_user_id = connection.connected_user_id if connection.user_id == current_user.id else connection.user_id
     
     # Update connection counts
-    current_profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+    current_profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id).limit(1))
     if current_profile:
         current_profile.connections_count = max(0, current_profile.connections_count - 1)
     
-    other_profile = db.query(UserProfile).filter(UserProfile.user_id == other_user_id).first()
+    other_profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == other_user_id).limit(1))
     if other_profile:
         other_profile.connections_count = max(0, other_profile.connections_count - 1)
     
-    db.delete(connection)
-    db.commit()
+    await db.delete(connection)
+    await db.commit()
     
     return {"message": "Connection removed", "success": True}
 
@@ -372,28 +372,28 @@ async def remove_connection(
 @router.get("/check/{user_id}")
 async def check_connection_status(
     user_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Check connection status with a user.
     """
     # Check if connected
-    is_connected = db.query(Connection).filter(
+    is_connected = await db.scalar(select(Connection).where(
         or_(
             and_(Connection.user_id == current_user.id, Connection.connected_user_id == user_id),
             and_(Connection.user_id == user_id, Connection.connected_user_id == current_user.id)
         )
-    ).first() is not None
+    ).limit(1)) is not None
     
     # Check for pending request
-    pending_request = db.query(ConnectionRequest).filter(
+    pending_request = await db.scalar(select(ConnectionRequest).where(
         or_(
             and_(ConnectionRequest.from_user_id == current_user.id, ConnectionRequest.to_user_id == user_id),
             and_(ConnectionRequest.from_user_id == user_id, ConnectionRequest.to_user_id == current_user.id)
         ),
         ConnectionRequest.status == ConnectionStatus.PENDING
-    ).first()
+    ).limit(1))
     
     has_pending = pending_request is not None
     is_sender = pending_request.from_user_id == current_user.id if pending_request else False
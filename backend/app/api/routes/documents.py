@@ -16,6 +16,9 @@ from app.core.logging import logger
 
 router = APIRouter()
 
+# Allowed document extensions (also used by presigned direct uploads)
+ALLOWED_DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.txt', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.zip', '.rar', '.7z']
+
 
 @router.post("/upload", response_model=dict)
 async def upload_document_file(
@@ -36,14 +39,12 @@ async def upload_document_file(
             detail="File must have a filename"
         )
     
-    # Allowed document extensions
-    allowed_extensions = ['.pdf', '.doc', '.docx', '.txt', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.zip', '.rar', '.7z']
     file_ext = '.' + file.filename.rsplit('.', 1)[-1].lower() if '.' in file.filename else ''
     
-    if file_ext not in allowed_extensions:
+    if file_ext not in ALLOWED_DOCUMENT_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File type not allowed. Allowed types: {', '.join(allowed_extensions)}"
+            detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_DOCUMENT_EXTENSIONS)}"
         )
     
     # Check if S3 is configured
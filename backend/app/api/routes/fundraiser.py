@@ -8,8 +8,7 @@ Provides endpoints for:
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func, distinct
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, date, timedelta
 import logging
 import re
@@ -19,6 +18,10 @@ from app.core.database import get_db
 from app.core.security import get_current_active_user
 from app.models.user import User, UserRole
 from app.models.fundraiser import Fundraiser, FundraiserClick, FundraiserStatus
+from app.services.fundraiser_analytics import (
+    record_click, backfill_fundraiser_click_daily, get_click_stats,
+    get_daily_clicks, get_university_click_totals
+)
 from app.schemas.admin import (
     FundraiserCreate, FundraiserUpdate, FundraiserResponse,
     FundraiserListResponse, FundraiserClickCreate, FundraiserClickResponse,
@@ -53,21 +56,12 @@ def validate_url(url: str) -> bool:
 
 def get_fundraiser_stats(db: Session, fundraiser_id: str) -> tuple:
     """Get total and unique click counts for a fundraiser."""
-    total_clicks = db.query(FundraiserClick).filter(
-        FundraiserClick.fundraiser_id == fundraiser_id
-    ).count()
-    
-    unique_clicks = db.query(distinct(FundraiserClick.user_id)).filter(
-        FundraiserClick.fundraiser_id == fundraiser_id,
-        FundraiserClick.user_id.isnot(None)
-    ).count()
-    
-    return total_clicks, unique_clicks
+    return get_click_stats(db, [fundraiser_id])[fundraiser_id]
 
 
-def fundraiser_to_response(db: Session, fundraiser: Fundraiser) -> FundraiserResponse:
-    """Convert a Fundraiser model to FundraiserResponse."""
-    total_clicks, unique_clicks = get_fundraiser_stats(db, fundraiser.id)
+def fundraiser_to_response(db: Session, fundraiser: Fundraiser, stats: Optional[Tuple[int, int]] = None) -> FundraiserResponse:
+    """Convert a Fundraiser model to FundraiserResponse (pass stats from get_click_stats when converting a list)."""
+    total_clicks, unique_clicks = stats if stats is not None else get_fundraiser_stats(db, fundraiser.id)
     
     return FundraiserResponse(
         id=fundraiser.id,
@@ -115,8 +109,10 @@ async def list_admin_fundraisers(
             (page - 1) * page_size
         ).limit(page_size).all()
         
+        stats = get_click_stats(db, [f.id for f in fundraisers])
+        
         return FundraiserListResponse(
-            fundraisers=[fundraiser_to_response(db, f) for f in fundraisers],
+            fundraisers=[fundraiser_to_response(db, f, stats[f.id]) for f in fundraisers],
             total=total,
             page=page,
             page_size=page_size
@@ -335,16 +331,8 @@ async def get_fundraiser_analytics(
             Fundraiser.university_id == current_user.university_id
         ).all()]
         
-        # Total clicks across all fundraisers
-        total_clicks = db.query(FundraiserClick).filter(
-            FundraiserClick.fundraiser_id.in_(fundraiser_ids)
-        ).count() if fundraiser_ids else 0
-        
-        # Unique alumni who clicked
-        unique_alumni = db.query(distinct(FundraiserClick.user_id)).filter(
-            FundraiserClick.fundraiser_id.in_(fundraiser_ids),
-            FundraiserClick.user_id.isnot(None)
-        ).count() if fundraiser_ids else 0
+        # Total clicks and unique alumni who clicked, across all fundraisers
+        total_clicks, unique_alumni = get_university_click_totals(db, fundraiser_ids)
         
         # Top fundraisers by clicks
         top_fundraisers = []
@@ -352,21 +340,14 @@ async def get_fundraiser_analytics(
             Fundraiser.university_id == current_user.university_id
         ).order_by(Fundraiser.created_at.desc()).limit(5).all()
         
+        # Stats and last 30 days of clicks for all of them at once
+        top_ids = [f.id for f in fundraisers]
+        stats = get_click_stats(db, top_ids)
+        clicks_by_fundraiser = get_daily_clicks(db, top_ids, days=30)
+        
         for f in fundraisers:
-            total, unique = get_fundraiser_stats(db, f.id)
-            
-            # Get clicks by date for last 30 days
-            clicks_by_date = []
-            for i in range(30):
-                day = date.today() - timedelta(days=i)
-                count = db.query(FundraiserClick).filter(
-                    FundraiserClick.fundraiser_id == f.id,
-                    func.date(FundraiserClick.clicked_at) == day
-                ).count()
-                if count > 0:
-                    clicks_by_date.append({"date": day.isoformat(), "clicks": count})
-            
-            clicks_by_date.reverse()
+            total, unique = stats[f.id]
+            clicks_by_date = clicks_by_fundraiser[f.id]
             
             top_fundraisers.append(FundraiserAnalyticsResponse(
                 fundraiser_id=f.id,
@@ -417,16 +398,7 @@ async def get_single_fundraiser_analytics(
         total, unique = get_fundraiser_stats(db, fundraiser_id)
         
         # Get clicks by date for last 30 days
-        clicks_by_date = []
-        for i in range(30):
-            day = date.today() - timedelta(days=i)
-            count = db.query(FundraiserClick).filter(
-                FundraiserClick.fundraiser_id == fundraiser_id,
-                func.date(FundraiserClick.clicked_at) == day
-            ).count()
-            clicks_by_date.append({"date": day.isoformat(), "clicks": count})
-        
-        clicks_by_date.reverse()
+        clicks_by_date = get_daily_clicks(db, [fundraiser_id], days=30, include_empty_days=True)[fundraiser_id]
         
         return FundraiserAnalyticsResponse(
             fundraiser_id=fundraiser_id,
@@ -447,6 +419,34 @@ async def get_single_fundraiser_analytics(
         )
 
 
+@router.post("/admin/analytics/rebuild")
+async def rebuild_fundraiser_analytics(
+    current_user: User = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Rebuild the daily click rollup for this university's fundraisers from the click log.
+    """
+    try:
+        fundraiser_ids = [f.id for f in db.query(Fundraiser.id).filter(
+            Fundraiser.university_id == current_user.university_id
+        ).all()]
+        
+        rows = backfill_fundraiser_click_daily(db, fundraiser_ids) if fundraiser_ids else 0
+        return {
+            "message": f"Rebuilt click analytics for {len(fundraiser_ids)} fundraisers",
+            "rollup_rows": rows
+        }
+    
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error rebuilding fundraiser analytics: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to rebuild analytics: {str(e)}"
+        )
+
+
 # ============ ALUMNI ENDPOINTS ============
 
 @router.get("/active", response_model=List[FundraiserResponse])
@@ -470,7 +470,8 @@ async def list_active_fundraisers(
             Fundraiser.end_date >= today
         ).order_by(Fundraiser.created_at.desc()).all()
         
-        return [fundraiser_to_response(db, f) for f in fundraisers]
+        stats = get_click_stats(db, [f.id for f in fundraisers])
+        return [fundraiser_to_response(db, f, stats[f.id]) for f in fundraisers]
     
     except Exception as e:
         logger.error(f"Error listing active fundraisers: {str(e)}")
@@ -541,6 +542,7 @@ async def track_click(
         )
         
         db.add(click)
+        record_click(db, data.fundraiser_id)
         db.commit()
         db.refresh(click)
         
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
 from typing import Optional, List
@@ -6,8 +6,10 @@ from datetime import datetime
 
 from app.core.database import get_db
 from app.core.security import get_current_active_user
+from app.core.pagination import apply_keyset, fetch_keyset_page
 from app.models.user import User
 from app.models.group import Group, GroupMember, GroupMessage
+from app.services.realtime import realtime_bus
 from app.schemas.group import (
     GroupCreate, GroupUpdate, GroupResponse, GroupListResponse,
     GroupMessageCreate, GroupMessageResponse, GroupMessageSenderResponse
@@ -382,12 +384,16 @@ async def leave_group(
 @router.get("/{group_id}/messages", response_model=List[GroupMessageResponse])
 async def get_group_messages(
     group_id: str,
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Opaque cursor for older messages"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """
     Get messages in a group.
+    Returns the newest `limit` messages (older than `cursor` if given). The cursor
+    for the next older page is returned in the X-Next-Cursor header.
     """
     group = db.query(Group).filter(Group.id == group_id, Group.is_active == True).first()
     
@@ -413,15 +419,24 @@ async def get_group_messages(
     membership.unread_count = 0
     db.commit()
     
-    messages = db.query(GroupMessage).filter(
-        GroupMessage.group_id == group_id
-    ).order_by(GroupMessage.created_at.desc()).limit(limit).all()
+    query = apply_keyset(
+        db.query(GroupMessage).filter(GroupMessage.group_id == group_id),
+        GroupMessage.created_at, GroupMessage.id, cursor
+    )
+    messages, next_cursor = fetch_keyset_page(query, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     
     messages = list(reversed(messages))  # Oldest first
     
+    sender_ids = {msg.sender_id for msg in messages}
+    senders = {
+        user.id: user for user in db.query(User).filter(User.id.in_(sender_ids)).all()
+    } if sender_ids else {}
+    
     message_responses = []
     for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
+        sender = senders.get(msg.sender_id)
         
         message_responses.append(GroupMessageResponse(
             id=msg.id,
@@ -482,14 +497,29 @@ async def send_group_message(
     group.last_message_time = datetime.utcnow()
     
     # Increment unread count for other members
-    db.query(GroupMember).filter(
+    other_members = db.query(GroupMember).filter(
         GroupMember.group_id == group_id,
         GroupMember.user_id != current_user.id
-    ).update({GroupMember.unread_count: GroupMember.unread_count + 1})
+    )
+    other_members.update({GroupMember.unread_count: GroupMember.unread_count + 1})
+    recipient_ids = [user_id for (user_id,) in other_members.with_entities(GroupMember.user_id)]
     
     db.commit()
     db.refresh(message)
     
+    realtime_bus.publish(recipient_ids, {
+        "type": "group_message",
+        "group_id": group_id,
+        "message": {
+            "id": message.id,
+            "content": message.content,
+            "sender_id": current_user.id,
+            "sender": current_user.name,
+            "sender_avatar": current_user.avatar,
+            "created_at": message.created_at.isoformat() if message.created_at else None,
+        }
+    })
+    
     return GroupMessageResponse(
         id=message.id,
         content=message.content,
@@ -14,6 +14,7 @@ Endpoints:
 import os
 import uuid
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Form
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional, List
 from sqlalchemy.orm import Session
@@ -27,11 +28,17 @@ from app.services.knowledge_base import (
     retrieve_relevant_chunks,
     build_context,
     load_all_documents_with_s3,
+    add_s3_document,
+    remove_s3_document,
+    knowledge_base_registry,
     UNIVERSITY_ID,
     UNIVERSITY_NAME,
 )
 from app.core.database import get_db
+from app.core.security import get_optional_user_async
 from app.services.s3_service import S3Service
+from app.services.answer_cache import answer_cache, answer_cache_key
+from app.services.llm_client import get_llm_http_client
 
 logger = logging.getLogger(__name__)
 s3_service = S3Service()
@@ -112,7 +119,7 @@ async def upload_document(file: UploadFile = File(...)):
     - No authentication (assumes trusted admin)
     - Only .txt files accepted
     - File saved to /data/knowledge_base/mit/
-    - Knowledge base reloaded after upload
+    - Only the uploaded document is chunked and indexed
     
     Args:
         file: The .txt file to upload
@@ -235,7 +242,7 @@ async def upload_document_to_s3(
     This endpoint:
     1. Uploads the file to S3 bucket
     2. Stores the S3 URL in the database
-    3. Reloads the knowledge base to include the new document
+    3. Indexes the new document into the knowledge base
     
     Args:
         file: The document file to upload
@@ -305,8 +312,8 @@ async def upload_document_to_s3(
         db.add(kb_doc)
         db.commit()
         
-        # Reload knowledge base to include new document
-        load_all_documents_with_s3(db)
+        # Index the new document from the uploaded bytes (no re-download)
+        add_s3_document(kb_doc, content)
         
         logger.info(f"Uploaded KB document to S3: {title} ({file.filename})")
         
@@ -396,11 +403,13 @@ async def delete_s3_document(doc_id: str, db: Session = Depends(get_db)):
     
     # Delete from database
     doc_title = doc.title
+    doc_filename = doc.filename
+    doc_university_id = doc.university_id
     db.delete(doc)
     db.commit()
     
-    # Reload knowledge base
-    load_all_documents_with_s3(db)
+    # Drop the document from the knowledge base
+    remove_s3_document(doc_filename, doc_university_id)
     
     return {
         "success": True, 
@@ -410,14 +419,24 @@ async def delete_s3_document(doc_id: str, db: Session = Depends(get_db)):
 
 
 @admin_kb_router.post("/reload")
-async def reload_knowledge_base(db: Session = Depends(get_db)):
+async def reload_knowledge_base(university_id: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Reload all knowledge base documents (local + S3).
     
+    Args:
+        university_id: University to reload (default: MIT)
+    
     Returns:
         Reload status with document counts
     """
-    total = load_all_documents_with_s3(db)
+    university_id = university_id or UNIVERSITY_ID
+    kb = knowledge_base_registry.peek(university_id)
+    if kb:
+        total = load_all_documents_with_s3(db, kb=kb)
+    else:
+        # Not in memory yet; loading it reads the latest documents anyway
+        kb = knowledge_base_registry.get(university_id, db)
+        total = len(kb.documents)
     
     return {
         "success": True,
@@ -430,52 +449,61 @@ async def reload_knowledge_base(db: Session = Depends(get_db)):
 # CHAT ENDPOINT
 # ==============================================================================
 
-def generate_answer_with_llm(question: str, context: str) -> str:
+async def request_llm_answer(
+    question: str,
+    context: str,
+    university_id: str = UNIVERSITY_ID,
+    university_name: str = UNIVERSITY_NAME
+) -> Optional[str]:
     """
-    Generate an answer using Groq AI (or fallback to OpenAI).
+    Ask Groq AI (or fallback to OpenAI) for an answer.
     
-    Uses Groq's fast LLM inference with llama models.
-    Falls back to simple response if no API key is set.
+    Uses Groq's fast LLM inference with llama models. Both providers are
+    called through the shared async HTTP client, so the event loop is never
+    blocked and connections are reused across questions.
     
     Args:
         question: User's question
         context: Retrieved context from knowledge base
-        
+        university_id: University the question is about
+        university_name: Display name of that university
+    
     Returns:
-        Generated answer string
+        Generated answer string, or None if no provider is configured or all failed
     """
     from app.core.config import settings
     
     groq_api_key = settings.GROQ_API_KEY or os.getenv("GROQ_API_KEY")
     openai_api_key = settings.OPENAI_API_KEY or os.getenv("OPENAI_API_KEY")
+    short_name = university_id.upper()
     
-    system_prompt = f"""You are a friendly and helpful AI assistant for {UNIVERSITY_NAME} ({UNIVERSITY_ID.upper()}).
+    system_prompt = f"""You are a friendly and helpful AI assistant for {university_name} ({short_name}).
 
 Your role:
-1. For greetings (hi, hello, hey, etc.) - respond warmly and introduce yourself as MIT's AI assistant, offering to help with questions about admissions, academics, campus life, alumni services, etc.
-2. For questions about MIT - answer based on the provided context from MIT documents. Be accurate and cite sources when available.
-3. For general questions - if context is available, use it. If not, politely explain you specialize in MIT-related information and offer to help with MIT topics.
+1. For greetings (hi, hello, hey, etc.) - respond warmly and introduce yourself as {short_name}'s AI assistant, offering to help with questions about admissions, academics, campus life, alumni services, etc.
+2. For questions about {short_name} - answer based on the provided context from {short_name} documents. Be accurate and cite sources when available.
+3. For general questions - if context is available, use it. If not, politely explain you specialize in {short_name}-related information and offer to help with {short_name} topics.
+
+Be conversational, helpful, and concise. Do NOT make up specific facts about {short_name} - only use provided context for {short_name}-specific information."""
 
-Be conversational, helpful, and concise. Do NOT make up specific facts about MIT - only use provided context for MIT-specific information."""
-    
     # Build appropriate user prompt based on whether we have context
     if context and context.strip():
-        user_prompt = f"""Context from MIT knowledge base:
+        user_prompt = f"""Context from {short_name} knowledge base:
 {context}
 
 User message: {question}
 
-Please provide a helpful response. If the user is asking about MIT topics, use the context above. For greetings or general chat, respond naturally."""
+Please provide a helpful response. If the user is asking about {short_name} topics, use the context above. For greetings or general chat, respond naturally."""
     else:
         user_prompt = f"""User message: {question}
 
-No specific MIT documents were found for this query. If this is a greeting, respond warmly and offer to help with MIT-related questions. If it's a question about MIT that you can't answer without documents, let them know you can help with topics like admissions, academics, campus life, and alumni services if they ask about those."""
+No specific {short_name} documents were found for this query. If this is a greeting, respond warmly and offer to help with {short_name}-related questions. If it's a question about {short_name} that you can't answer without documents, let them know you can help with topics like admissions, academics, campus life, and alumni services if they ask about those."""
 
+    http_client = get_llm_http_client()
+    
     # Try Groq first (faster)
     if groq_api_key:
         try:
-            import requests
-            
             headers = {
                 "Authorization": f"Bearer {groq_api_key}",
                 "Content-Type": "application/json"
@@ -491,11 +519,10 @@ No specific MIT documents were found for this query. If this is a greeting, resp
                 "max_tokens": 1000
             }
             
-            response = requests.post(
+            response = await http_client.post(
                 "https://api.groq.com/openai/v1/chat/completions",
                 headers=headers,
-                json=payload,
-                timeout=30
+                json=payload
             )
             
             if response.status_code == 200:
@@ -512,9 +539,9 @@ No specific MIT documents were found for this query. If this is a greeting, resp
         try:
             import openai
             
-            client = openai.OpenAI(api_key=openai_api_key)
+            client = openai.AsyncOpenAI(api_key=openai_api_key, http_client=http_client)
             
-            response = client.chat.completions.create(
+            response = await client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -529,38 +556,82 @@ No specific MIT documents were found for this query. If this is a greeting, resp
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
     
-    # No API key set - return simple response
-    logger.warning("No AI API key set (GROQ_API_KEY or OPENAI_API_KEY). Returning simple response.")
+    if not groq_api_key and not openai_api_key:
+        logger.warning("No AI API key set (GROQ_API_KEY or OPENAI_API_KEY). Returning simple response.")
+    return None
+
+
+def fallback_answer(context: str, university_id: str = UNIVERSITY_ID) -> str:
+    """
+    Simple response used when no LLM answer is available.
+    
+    Args:
+        context: Retrieved context from knowledge base
+        university_id: University the question is about
+    
+    Returns:
+        The context itself, or a note that nothing relevant was found
+    """
+    short_name = university_id.upper()
     
     if not context:
         return (
-            "I don't have any relevant information in the MIT knowledge base "
+            f"I don't have any relevant information in the {short_name} knowledge base "
             "to answer your question. Please make sure documents have been uploaded."
         )
     
     return (
-        f"Based on the MIT knowledge base:\n\n"
+        f"Based on the {short_name} knowledge base:\n\n"
         f"{context}\n\n"
         f"[Note: Set GROQ_API_KEY or OPENAI_API_KEY for AI-generated answers.]"
     )
 
 
+async def generate_answer_with_llm(
+    question: str,
+    context: str,
+    university_id: str = UNIVERSITY_ID,
+    university_name: str = UNIVERSITY_NAME
+) -> str:
+    """
+    Generate an answer using Groq AI (or fallback to OpenAI).
+    Falls back to simple response if no API key is set.
+    
+    Args:
+        question: User's question
+        context: Retrieved context from knowledge base
+        university_id: University the question is about
+        university_name: Display name of that university
+    
+    Returns:
+        Generated answer string
+    """
+    answer = await request_llm_answer(question, context, university_id, university_name)
+    if answer is None:
+        return fallback_answer(context, university_id)
+    return answer
+
+
 @chat_router.post("/query", response_model=ChatQueryResponse)
-async def chat_query(request: ChatQueryRequest):
+async def chat_query(
+    request: ChatQueryRequest,
+    current_user = Depends(get_optional_user_async)
+):
     """
-    Ask a question about MIT and get an AI-generated answer.
+    Ask a question about the caller's university and get an AI-generated answer.
     
     This endpoint:
     1. Takes the user's question
-    2. Retrieves relevant chunks using keyword matching (DUMMY)
-    3. Builds context from retrieved chunks
-    4. Passes context + question to LLM
-    5. Returns the answer with sources
+    2. Picks the knowledge base of the caller's university (MIT for anonymous callers)
+    3. Retrieves relevant chunks (BM25 by default; KB_RETRIEVAL_MODE selects semantic or hybrid)
+    4. Builds context from retrieved chunks
+    5. Passes context + question to LLM, unless the same question was already
+       answered from the same chunks (answer cache, concurrent duplicates coalesced)
+    6. Returns the answer with sources
     
     DUMMY NOTES:
-    - Uses simple keyword matching, not vector search
+    - Semantic mode uses local hashing embeddings unless KB_EMBEDDER picks a model
     - Falls back to simple response if no OpenAI key
-    - Single university (MIT) only
     
     Args:
         request: ChatQueryRequest with the question
@@ -576,8 +647,14 @@ async def chat_query(request: ChatQueryRequest):
     if len(question) > 1000:
         raise HTTPException(status_code=400, detail="Question too long (max 1000 chars)")
     
-    # Retrieve relevant chunks
-    relevant_chunks = retrieve_relevant_chunks(question, top_k=3)
+    # Route to the caller's university; cold tenants are loaded off the event loop
+    university_id = (current_user.university_id if current_user else None) or UNIVERSITY_ID
+    kb = await run_in_threadpool(knowledge_base_registry.get, university_id)
+    
+    # Retrieve relevant chunks. The version is read first, so an upload racing with
+    # this query can only file the answer under the outgoing version.
+    kb_version = kb.version
+    relevant_chunks = retrieve_relevant_chunks(question, top_k=3, kb=kb)
     
     # Build context
     context = build_context(relevant_chunks)
@@ -585,14 +662,22 @@ async def chat_query(request: ChatQueryRequest):
     # Get unique source documents
     sources = list(set(chunk.document_name for chunk in relevant_chunks))
     
-    # Generate answer
-    answer = generate_answer_with_llm(question, context)
+    # Generate answer (cached per question + chunks + KB version; fallbacks are not cached)
+    cache_key = answer_cache_key(
+        question, kb.university_id, kb_version, [chunk.chunk_id for chunk in relevant_chunks]
+    )
+    answer = await answer_cache.get_or_compute(
+        cache_key,
+        lambda: request_llm_answer(question, context, kb.university_id, kb.university_name)
+    )
+    if answer is None:
+        answer = fallback_answer(context, kb.university_id)
     
     return ChatQueryResponse(
         answer=answer,
         sources=sources,
-        university_id=UNIVERSITY_ID,
-        university_name=UNIVERSITY_NAME,
+        university_id=kb.university_id,
+        university_name=kb.university_name,
         context_used=context[:500] + "..." if len(context) > 500 else context,
         is_dummy=True
     )
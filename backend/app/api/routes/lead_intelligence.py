@@ -303,13 +303,14 @@ async def get_leads(
 @router.post("/leads/refresh-scores")
 async def refresh_lead_scores(
     university_id: Optional[str] = Query(None, description="Refresh for specific university"),
+    rebuild: bool = Query(False, description="Recompute score aggregates from the full activity history first"),
     current_user: User = Depends(require_superadmin),
     db: Session = Depends(get_db)
 ):
     """
     Trigger batch update of lead scores.
     """
-    updated_count = batch_update_lead_scores(db, university_id)
+    updated_count = batch_update_lead_scores(db, university_id, rebuild_aggregates=rebuild)
     return {
         "message": f"Successfully updated {updated_count} lead scores",
         "updated_count": updated_count
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, func
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select, or_, and_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.database import get_async_db
+from app.core.security import get_current_active_user_async
+from app.core.pagination import apply_keyset, fetch_keyset_page_async, encode_cursor, decode_cursor
 from app.models.user import User
 from app.models.message import Conversation, Message
 from app.models.connection import Connection
+from app.services.unread_counters import get_unread_counts, record_message_sent, mark_conversation_read
+from app.services.realtime import realtime_bus
 from app.schemas.message import (
     MessageCreate, MessageResponse, ConversationResponse,
     ConversationUserResponse, ConversationMessagesResponse
@@ -22,42 +25,100 @@ class CreateConversationRequest(BaseModel):
     user_id: str
 
 
+def _push_message(conversation: Conversation, message: Message, sender: User):
+    """Push a sent message to the other participant's open connections."""
+    recipient_id = conversation.user2_id if conversation.user1_id == sender.id else conversation.user1_id
+    realtime_bus.publish([recipient_id], {
+        "type": "message",
+        "conversation_id": conversation.id,
+        "message": {
+            "id": message.id,
+            "content": message.content,
+            "sender_id": sender.id,
+            "sender": sender.name,
+            "created_at": message.created_at.isoformat() if message.created_at else None,
+        }
+    })
+
+
+def _inbox_order(last_message_time, conversation_id):
+    return last_message_time.desc().nulls_last(), conversation_id.desc()
+
+
+def _after_inbox_cursor(cursor: str):
+    """Conversations after the cursor in inbox order (conversations without messages come last)."""
+    last_message_time, conversation_id = decode_cursor(cursor)
+    if last_message_time is None:
+        return and_(Conversation.last_message_time.is_(None), Conversation.id < conversation_id)
+    return or_(
+        Conversation.last_message_time < last_message_time,
+        and_(Conversation.last_message_time == last_message_time, Conversation.id < conversation_id),
+        Conversation.last_message_time.is_(None)
+    )
+
+
+def _inbox_side(current_user_id: str, own_column, other_column, unread_column, cursor: Optional[str], limit: Optional[int]):
+    """The user's conversations where they are user1 (or user2), joined to the other participant."""
+    query = select(
+        Conversation.id,
+        Conversation.last_message,
+        Conversation.last_message_time,
+        unread_column.label("unread"),
+        User.id.label("other_id"),
+        User.name.label("other_name"),
+        User.avatar.label("other_avatar")
+    ).join(User, User.id == other_column).where(own_column == current_user_id)
+    if own_column is Conversation.user2_id:
+        # A conversation with oneself is already on the user1 side
+        query = query.where(Conversation.user1_id != current_user_id)
+    
+    if cursor:
+        query = query.where(_after_inbox_cursor(cursor))
+    if limit is not None:
+        # Each side seeks its own (user, last_message_time) index
+        query = query.order_by(*_inbox_order(Conversation.last_message_time, Conversation.id)).limit(limit)
+    return select(query.subquery())
+
+
 @router.get("/conversations", response_model=List[ConversationResponse])
 async def list_conversations(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor for keyset pagination; pass an empty value for the first page"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List all conversations for the current user.
+    List all conversations for the current user, most recent first.
+    One query: both participant sides joined to the other user, with the
+    materialized unread counts. Passing a cursor returns `limit`
+    conversations and the cursor for the next page in the X-Next-Cursor header.
     """
-    conversations = db.query(Conversation).filter(
-        or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
-        )
-    ).order_by(Conversation.last_message_time.desc()).all()
+    page_size = limit + 1 if cursor is not None else None
+    
+    inbox = union_all(
+        _inbox_side(current_user.id, Conversation.user1_id, Conversation.user2_id,
+                    Conversation.user1_unread_count, cursor, page_size),
+        _inbox_side(current_user.id, Conversation.user2_id, Conversation.user1_id,
+                    Conversation.user2_unread_count, cursor, page_size),
+    ).subquery()
+    
+    query = select(inbox).order_by(*_inbox_order(inbox.c.last_message_time, inbox.c.id))
+    if page_size is not None:
+        query = query.limit(page_size)
+    rows = (await db.execute(query)).all()
     
+    if page_size is not None and len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].last_message_time, rows[-1].id)
+    
+    now = datetime.utcnow()
     responses = []
-    for conv in conversations:
-        # Get the other user
-        other_user_id = conv.user2_id if conv.user1_id == current_user.id else conv.user1_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
-        
-        if not other_user:
-            continue
-        
-        # Count unread messages
-        unread_count = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        ).count()
-        
+    for row in rows:
         # Format time
         time_str = None
-        if conv.last_message_time:
-            now = datetime.utcnow()
-            diff = now - conv.last_message_time
+        if row.last_message_time:
+            diff = now - row.last_message_time
             if diff.total_seconds() < 3600:
                 time_str = f"{int(diff.total_seconds() / 60)}m ago"
             elif diff.total_seconds() < 86400:
@@ -66,15 +127,15 @@ async def list_conversations(
                 time_str = f"{diff.days}d ago"
         
         responses.append(ConversationResponse(
-            id=conv.id,
+            id=row.id,
             user=ConversationUserResponse(
-                id=other_user.id,
-                name=other_user.name,
-                avatar=other_user.avatar
+                id=row.other_id,
+                name=row.other_name,
+                avatar=row.other_avatar
             ),
-            last_message=conv.last_message,
+            last_message=row.last_message,
             time=time_str,
-            unread=unread_count,
+            unread=row.unread or 0,
             is_group=False
         ))
     
@@ -83,37 +144,21 @@ async def list_conversations(
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get total unread message count for the current user.
     """
-    # Get all conversations where user is a participant
-    conversations = db.query(Conversation).filter(
-        or_(
-            Conversation.user1_id == current_user.id,
-            Conversation.user2_id == current_user.id
-        )
-    ).all()
-    
-    total_unread = 0
-    for conv in conversations:
-        unread_count = db.query(Message).filter(
-            Message.conversation_id == conv.id,
-            Message.sender_id != current_user.id,
-            Message.is_read == False
-        ).count()
-        total_unread += unread_count
-    
-    return {"count": total_unread}
+    counts = await get_unread_counts(db, current_user.id)
+    return {"count": counts["messages"]}
 
 
 @router.post("/conversations", response_model=ConversationMessagesResponse)
 async def create_or_get_conversation(
     request: CreateConversationRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create or get a conversation with another user.
@@ -121,7 +166,7 @@ async def create_or_get_conversation(
     user_id = request.user_id
     
     # Check if user exists
-    other_user = db.query(User).filter(User.id == user_id).first()
+    other_user = await db.scalar(select(User).where(User.id == user_id).limit(1))
     if not other_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -129,12 +174,12 @@ async def create_or_get_conversation(
         )
     
     # Check if conversation exists
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         or_(
             and_(Conversation.user1_id == current_user.id, Conversation.user2_id == user_id),
             and_(Conversation.user1_id == user_id, Conversation.user2_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         # Create new conversation
@@ -143,21 +188,23 @@ async def create_or_get_conversation(
             user2_id=user_id
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
     
     # Get messages
-    messages = db.query(Message).filter(
+    messages = (await db.scalars(select(Message).where(
         Message.conversation_id == conversation.id
-    ).order_by(Message.created_at.asc()).all()
+    ).order_by(Message.created_at.asc()))).all()
+    
+    # Senders are always one of the two participants
+    participant_names = {current_user.id: current_user.name, other_user.id: other_user.name}
     
     message_responses = []
     for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
         message_responses.append(MessageResponse(
             id=msg.id,
             content=msg.content,
-            sender=sender.name if sender else "Unknown",
+            sender=participant_names.get(msg.sender_id, "Unknown"),
             timestamp=msg.created_at.strftime("%I:%M %p"),
             is_own=msg.sender_id == current_user.id
         ))
@@ -186,14 +233,18 @@ async def create_or_get_conversation(
 @router.get("/conversations/{user_id}", response_model=ConversationMessagesResponse)
 async def get_or_create_conversation(
     user_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor for older messages; pass an empty value for the latest page"),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get or create a conversation with another user.
+    Without a cursor all messages are returned; with a cursor the newest `limit`
+    messages older than it are returned along with next_cursor.
     """
     # Check if user exists
-    other_user = db.query(User).filter(User.id == user_id).first()
+    other_user = await db.scalar(select(User).where(User.id == user_id).limit(1))
     if not other_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -201,12 +252,12 @@ async def get_or_create_conversation(
         )
     
     # Check if conversation exists
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         or_(
             and_(Conversation.user1_id == current_user.id, Conversation.user2_id == user_id),
             and_(Conversation.user1_id == user_id, Conversation.user2_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         # Create new conversation
@@ -215,29 +266,34 @@ async def get_or_create_conversation(
             user2_id=user_id
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
     
     # Get messages
-    messages = db.query(Message).filter(
+    next_cursor = None
+    messages_query = select(Message).where(
         Message.conversation_id == conversation.id
-    ).order_by(Message.created_at.asc()).all()
+    )
+    if cursor is not None:
+        messages_query = apply_keyset(messages_query, Message.created_at, Message.id, cursor)
+        messages, next_cursor = await fetch_keyset_page_async(db, messages_query, limit)
+        messages = list(reversed(messages))  # Oldest first
+    else:
+        messages = (await db.scalars(messages_query.order_by(Message.created_at.asc()))).all()
     
     # Mark messages as read
-    db.query(Message).filter(
-        Message.conversation_id == conversation.id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).update({Message.is_read: True})
-    db.commit()
+    await mark_conversation_read(db, conversation, current_user.id)
+    await db.commit()
+    
+    # Senders are always one of the two participants
+    participant_names = {current_user.id: current_user.name, other_user.id: other_user.name}
     
     message_responses = []
     for msg in messages:
-        sender = db.query(User).filter(User.id == msg.sender_id).first()
         message_responses.append(MessageResponse(
             id=msg.id,
             content=msg.content,
-            sender=sender.name if sender else "Unknown",
+            sender=participant_names.get(msg.sender_id, "Unknown"),
             timestamp=msg.created_at.strftime("%I:%M %p"),
             is_own=msg.sender_id == current_user.id
         ))
@@ -259,7 +315,8 @@ async def get_or_create_conversation(
             unread=0,
             is_group=False
         ),
-        messages=message_responses
+        messages=message_responses,
+        next_cursor=next_cursor
     )
 
 
@@ -267,19 +324,19 @@ async def get_or_create_conversation(
 async def send_message_old(
     conversation_id: str,
     message_data: MessageCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message in a conversation (old endpoint).
     """
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         Conversation.id == conversation_id,
         or_(
             Conversation.user1_id == current_user.id,
             Conversation.user2_id == current_user.id
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         raise HTTPException(
@@ -299,9 +356,11 @@ async def send_message_old(
     # Update conversation
     conversation.last_message = message_data.content
     conversation.last_message_time = datetime.utcnow()
+    await record_message_sent(db, conversation, current_user.id)
     
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
+    _push_message(conversation, message, current_user)
     
     return MessageResponse(
         id=message.id,
@@ -316,19 +375,19 @@ async def send_message_old(
 async def send_message(
     conversation_id: str,
     message_data: MessageCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message in a conversation.
     """
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         Conversation.id == conversation_id,
         or_(
             Conversation.user1_id == current_user.id,
             Conversation.user2_id == current_user.id
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         raise HTTPException(
@@ -348,9 +407,11 @@ async def send_message(
     # Update conversation
     conversation.last_message = message_data.content
     conversation.last_message_time = datetime.utcnow()
+    await record_message_sent(db, conversation, current_user.id)
     
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
+    _push_message(conversation, message, current_user)
     
     return MessageResponse(
         id=message.id,
@@ -364,19 +425,19 @@ async def send_message(
 @router.put("/conversations/{conversation_id}/read")
 async def mark_conversation_as_read(
     conversation_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark all messages in a conversation as read.
     """
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         Conversation.id == conversation_id,
         or_(
             Conversation.user1_id == current_user.id,
             Conversation.user2_id == current_user.id
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         raise HTTPException(
@@ -385,13 +446,9 @@ async def mark_conversation_as_read(
         )
     
     # Mark all messages from the other user as read
-    db.query(Message).filter(
-        Message.conversation_id == conversation_id,
-        Message.sender_id != current_user.id,
-        Message.is_read == False
-    ).update({Message.is_read: True})
+    await mark_conversation_read(db, conversation, current_user.id)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Messages marked as read", "success": True}
 
@@ -400,14 +457,14 @@ async def mark_conversation_as_read(
 async def send_message_to_user(
     user_id: str,
     message_data: MessageCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Send a message to a user (creates conversation if needed).
     """
     # Check if user exists
-    other_user = db.query(User).filter(User.id == user_id).first()
+    other_user = await db.scalar(select(User).where(User.id == user_id).limit(1))
     if not other_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -416,12 +473,12 @@ async def send_message_to_user(
     
     # Check if they are connected
     from app.models.connection import Connection
-    connection = db.query(Connection).filter(
+    connection = await db.scalar(select(Connection).where(
         or_(
             and_(Connection.user_id == current_user.id, Connection.connected_user_id == user_id),
             and_(Connection.user_id == user_id, Connection.connected_user_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if not connection:
         raise HTTPException(
@@ -430,12 +487,12 @@ async def send_message_to_user(
         )
     
     # Get or create conversation
-    conversation = db.query(Conversation).filter(
+    conversation = await db.scalar(select(Conversation).where(
         or_(
             and_(Conversation.user1_id == current_user.id, Conversation.user2_id == user_id),
             and_(Conversation.user1_id == user_id, Conversation.user2_id == current_user.id)
         )
-    ).first()
+    ).limit(1))
     
     if not conversation:
         conversation = Conversation(
@@ -443,8 +500,8 @@ async def send_message_to_user(
             user2_id=user_id
         )
         db.add(conversation)
-        db.commit()
-        db.refresh(conversation)
+        await db.commit()
+        await db.refresh(conversation)
     
     # Create message
     message = Message(
@@ -458,9 +515,11 @@ async def send_message_to_user(
     # Update conversation
     conversation.last_message = message_data.content
     conversation.last_message_time = datetime.utcnow()
+    await record_message_sent(db, conversation, current_user.id)
     
-    db.commit()
-    db.refresh(message)
+    await db.commit()
+    await db.refresh(message)
+    _push_message(conversation, message, current_user)
     
     return MessageResponse(
         id=message.id,
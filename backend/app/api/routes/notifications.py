@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
 
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.database import get_async_db
+from app.core.security import get_current_active_user_async
+from app.core.pagination import apply_keyset, fetch_keyset_page_async
 from app.models.user import User
 from app.models.notification import Notification, NotificationType
+from app.services.unread_counters import get_unread_counts, adjust_notification_unread
 from app.schemas.notification import (
     NotificationResponse, NotificationListResponse
 )
@@ -46,35 +49,39 @@ async def list_notifications(
     unread_only: bool = False,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor for keyset pagination; pass an empty value for the first page"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List notifications for the current user.
+    Passing a cursor switches to keyset pagination (no total count, returns next_cursor).
     """
-    query = db.query(Notification).filter(
+    query = select(Notification).where(
         Notification.user_id == current_user.id
     )
     
     if type_filter:
         try:
             notif_type = NotificationType(type_filter)
-            query = query.filter(Notification.type == notif_type)
+            query = query.where(Notification.type == notif_type)
         except ValueError:
             pass
     
     if unread_only:
-        query = query.filter(Notification.read == False)
+        query = query.where(Notification.read == False)
     
-    query = query.order_by(Notification.created_at.desc())
+    unread_count = (await get_unread_counts(db, current_user.id))["notifications"]
     
-    total = query.count()
-    unread_count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == False
-    ).count()
-    
-    notifications = query.offset((page - 1) * page_size).limit(page_size).all()
+    total = None
+    next_cursor = None
+    if cursor is not None:
+        query = apply_keyset(query, Notification.created_at, Notification.id, cursor)
+        notifications, next_cursor = await fetch_keyset_page_async(db, query, page_size)
+    else:
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        query = query.order_by(Notification.created_at.desc(), Notification.id.desc())
+        notifications = (await db.scalars(query.offset((page - 1) * page_size).limit(page_size))).all()
     
     notification_responses = []
     for notif in notifications:
@@ -96,39 +103,36 @@ async def list_notifications(
         total=total,
         unread_count=unread_count,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/unread-count")
 async def get_unread_count(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get the count of unread notifications.
     """
-    count = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == False
-    ).count()
-    
-    return {"unread_count": count}
+    counts = await get_unread_counts(db, current_user.id)
+    return {"unread_count": counts["notifications"]}
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
 async def get_notification(
     notification_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific notification.
     """
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ).limit(1))
     
     if not notification:
         raise HTTPException(
@@ -153,16 +157,16 @@ async def get_notification(
 @router.put("/{notification_id}/read")
 async def mark_as_read(
     notification_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark a notification as read.
     """
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ).limit(1))
     
     if not notification:
         raise HTTPException(
@@ -171,25 +175,26 @@ async def mark_as_read(
         )
     
     notification.read = True
-    db.commit()
+    await db.commit()
     
     return {"message": "Notification marked as read", "success": True}
 
 
 @router.put("/mark-all-read")
 async def mark_all_as_read(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Mark all notifications as read.
     """
-    db.query(Notification).filter(
+    result = await db.execute(update(Notification).where(
         Notification.user_id == current_user.id,
         Notification.read == False
-    ).update({Notification.read: True})
+    ).values(read=True))
+    await adjust_notification_unread(db, current_user.id, -result.rowcount)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "All notifications marked as read", "success": True}
 
@@ -197,16 +202,16 @@ async def mark_all_as_read(
 @router.delete("/{notification_id}")
 async def delete_notification(
     notification_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a notification.
     """
-    notification = db.query(Notification).filter(
+    notification = await db.scalar(select(Notification).where(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
-    ).first()
+    ).limit(1))
     
     if not notification:
         raise HTTPException(
@@ -214,25 +219,31 @@ async def delete_notification(
             detail="Notification not found"
         )
     
-    db.delete(notification)
-    db.commit()
+    await db.delete(notification)
+    await db.commit()
     
     return {"message": "Notification deleted", "success": True}
 
 
 @router.delete("/")
 async def clear_all_notifications(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Clear all notifications for the current user.
     """
-    db.query(Notification).filter(
+    # Unread ones first, to know how many to take off the counter
+    result = await db.execute(delete(Notification).where(
+        Notification.user_id == current_user.id,
+        Notification.read == False
+    ))
+    await adjust_notification_unread(db, current_user.id, -result.rowcount)
+    await db.execute(delete(Notification).where(
         Notification.user_id == current_user.id
-    ).delete()
+    ))
     
-    db.commit()
+    await db.commit()
     
     return {"message": "All notifications cleared", "success": True}
 
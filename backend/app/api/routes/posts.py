@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Response
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Form, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 from typing import Optional, List
 from datetime import datetime
 import os
+import uuid
 import base64
 
-from app.core.database import get_db
-from app.core.security import get_current_active_user
+from app.core.database import get_async_db
+from app.core.security import get_current_active_user_async
+from app.core.pagination import apply_keyset, fetch_keyset_page_async
 from app.models.user import User, UserProfile, UserRole
 from app.models.post import Post, Comment, Like, PostType
 from app.models.media import Media
+from app.services.media_storage import (
+    get_media_storage, media_storage_key, parse_range_header, RangeNotSatisfiable,
+    MediaStorageNotConfigured, MediaFileMissing
+)
+from app.services.image_derivatives import get_image_sources, image_fields, schedule_image_derivatives
 from app.schemas.post import (
     PostCreate, PostUpdate, PostResponse, PostListResponse,
     CommentCreate, CommentResponse, AuthorResponse
@@ -60,12 +71,12 @@ async def test_posts_endpoint():
 
 @router.get("/test-db")
 async def test_posts_db(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Test endpoint with auth and db"""
     try:
-        post_count = db.query(Post).count()
+        post_count = await db.scalar(select(func.count()).select_from(Post))
         return {
             "message": "Posts router with DB is working!",
             "user_id": current_user.id,
@@ -116,9 +127,9 @@ def format_time(dt: datetime) -> str:
         return dt.strftime("%b %d, %Y")
 
 
-def get_author_response(user: User, db: Session) -> AuthorResponse:
+async def get_author_response(user: User, db: AsyncSession) -> AuthorResponse:
     """Get author response from user."""
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user.id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == user.id).limit(1))
     # Ensure name is not None (required field)
     user_name = user.name if user.name is not None else "Unknown User"
     return AuthorResponse(
@@ -130,6 +141,91 @@ def get_author_response(user: User, db: Session) -> AuthorResponse:
     )
 
 
+async def build_author_map(user_ids, db: AsyncSession) -> dict:
+    """
+    Resolve AuthorResponse objects for many users at once.
+    Loads users and their profiles in a single joined query.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return {}
+    
+    rows = (await db.execute(
+        select(User, UserProfile).outerjoin(
+            UserProfile, UserProfile.user_id == User.id
+        ).where(User.id.in_(user_ids))
+    )).all()
+    
+    authors = {}
+    for user, profile in rows:
+        authors[user.id] = AuthorResponse(
+            id=user.id,
+            name=user.name if user.name is not None else "Unknown User",
+            avatar=user.avatar,
+            title=profile.job_title if profile else None,
+            company=profile.company if profile else None
+        )
+    return authors
+
+
+async def build_post_responses(posts: List[Post], current_user: User, db: AsyncSession) -> List[PostResponse]:
+    """
+    Assemble PostResponse objects for a page of posts.
+    Authors, profiles and the current user's likes are resolved with a fixed
+    number of batched queries instead of one round trip per post.
+    """
+    if not posts:
+        return []
+    
+    authors = await build_author_map((post.author_id for post in posts), db)
+    image_sources = await get_image_sources((post.media_url for post in posts), db)
+    post_ids = [post.id for post in posts]
+    liked_post_ids = set((await db.scalars(
+        select(Like.post_id).where(
+            Like.user_id == current_user.id,
+            Like.post_id.in_(post_ids)
+        )
+    )).all())
+    
+    post_responses = []
+    for post in posts:
+        author = authors.get(post.author_id)
+        if not author:
+            continue
+        
+        try:
+            can_manage = can_manage_post(current_user, post)
+            post_responses.append(PostResponse(
+                id=post.id,
+                author=author,
+                type=post.type.value if post.type else "text",
+                content=post.content if post.content is not None else "",
+                media_url=post.media_url,
+                video_url=post.video_url,
+                **image_fields(post.thumbnail_url, image_sources.get(post.media_url)),
+                tag=post.tag,
+                job_title=post.job_title,
+                company=post.company,
+                location=post.location,
+                likes_count=post.likes_count or 0,
+                comments_count=post.comments_count or 0,
+                shares_count=post.shares_count or 0,
+                is_liked=post.id in liked_post_ids,
+                can_edit=can_manage,
+                can_delete=can_manage,
+                time=format_time(post.created_at),
+                created_at=post.created_at
+            ))
+        except Exception as post_error:
+            print(f"DEBUG: Error creating PostResponse for post {post.id}: {post_error}")
+            import traceback
+            traceback.print_exc()
+            # Skip this post if we can't create response
+            continue
+    
+    return post_responses
+
+
 @router.get("/", response_model=PostListResponse)
 async def list_posts(
     university_id: Optional[str] = None,
@@ -138,91 +234,59 @@ async def list_posts(
     author_id: Optional[str] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor for keyset pagination; pass an empty value for the first page"),
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     List posts with pagination and filtering.
+    - Page mode (default): page/page_size with a total count
+    - Cursor mode (cursor given): seeks past the cursor without counting, returns next_cursor
     """
     try:
         # Start with base query
-        query = db.query(Post).filter(Post.is_active == True)
+        query = select(Post).where(Post.is_active == True)
         
         # Apply university filter
         if university_id:
             # If university_id is explicitly provided, use it
-            query = query.filter(Post.university_id == university_id)
+            query = query.where(Post.university_id == university_id)
         elif current_user.university_id:
             # By default, show posts from user's university (only if user has university_id)
-            query = query.filter(Post.university_id == current_user.university_id)
+            query = query.where(Post.university_id == current_user.university_id)
         # If user has no university_id and no university_id param, show all posts (no filter)
         
         if post_type:
             try:
-                query = query.filter(Post.type == PostType(post_type))
+                query = query.where(Post.type == PostType(post_type))
             except ValueError:
                 pass
         
         if tag:
-            query = query.filter(Post.tag == tag)
+            query = query.where(Post.tag == tag)
         
         if author_id:
-            query = query.filter(Post.author_id == author_id)
+            query = query.where(Post.author_id == author_id)
         
-        query = query.order_by(Post.created_at.desc())
+        if cursor is not None:
+            query = apply_keyset(query, Post.created_at, Post.id, cursor)
+            posts, next_cursor = await fetch_keyset_page_async(db, query, page_size)
+            
+            return PostListResponse(
+                posts=await build_post_responses(posts, current_user, db),
+                total=None,
+                page=page,
+                page_size=page_size,
+                next_cursor=next_cursor
+            )
         
-        total = query.count()
+        total = await db.scalar(select(func.count()).select_from(query.subquery()))
         print(f"DEBUG: Total posts found: {total}")
-        posts = query.offset((page - 1) * page_size).limit(page_size).all()
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+        posts = (await db.scalars(query.offset((page - 1) * page_size).limit(page_size))).all()
         print(f"DEBUG: Posts retrieved: {len(posts)}")
         
-        post_responses = []
-        for post in posts:
-            print(f"DEBUG: Processing post {post.id}")
-            author = db.query(User).filter(User.id == post.author_id).first()
-            if not author:
-                continue
-            
-            # Check if current user liked this post
-            is_liked = db.query(Like).filter(
-                Like.post_id == post.id,
-                Like.user_id == current_user.id
-            ).first() is not None
-            
-            try:
-                # Get post type value safely
-                post_type_value = post.type.value if post.type else "text"
-                
-                # Ensure content is not None (required field)
-                post_content = post.content if post.content is not None else ""
-                
-                post_responses.append(PostResponse(
-                    id=post.id,
-                    author=get_author_response(author, db),
-                    type=post_type_value,
-                    content=post_content,
-                    media_url=post.media_url,
-                    video_url=post.video_url,
-                    thumbnail_url=post.thumbnail_url,
-                    tag=post.tag,
-                    job_title=post.job_title,
-                    company=post.company,
-                    location=post.location,
-                    likes_count=post.likes_count or 0,
-                    comments_count=post.comments_count or 0,
-                    shares_count=post.shares_count or 0,
-                    is_liked=is_liked,
-                    can_edit=can_manage_post(current_user, post),
-                    can_delete=can_manage_post(current_user, post),
-                    time=format_time(post.created_at),
-                    created_at=post.created_at
-                ))
-            except Exception as post_error:
-                print(f"DEBUG: Error creating PostResponse for post {post.id}: {post_error}")
-                import traceback
-                traceback.print_exc()
-                # Skip this post if we can't create response
-                continue
+        post_responses = await build_post_responses(posts, current_user, db)
         
         return PostListResponse(
             posts=post_responses,
@@ -230,6 +294,8 @@ async def list_posts(
             page=page,
             page_size=page_size
         )
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
@@ -244,8 +310,8 @@ async def list_posts(
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
 async def create_post(
     post_data: PostCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Create a new post.
@@ -280,21 +346,23 @@ async def create_post(
         db.add(post)
         
         # Update user's post count
-        profile = db.query(UserProfile).filter(UserProfile.user_id == current_user.id).first()
+        profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == current_user.id).limit(1))
         if profile:
             profile.posts_count += 1
         
-        db.commit()
-        db.refresh(post)
+        await db.commit()
+        await db.refresh(post)
+        
+        image_sources = await get_image_sources([post.media_url], db)
         
         return PostResponse(
             id=post.id,
-            author=get_author_response(current_user, db),
+            author=await get_author_response(current_user, db),
             type=post.type.value,
             content=post.content,
             media_url=post.media_url,
             video_url=post.video_url,
-            thumbnail_url=post.thumbnail_url,
+            **image_fields(post.thumbnail_url, image_sources.get(post.media_url)),
             tag=post.tag,
             job_title=post.job_title,
             company=post.company,
@@ -313,7 +381,7 @@ async def create_post(
     except Exception as e:
         from app.core.logging import logger
         logger.error(f"Error creating post: {str(e)}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating post: {str(e)}"
@@ -324,12 +392,13 @@ async def create_post(
 async def upload_media(
     file: UploadFile = File(...),
     media_type: str = Form(...),  # "image" or "video"
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Upload media file (image or video) to S3 with CloudFront
-    Falls back to database storage if S3 is not configured
+    Falls back to the media storage backend if S3 is not configured
+    Images get resized WebP / JPEG derivatives generated in the background
     """
     from app.core.logging import logger
     from app.services.s3_service import s3_service
@@ -360,6 +429,8 @@ async def upload_media(
             
             if url:
                 logger.info(f"Media uploaded to S3 successfully: {url}")
+                if media_type == "image":
+                    await schedule_image_derivatives(url, file)
                 return {"url": url, "type": media_type}
             else:
                 raise HTTPException(
@@ -373,49 +444,72 @@ async def upload_media(
                 detail=f"Failed to upload media file: {str(e)}"
             )
     
-    # Fallback to database storage if S3 is not configured
-    logger.warning("S3 not configured, falling back to database storage")
+    # Fallback to the media storage backend if S3 is not configured
+    logger.warning("S3 not configured, falling back to media storage backend")
     
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
+    # Size of the spooled upload, without reading it into memory
+    file_size = file.size
+    if file_size is None:
+        file.file.seek(0, os.SEEK_END)
+        file_size = file.file.tell()
+    await file.seek(0)
     
-    # Check file size for DB storage (more restrictive)
+    # Check file size for fallback storage (more restrictive)
     db_max_size = 10 * 1024 * 1024 if media_type == "image" else 50 * 1024 * 1024
     
     if file_size > db_max_size:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Max size: {db_max_size / (1024*1024):.0f}MB (DB storage limit). Configure S3 for larger files."
+            detail=f"File too large. Max size: {db_max_size / (1024*1024):.0f}MB (fallback storage limit). Configure S3 for larger files."
         )
     
-    logger.info(f"Uploading {media_type} to database: {file.filename} ({file_size} bytes) by user {current_user.id}")
+    try:
+        storage = get_media_storage()
+    except MediaStorageNotConfigured as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Media uploads are unavailable: configure S3 or a persistent MEDIA_STORAGE_PATH"
+        )
+    media_id = str(uuid.uuid4())
+    storage_key = media_storage_key(media_id)
+    content_type = file.content_type or 'application/octet-stream'
+    
+    logger.info(f"Uploading {media_type} to {storage.name} media storage: {file.filename} ({file_size} bytes) by user {current_user.id}")
     
     try:
-        # Encode file as base64 for database storage
-        file_data_base64 = base64.b64encode(file_content).decode('utf-8')
+        # Store the raw bytes in the storage backend, streamed from the spool file
+        stored_size, etag = await run_in_threadpool(storage.save, storage_key, file.file, content_type)
         
-        # Store in database
+        # Record where the file lives
         media = Media(
+            id=media_id,
             filename=file.filename,
-            content_type=file.content_type or 'application/octet-stream',
-            file_data=file_data_base64,
-            file_size=file_size
+            content_type=content_type,
+            file_size=stored_size,
+            storage_backend=storage.name,
+            storage_key=storage_key,
+            etag=etag
         )
         db.add(media)
-        db.commit()
-        db.refresh(media)
+        await db.commit()
         
         # Return URL that points to our media endpoint
         base_url = os.getenv("API_BASE_URL", "https://alumni-portal-yw7q.onrender.com")
         url = f"{base_url}/api/v1/feed/posts/media/{media.id}"
         
-        logger.info(f"Media stored in database successfully: {media.id}")
+        logger.info(f"Media stored successfully: {media.id}")
+        if media_type == "image":
+            await schedule_image_derivatives(url, file)
         return {"url": url, "type": media_type}
-        
+    
     except Exception as e:
-        logger.error(f"Error storing media in database: {str(e)}")
-        db.rollback()
+        logger.error(f"Error storing media: {str(e)}")
+        await db.rollback()
+        try:
+            await run_in_threadpool(storage.delete, storage_key)
+        except Exception:
+            pass
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload media file: {str(e)}"
@@ -425,12 +519,21 @@ async def upload_media(
 @router.get("/media/{media_id}")
 async def get_media(
     media_id: str,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Serve media file from database (temporary solution until S3 is configured)
+    Serve a media file uploaded without S3.
+    
+    Supports conditional requests (If-None-Match -> 304) and single byte
+    ranges (Range -> 206), and streams the file in chunks from its storage
+    backend. Legacy rows still holding base64 data are decoded and served
+    the same way until migrate_media.py moves them out.
     """
-    media = db.query(Media).filter(Media.id == media_id).first()
+    # Don't load legacy file_data unless we actually need the bytes
+    media = await db.scalar(
+        select(Media).options(defer(Media.file_data)).where(Media.id == media_id).limit(1)
+    )
     
     if not media:
         raise HTTPException(
@@ -438,16 +541,55 @@ async def get_media(
             detail="Media not found"
         )
     
-    # Decode base64 data
+    # Media content never changes for an ID, so legacy rows can use the ID as ETag
+    etag = media.etag or f'"{media.id}"'
+    headers = {
+        "Content-Disposition": f'inline; filename="{media.filename}"',
+        "Cache-Control": "public, max-age=31536000",
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
     try:
-        file_data = base64.b64decode(media.file_data)
+        byte_range = parse_range_header(request.headers.get("range"), media.file_size)
+    except RangeNotSatisfiable:
         return Response(
-            content=file_data,
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{media.file_size}"}
+        )
+    
+    start, end = byte_range or (0, media.file_size - 1)
+    headers["Content-Length"] = str(end - start + 1)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{media.file_size}"
+    
+    try:
+        if media.file_size == 0:
+            body = iter([b""])  # Nothing to fetch (an S3 range of 0--1 would be invalid)
+        elif media.storage_backend:
+            storage = get_media_storage(media.storage_backend)
+            # Opens the file / object now, so a missing one is a 404 rather than a truncated 200
+            body = await run_in_threadpool(storage.iter_range, media.storage_key, start, end)
+        else:
+            # Legacy base64 row
+            file_data_base64 = await db.scalar(select(Media.file_data).where(Media.id == media_id))
+            file_data = base64.b64decode(file_data_base64)
+            body = iter([file_data[start:end + 1]])
+        
+        return StreamingResponse(
+            body,
+            status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
             media_type=media.content_type,
-            headers={
-                "Content-Disposition": f'inline; filename="{media.filename}"',
-                "Cache-Control": "public, max-age=31536000"
-            }
+            headers=headers
+        )
+    except MediaFileMissing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media file not found"
         )
     except Exception as e:
         raise HTTPException(
@@ -459,13 +601,13 @@ async def get_media(
 @router.get("/{post_id}", response_model=PostResponse)
 async def get_post(
     post_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific post.
     """
-    post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id, Post.is_active == True).limit(1))
     
     if not post:
         raise HTTPException(
@@ -473,26 +615,28 @@ async def get_post(
             detail="Post not found"
         )
     
-    author = db.query(User).filter(User.id == post.author_id).first()
+    author = await db.scalar(select(User).where(User.id == post.author_id).limit(1))
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post author not found"
         )
     
-    is_liked = db.query(Like).filter(
+    is_liked = await db.scalar(select(Like).where(
         Like.post_id == post.id,
         Like.user_id == current_user.id
-    ).first() is not None
+    ).limit(1)) is not None
+    
+    image_sources = await get_image_sources([post.media_url], db)
     
     return PostResponse(
         id=post.id,
-        author=get_author_response(author, db),
+        author=await get_author_response(author, db),
         type=post.type.value,
         content=post.content,
         media_url=post.media_url,
         video_url=post.video_url,
-        thumbnail_url=post.thumbnail_url,
+        **image_fields(post.thumbnail_url, image_sources.get(post.media_url)),
         tag=post.tag,
         job_title=post.job_title,
         company=post.company,
@@ -512,15 +656,15 @@ async def get_post(
 async def update_post(
     post_id: str,
     post_data: PostUpdate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a post.
     - Alumni can update their own posts
     - Admin can update any post from their university
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id).limit(1))
     
     if not post:
         raise HTTPException(
@@ -551,30 +695,32 @@ async def update_post(
     if post_data.location is not None:
         post.location = post_data.location
     
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
     
     # Get the post's author (not current_user, though they should be the same due to auth check)
-    author = db.query(User).filter(User.id == post.author_id).first()
+    author = await db.scalar(select(User).where(User.id == post.author_id).limit(1))
     if not author:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Post author not found"
         )
     
-    is_liked = db.query(Like).filter(
+    is_liked = await db.scalar(select(Like).where(
         Like.post_id == post.id,
         Like.user_id == current_user.id
-    ).first() is not None
+    ).limit(1)) is not None
+    
+    image_sources = await get_image_sources([post.media_url], db)
     
     return PostResponse(
         id=post.id,
-        author=get_author_response(author, db),
+        author=await get_author_response(author, db),
         type=post.type.value,
         content=post.content,
         media_url=post.media_url,
         video_url=post.video_url,
-        thumbnail_url=post.thumbnail_url,
+        **image_fields(post.thumbnail_url, image_sources.get(post.media_url)),
         tag=post.tag,
         job_title=post.job_title,
         company=post.company,
@@ -593,15 +739,15 @@ async def update_post(
 @router.delete("/{post_id}")
 async def delete_post(
     post_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a post (soft delete).
     - Alumni can delete their own posts
     - Admin can delete any post from their university
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id).limit(1))
     
     if not post:
         raise HTTPException(
@@ -619,14 +765,14 @@ async def delete_post(
     post.is_active = False
     
     # Also soft delete all comments on this post
-    db.query(Comment).filter(Comment.post_id == post_id).delete()
+    await db.execute(delete(Comment).where(Comment.post_id == post_id))
     
     # Update user's post count
-    profile = db.query(UserProfile).filter(UserProfile.user_id == post.author_id).first()
+    profile = await db.scalar(select(UserProfile).where(UserProfile.user_id == post.author_id).limit(1))
     if profile:
         profile.posts_count = max(0, profile.posts_count - 1)
     
-    db.commit()
+    await db.commit()
     
     return {"message": "Post and its comments deleted successfully", "success": True}
 
@@ -634,13 +780,13 @@ async def delete_post(
 @router.post("/{post_id}/like")
 async def like_post(
     post_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Like a post.
     """
-    post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id, Post.is_active == True).limit(1))
     
     if not post:
         raise HTTPException(
@@ -648,10 +794,10 @@ async def like_post(
             detail="Post not found"
         )
     
-    existing_like = db.query(Like).filter(
+    existing_like = await db.scalar(select(Like).where(
         Like.post_id == post_id,
         Like.user_id == current_user.id
-    ).first()
+    ).limit(1))
     
     if existing_like:
         raise HTTPException(
@@ -662,7 +808,7 @@ async def like_post(
     like = Like(post_id=post_id, user_id=current_user.id)
     db.add(like)
     post.likes_count += 1
-    db.commit()
+    await db.commit()
     
     return {"message": "Post liked", "success": True, "likes_count": post.likes_count}
 
@@ -670,13 +816,13 @@ async def like_post(
 @router.delete("/{post_id}/like")
 async def unlike_post(
     post_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Unlike a post.
     """
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id).limit(1))
     
     if not post:
         raise HTTPException(
@@ -684,10 +830,10 @@ async def unlike_post(
             detail="Post not found"
         )
     
-    like = db.query(Like).filter(
+    like = await db.scalar(select(Like).where(
         Like.post_id == post_id,
         Like.user_id == current_user.id
-    ).first()
+    ).limit(1))
     
     if not like:
         raise HTTPException(
@@ -695,9 +841,9 @@ async def unlike_post(
             detail="Not liked this post"
         )
     
-    db.delete(like)
+    await db.delete(like)
     post.likes_count = max(0, post.likes_count - 1)
-    db.commit()
+    await db.commit()
     
     return {"message": "Post unliked", "success": True, "likes_count": post.likes_count}
 
@@ -705,13 +851,13 @@ async def unlike_post(
 @router.get("/{post_id}/comments", response_model=List[CommentResponse])
 async def get_comments(
     post_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get comments for a post.
     """
-    post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id, Post.is_active == True).limit(1))
     
     if not post:
         raise HTTPException(
@@ -719,17 +865,19 @@ async def get_comments(
             detail="Post not found"
         )
     
-    comments = db.query(Comment).filter(
+    comments = (await db.scalars(select(Comment).where(
         Comment.post_id == post_id
-    ).order_by(Comment.created_at.asc()).all()
+    ).order_by(Comment.created_at.asc()))).all()
+    
+    authors = await build_author_map((comment.author_id for comment in comments), db)
     
     comment_responses = []
     for comment in comments:
-        author = db.query(User).filter(User.id == comment.author_id).first()
+        author = authors.get(comment.author_id)
         if author:
             comment_responses.append(CommentResponse(
                 id=comment.id,
-                author=get_author_response(author, db),
+                author=author,
                 content=comment.content,
                 created_at=comment.created_at
             ))
@@ -741,13 +889,13 @@ async def get_comments(
 async def create_comment(
     post_id: str,
     comment_data: CommentCreate,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Add a comment to a post.
     """
-    post = db.query(Post).filter(Post.id == post_id, Post.is_active == True).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id, Post.is_active == True).limit(1))
     
     if not post:
         raise HTTPException(
@@ -763,12 +911,12 @@ async def create_comment(
     
     db.add(comment)
     post.comments_count += 1
-    db.commit()
-    db.refresh(comment)
+    await db.commit()
+    await db.refresh(comment)
     
     return CommentResponse(
         id=comment.id,
-        author=get_author_response(current_user, db),
+        author=await get_author_response(current_user, db),
         content=comment.content,
         created_at=comment.created_at
     )
@@ -778,18 +926,18 @@ async def create_comment(
 async def delete_comment(
     post_id: str,
     comment_id: str,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a comment.
     - Alumni can delete their own comments
     - Admin can delete any comment from posts in their university
     """
-    comment = db.query(Comment).filter(
+    comment = await db.scalar(select(Comment).where(
         Comment.id == comment_id,
         Comment.post_id == post_id
-    ).first()
+    ).limit(1))
     
     if not comment:
         raise HTTPException(
@@ -797,7 +945,7 @@ async def delete_comment(
             detail="Comment not found"
         )
     
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = await db.scalar(select(Post).where(Post.id == post_id).limit(1))
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -812,7 +960,7 @@ async def delete_comment(
     
     post.comments_count = max(0, post.comments_count - 1)
     
-    db.delete(comment)
-    db.commit()
+    await db.delete(comment)
+    await db.commit()
     
     return {"message": "Comment deleted", "success": True}
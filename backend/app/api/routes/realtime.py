@@ -0,0 +1,129 @@
+"""
+Real-time push gateway
+
+Clients open one long-lived connection instead of polling unread counts and
+conversations:
+- WebSocket: /realtime/ws?token=<access token>
+- Server-Sent Events fallback: /realtime/events (Authorization header, or
+  ?token= since EventSource cannot send headers)
+
+The first event is "counts" with the current unread totals; after that the
+client receives message, group_message, notification and badge (unread
+deltas) events as JSON. A "resync" event means events were dropped and the
+client should refetch. Heartbeats keep idle connections open through proxies.
+"""
+
+import json
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.security import decode_access_token
+from app.core.principal_cache import get_cached_user, cache_user
+from app.models.user import User
+from app.services.realtime import realtime_bus
+from app.services.unread_counters import get_unread_counts
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 25
+
+
+async def _authenticate(token: Optional[str]) -> Optional[str]:
+    """User ID for an access token if the user exists and is active."""
+    payload = decode_access_token(token) if token else None
+    if payload is None or payload.get("sub") is None:
+        return None
+    
+    user = await get_cached_user(payload["sub"])
+    if user is None:
+        # Short-lived session: nothing is held open for the life of the connection
+        async with AsyncSessionLocal() as db:
+            user = await db.scalar(select(User).where(User.id == payload["sub"]))
+            if user is not None:
+                await cache_user(user)
+    
+    if user is None or not user.is_active:
+        return None
+    return user.id
+
+
+async def _counts_event(user_id: str) -> dict:
+    async with AsyncSessionLocal() as db:
+        counts = await get_unread_counts(db, user_id)
+    return {"type": "counts", **counts}
+
+
+@router.websocket("/ws")
+async def websocket_events(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """
+    Push events over a WebSocket. Messages sent by the client are ignored
+    (send anything, e.g. "ping", to keep the connection alive).
+    """
+    user_id = await _authenticate(token)
+    if user_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    subscription = realtime_bus.subscribe(user_id)
+    
+    async def receive():
+        # Returns when the client disconnects
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+    
+    async def send():
+        await websocket.send_json(await _counts_event(user_id))
+        while True:
+            event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+            await websocket.send_json(event if event is not None else {"type": "ping"})
+    
+    tasks = [asyncio.create_task(receive()), asyncio.create_task(send())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
+
+
+@router.get("/events")
+async def sse_events(request: Request, token: Optional[str] = Query(None)):
+    """Push events as Server-Sent Events (fallback where WebSockets are blocked)."""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    
+    user_id = await _authenticate(token)
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    async def stream():
+        # Subscribed only once the body starts, so a response that is never
+        # sent leaves nothing behind in the hub
+        subscription = realtime_bus.subscribe(user_id)
+        try:
+            yield f"data: {json.dumps(await _counts_event(user_id))}\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=HEARTBEAT_SECONDS)
+                yield f"data: {json.dumps(event)}\n\n" if event is not None else ": ping\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
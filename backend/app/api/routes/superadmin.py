@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import datetime
 
 from app.core.database import get_db
-from app.core.security import get_current_active_user, get_password_hash
+from app.core.security import get_current_active_user, hash_password_async
 from app.models.user import User, UserRole, UserProfile
 from app.models.university import University
 from app.models.ad import Ad
@@ -32,6 +33,7 @@ from app.services.admin_management_service import (
     reject_password_reset, toggle_admin_status, get_password_reset_stats,
     create_audit_log
 )
+from app.services.ad_counters import record_ad_event
 import json
 import logging
 
@@ -396,7 +398,9 @@ async def create_admin(
         # Get client IP
         ip_address = request.client.host if request.client else None
         
-        admin, plain_password = create_admin_user(
+        # bcrypt and the credentials email block, so run the service on the threadpool
+        admin, plain_password = await run_in_threadpool(
+            create_admin_user,
             db=db,
             email=admin_data.email,
             name=admin_data.name,
@@ -582,7 +586,7 @@ async def create_global_user(
     user = User(
         email=user_data.email,
         username=user_data.email.split('@')[0],
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         name=user_data.name,
         university_id=user_data.university_id,
         graduation_year=user_data.graduation_year,
@@ -797,7 +801,8 @@ async def approve_admin_password_reset(
     try:
         ip_address = request.client.host if request.client else None
         
-        reset_request, new_password = approve_password_reset(
+        reset_request, new_password = await run_in_threadpool(
+            approve_password_reset,
             db=db,
             request_id=request_id,
             approved_by=current_user.id,
@@ -880,7 +885,7 @@ async def reset_admin_password(
     
     ip_address = request.client.host if request.client else None
     
-    admin.hashed_password = get_password_hash(password_data.new_password)
+    admin.hashed_password = await hash_password_async(password_data.new_password)
     admin.password_reset_requested = False
     admin.password_reset_requested_at = None
     admin.force_password_reset = True  # Force change on next login
@@ -1275,7 +1280,7 @@ async def record_ad_impression(
     Record an ad impression (view). Called when ad is displayed to user.
     This endpoint doesn't require authentication to allow tracking.
     """
-    ad = db.query(Ad).filter(Ad.id == ad_id).first()
+    ad = db.query(Ad.id).filter(Ad.id == ad_id).first()
     
     if not ad:
         raise HTTPException(
@@ -1283,8 +1288,8 @@ async def record_ad_impression(
             detail="Ad not found"
         )
     
-    ad.impressions = (ad.impressions or 0) + 1
-    db.commit()
+    # Buffered and applied in batches (app.services.ad_counters)
+    record_ad_event(db, ad_id, "impressions")
     
     return {"success": True}
 
@@ -1298,7 +1303,7 @@ async def record_ad_click(
     Record an ad click. Called when user clicks on ad.
     This endpoint doesn't require authentication to allow tracking.
     """
-    ad = db.query(Ad).filter(Ad.id == ad_id).first()
+    ad = db.query(Ad.id).filter(Ad.id == ad_id).first()
     
     if not ad:
         raise HTTPException(
@@ -1306,8 +1311,8 @@ async def record_ad_click(
             detail="Ad not found"
         )
     
-    ad.clicks = (ad.clicks or 0) + 1
-    db.commit()
+    # Buffered and applied in batches (app.services.ad_counters)
+    record_ad_event(db, ad_id, "clicks")
     
     return {"success": True}
 
@@ -0,0 +1,207 @@
+"""
+Presigned direct uploads
+
+Large media no longer has to stream through the API: the client asks for
+presigned PUT URLs, uploads straight to S3 (in parts above
+PRESIGNED_PART_SIZE), then calls /complete. The URLs only ever cover a
+server-generated key under the kind's folder, and the completion step checks
+the stored object (HEAD) against the declared size and content type before
+returning its URL - objects that don't match are deleted.
+
+The upload token handed out by /presign is a short-lived signed JWT holding
+the key, the multipart upload ID and the declared limits, so no server-side
+state is needed between the two calls.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from botocore.exceptions import ClientError
+from datetime import timedelta
+
+from app.core.security import get_current_active_user_async, create_access_token, decode_access_token
+from app.core.logging import logger
+from app.models.user import User
+from app.schemas.upload import (
+    PresignUploadRequest, PresignUploadResponse,
+    CompleteUploadRequest, CompleteUploadResponse
+)
+from app.services.s3_service import s3_service, PRESIGNED_URL_EXPIRY
+from app.services.image_derivatives import schedule_s3_image_derivatives
+from app.api.routes.documents import ALLOWED_DOCUMENT_EXTENSIONS
+
+router = APIRouter()
+
+# kind -> (S3 folder, max size in bytes, required content type prefix)
+UPLOAD_KINDS = {
+    "image": ("images", 100 * 1024 * 1024, "image/"),
+    "video": ("videos", 500 * 1024 * 1024, "video/"),
+    "document": ("documents", 500 * 1024 * 1024, None),
+}
+
+
+def _require_s3():
+    if not s3_service.is_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Direct uploads require S3 storage"
+        )
+
+
+def _decode_upload_token(token: str, current_user: User) -> dict:
+    """Decode an upload token and check it belongs to the current user."""
+    payload = decode_access_token(token)
+    
+    if not payload or payload.get("typ") != "upload" or payload.get("uid") != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired upload token"
+        )
+    return payload
+
+
+@router.post("/presign", response_model=PresignUploadResponse)
+async def presign_upload(
+    request: PresignUploadRequest,
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """
+    Get presigned PUT URL(s) for uploading a file directly to S3.
+    Upload each part to its URL (single PUT: with the same Content-Type), then call /complete.
+    Each URL only accepts a body of exactly its part's size (part_size, the last part the rest).
+    """
+    _require_s3()
+    
+    if request.kind not in UPLOAD_KINDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"kind must be one of: {', '.join(UPLOAD_KINDS)}"
+        )
+    
+    folder, max_size, content_type_prefix = UPLOAD_KINDS[request.kind]
+    
+    if request.file_size <= 0 or request.file_size > max_size:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size must be between 1 byte and {max_size // (1024 * 1024)}MB"
+        )
+    
+    if content_type_prefix and not request.content_type.startswith(content_type_prefix):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Content type must be {content_type_prefix}*"
+        )
+    
+    if request.kind == "document":
+        file_ext = '.' + request.filename.rsplit('.', 1)[-1].lower() if '.' in request.filename else ''
+        if file_ext not in ALLOWED_DOCUMENT_EXTENSIONS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"File type not allowed. Allowed types: {', '.join(ALLOWED_DOCUMENT_EXTENSIONS)}"
+            )
+    
+    try:
+        upload = await run_in_threadpool(
+            s3_service.create_presigned_upload,
+            folder, request.filename, request.content_type, request.file_size
+        )
+    except ClientError as e:
+        logger.error(f"Error creating presigned upload: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to prepare upload"
+        )
+    
+    upload_token = create_access_token(
+        {
+            "typ": "upload",
+            "uid": current_user.id,
+            "kind": request.kind,
+            "key": upload["key"],
+            "upload_id": upload["upload_id"],
+            "size": request.file_size,
+            "ct": request.content_type,
+        },
+        expires_delta=timedelta(seconds=PRESIGNED_URL_EXPIRY)
+    )
+    
+    logger.info(f"Presigned {request.kind} upload {upload['key']} ({len(upload['parts'])} parts) for user {current_user.id}")
+    
+    return PresignUploadResponse(
+        upload_token=upload_token,
+        key=upload["key"],
+        multipart=upload["upload_id"] is not None,
+        part_size=upload["part_size"],
+        parts=upload["parts"],
+        expires_in=PRESIGNED_URL_EXPIRY
+    )
+
+
+@router.post("/complete", response_model=CompleteUploadResponse)
+async def complete_upload(
+    request: CompleteUploadRequest,
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """
+    Finish a presigned upload: complete the multipart upload, verify the
+    stored object and return its public URL.
+    """
+    _require_s3()
+    
+    upload = _decode_upload_token(request.upload_token, current_user)
+    key = upload["key"]
+    
+    try:
+        stored = await run_in_threadpool(s3_service.complete_presigned_upload, key, upload.get("upload_id"))
+    except ClientError as e:
+        logger.warning(f"Presigned upload {key} could not be completed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Upload is missing or incomplete"
+        )
+    
+    if stored["size"] != upload["size"] or stored["content_type"] != upload["ct"]:
+        logger.warning(
+            f"Presigned upload {key} does not match its declaration "
+            f"({stored['size']} bytes, {stored['content_type']}); deleting"
+        )
+        await run_in_threadpool(s3_service.abort_presigned_upload, key)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file does not match the declared size or content type"
+        )
+    
+    url = s3_service._get_public_url(key)
+    
+    if upload["kind"] == "image":
+        schedule_s3_image_derivatives(url, key)
+    
+    logger.info(f"Presigned upload completed: {url}")
+    
+    return CompleteUploadResponse(
+        url=url,
+        type=upload["kind"],
+        key=key,
+        file_size=stored["size"],
+        content_type=stored["content_type"]
+    )
+
+
+@router.post("/abort")
+async def abort_upload(
+    request: CompleteUploadRequest,
+    current_user: User = Depends(get_current_active_user_async)
+):
+    """Cancel a presigned upload and discard any uploaded parts."""
+    _require_s3()
+    
+    upload = _decode_upload_token(request.upload_token, current_user)
+    
+    try:
+        await run_in_threadpool(s3_service.abort_presigned_upload, upload["key"], upload.get("upload_id"))
+    except ClientError as e:
+        logger.error(f"Error aborting presigned upload {upload['key']}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to abort upload"
+        )
+    
+    return {"message": "Upload aborted"}
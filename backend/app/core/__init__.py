@@ -1,15 +1,21 @@
 from app.core.config import settings
-from app.core.database import Base, get_db, create_tables
+from app.core.database import Base, get_db, get_async_db, create_tables
 from app.core.security import (
     verify_password, get_password_hash,
+    verify_password_async, hash_password_async, password_needs_rehash,
     create_access_token, decode_access_token,
-    get_current_user, get_current_active_user
+    get_current_user, get_current_active_user,
+    get_current_user_async, get_current_active_user_async,
+    get_optional_user_async
 )
 
 __all__ = [
     "settings",
-    "Base", "get_db", "create_tables",
+    "Base", "get_db", "get_async_db", "create_tables",
     "verify_password", "get_password_hash",
+    "verify_password_async", "hash_password_async", "password_needs_rehash",
     "create_access_token", "decode_access_token",
-    "get_current_user", "get_current_active_user"
+    "get_current_user", "get_current_active_user",
+    "get_current_user_async", "get_current_active_user_async",
+    "get_optional_user_async"
 ]
@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -32,6 +34,47 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str):
+    """
+    Convert the synchronous database URL to an asyncpg URL.
+    asyncpg does not understand libpq's sslmode/channel_binding parameters
+    (used by Neon connection strings), so they are mapped to connect_args.
+    """
+    async_url = make_url(url)
+    if async_url.drivername in ('postgresql', 'postgresql+psycopg2'):
+        async_url = async_url.set(drivername='postgresql+asyncpg')
+    
+    connect_args = {}
+    sslmode = async_url.query.get('sslmode')
+    if sslmode and sslmode != 'disable':
+        connect_args['ssl'] = 'require'
+    async_url = async_url.difference_update_query(['sslmode', 'channel_binding'])
+    
+    return async_url, connect_args
+
+
+async_database_url, async_connect_args = _async_database_url(database_url)
+
+# Async engine for request handlers, so queries don't block the event loop
+async_engine = create_async_engine(
+    async_database_url,
+    connect_args=async_connect_args,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10,
+    pool_recycle=300,
+    echo=settings.DEBUG
+)
+
+# Objects stay usable after commit; async sessions cannot lazily refresh them
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Create declarative base
 Base = declarative_base()
 
@@ -45,6 +88,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency to get an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def create_tables():
     """Create all tables in the database."""
     try:
@@ -198,5 +247,82 @@ def create_tables():
     except Exception as e:
         print(f"⚠ Could not fix ads schema: {e}")
     
+    # Fix media table - files move out of file_data into a storage backend
+    try:
+        from sqlalchemy import text, inspect
+        inspector = inspect(engine)
+        
+        if 'media' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('media')]
+            new_media_columns = {
+                'storage_backend': 'VARCHAR',
+                'storage_key': 'VARCHAR',
+                'etag': 'VARCHAR'
+            }
+            
+            with engine.begin() as conn:
+                for col, col_type in new_media_columns.items():
+                    if col not in columns:
+                        conn.execute(text(f"ALTER TABLE media ADD COLUMN IF NOT EXISTS {col} {col_type}"))
+                        print(f"  ✓ Added media.{col}")
+                conn.execute(text("ALTER TABLE media ALTER COLUMN file_data DROP NOT NULL"))
+    except Exception as e:
+        print(f"⚠ Could not fix media schema: {e}")
+    
+    # Fix conversations table - add per-participant unread counters
+    try:
+        from sqlalchemy import text, inspect
+        inspector = inspect(engine)
+        
+        if 'conversations' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('conversations')]
+            with engine.begin() as conn:
+                for col in ('user1_unread_count', 'user2_unread_count'):
+                    if col not in columns:
+                        conn.execute(text(f"ALTER TABLE conversations ADD COLUMN IF NOT EXISTS {col} INTEGER NOT NULL DEFAULT 0"))
+                        print(f"  ✓ Added conversations.{col}")
+    except Exception as e:
+        print(f"⚠ Could not fix conversations schema: {e}")
+    
+    # Fix alumni_import_jobs table - owner and heartbeat to detect abandoned jobs
+    try:
+        from sqlalchemy import text, inspect
+        inspector = inspect(engine)
+        
+        if 'alumni_import_jobs' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('alumni_import_jobs')]
+            new_job_columns = {
+                'owner': 'VARCHAR',
+                'heartbeat_at': 'TIMESTAMP WITH TIME ZONE'
+            }
+            
+            with engine.begin() as conn:
+                for col, col_type in new_job_columns.items():
+                    if col not in columns:
+                        conn.execute(text(f"ALTER TABLE alumni_import_jobs ADD COLUMN IF NOT EXISTS {col} {col_type}"))
+                        print(f"  ✓ Added alumni_import_jobs.{col}")
+    except Exception as e:
+        print(f"⚠ Could not fix alumni_import_jobs schema: {e}")
+    
+    # Fix email_outbox table - bodies are cleared once an email is sent
+    try:
+        from sqlalchemy import text, inspect
+        inspector = inspect(engine)
+        
+        if 'email_outbox' in inspector.get_table_names():
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE email_outbox ALTER COLUMN text_body DROP NOT NULL"))
+    except Exception as e:
+        print(f"⚠ Could not fix email_outbox schema: {e}")
+    
     # Now create/update all tables
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips indexes on tables that already existed, so add any
+    # indexes declared on the models that are still missing
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"  ⚠ Could not create index {index.name}: {e}")
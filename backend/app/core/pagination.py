@@ -0,0 +1,81 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Cursors are opaque, URL-safe tokens encoding the (created_at, id) of the last
+row on a page. Filtering with a row comparison against that pair lets
+PostgreSQL seek straight into a (..., created_at, id) index instead of scanning
+and discarding OFFSET rows, and no COUNT is needed to know if more rows exist.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: str) -> str:
+    """Encode the sort key of a row as an opaque cursor (the timestamp may be NULL)."""
+    payload = json.dumps({"t": created_at.isoformat() if created_at else None, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        return created_at, str(payload["id"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def apply_keyset(query, created_at_column, id_column, cursor: Optional[str], descending: bool = True):
+    """
+    Order a query by (created_at, id) and, if a cursor is given, restrict it to
+    rows strictly after that cursor in the chosen direction.
+    An empty cursor starts from the first page. Works for both ORM Query objects
+    and select() statements.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        key = tuple_(created_at_column, id_column)
+        if descending:
+            query = query.filter(key < tuple_(created_at, row_id))
+        else:
+            query = query.filter(key > tuple_(created_at, row_id))
+
+    if descending:
+        return query.order_by(created_at_column.desc(), id_column.desc())
+    return query.order_by(created_at_column.asc(), id_column.asc())
+
+
+def fetch_keyset_page(query, limit: int) -> Tuple[List, Optional[str]]:
+    """
+    Fetch one page from a keyset-ordered query.
+    Returns the rows and the cursor for the next page (None on the last page).
+    Rows must expose created_at and id attributes.
+    """
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
+
+
+async def fetch_keyset_page_async(db, statement, limit: int) -> Tuple[List, Optional[str]]:
+    """Async variant of fetch_keyset_page for select() statements on an AsyncSession."""
+    rows = (await db.scalars(statement.limit(limit + 1))).all()
+    if len(rows) <= limit:
+        return list(rows), None
+
+    rows = list(rows[:limit])
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
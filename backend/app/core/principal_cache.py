@@ -0,0 +1,283 @@
+"""
+Authenticated principal cache
+
+Every authenticated request used to load its User row. The row's column
+values are now cached by user ID for a short TTL, and the dependencies in
+app.core.security rebuild the User from the cache and attach it to the
+request's session with merge(load=False) - no query, yet handlers can still
+modify and commit current_user as before.
+
+Entries are dropped when a session commits changes to (or deletes) a User,
+so role and active-status changes apply on the next request. The TTL bounds
+staleness for changes made outside the ORM or by another instance.
+
+Credential columns (password hash, reset and temporary-password state) are
+never cached; they are left unloaded on cached users and load from the
+database if a handler reads them.
+
+Backends:
+- In-process LRU (default). Invalidation only reaches this worker, so entries
+  live PRINCIPAL_CACHE_LOCAL_TTL_SECONDS (5 s) to bound how long other
+  workers keep a deactivated user or removed role
+- Redis, shared by all workers and instances, when PRINCIPAL_CACHE_REDIS_URL
+  is set and the redis package is installed; invalidation deletes the shared
+  entry, so it applies everywhere. Requests use the asyncio client
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import DateTime, Enum as SQLEnum, event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - optional shared backend
+    redis = None
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_CACHE_ENABLED = os.getenv("PRINCIPAL_CACHE_ENABLED", "true").lower() == "true"
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+# In-process entries are not invalidated on other workers, so they expire sooner
+PRINCIPAL_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_LOCAL_TTL_SECONDS", "5"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+PRINCIPAL_CACHE_REDIS_URL = os.getenv("PRINCIPAL_CACHE_REDIS_URL")
+
+_REDIS_KEY_PREFIX = "principal:"
+_PENDING_INVALIDATIONS = "principal_cache_invalidate"  # Session.info key
+
+# Never written to the cache (no handler reads them from current_user)
+_CREDENTIAL_COLUMNS = frozenset({
+    "hashed_password",
+    "password_reset_requested",
+    "password_reset_requested_at",
+    "force_password_reset",
+    "temp_password_expires_at",
+    "last_password_change",
+})
+
+
+# ==============================================================================
+# BACKENDS
+# ==============================================================================
+
+class LocalPrincipalBackend:
+    """TTL + LRU dict; thread-safe since sync routes run on the threadpool."""
+
+    def __init__(self, ttl_seconds: int = PRINCIPAL_CACHE_LOCAL_TTL_SECONDS, max_entries: int = PRINCIPAL_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()  # user ID -> (expires at, columns)
+        self._lock = threading.Lock()
+
+    async def get(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return data
+
+    async def set(self, user_id: str, data: Dict):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl_seconds, data)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisPrincipalBackend:
+    """
+    Entries in Redis, shared across workers and instances.
+
+    Reads and writes come from async dependencies and use the asyncio client.
+    Invalidation runs inside SQLAlchemy session events: on the event loop
+    (async sessions) the delete is scheduled as a task, on a threadpool
+    thread (sync sessions) it uses the blocking client. On any Redis error
+    the request falls back to the database.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self.client = redis_asyncio.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.sync_client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._pending_deletes = set()  # Keeps scheduled delete tasks referenced until done
+
+    async def get(self, user_id: str) -> Optional[Dict]:
+        try:
+            raw = await self.client.get(_REDIS_KEY_PREFIX + user_id)
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(self, user_id: str, data: Dict):
+        try:
+            await self.client.set(_REDIS_KEY_PREFIX + user_id, json.dumps(data), ex=self.ttl_seconds)
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache write failed: {e}")
+
+    async def _delete_async(self, user_id: str):
+        try:
+            await self.client.delete(_REDIS_KEY_PREFIX + user_id)
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+    def delete(self, user_id: str):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        if loop is not None:
+            task = loop.create_task(self._delete_async(user_id))
+            self._pending_deletes.add(task)
+            task.add_done_callback(self._pending_deletes.discard)
+            return
+
+        try:
+            self.sync_client.delete(_REDIS_KEY_PREFIX + user_id)
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache invalidation failed: {e}")
+
+    def clear(self):
+        try:
+            for key in self.sync_client.scan_iter(_REDIS_KEY_PREFIX + "*"):
+                self.sync_client.delete(key)
+        except redis.RedisError as e:
+            logger.warning(f"Principal cache clear failed: {e}")
+
+
+def _create_backend():
+    if PRINCIPAL_CACHE_REDIS_URL and redis is not None:
+        logger.info("Principal cache: Redis backend")
+        return RedisPrincipalBackend(PRINCIPAL_CACHE_REDIS_URL)
+    if PRINCIPAL_CACHE_REDIS_URL:
+        logger.warning("PRINCIPAL_CACHE_REDIS_URL is set but redis is not installed; using the in-process cache")
+    return LocalPrincipalBackend()
+
+
+_backend = _create_backend()
+
+
+# ==============================================================================
+# USER SNAPSHOTS
+# ==============================================================================
+
+def _serialize_user(user) -> Optional[Dict]:
+    """JSON-safe column values of a loaded User, or None if some are not loaded."""
+    state = inspect(user)
+    data = {}
+    for attr in state.mapper.column_attrs:
+        if attr.key in _CREDENTIAL_COLUMNS:
+            continue
+        if attr.key not in state.dict:
+            return None
+        value = state.dict[attr.key]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif hasattr(value, "value"):  # Enum
+            value = value.value
+        data[attr.key] = value
+    return data
+
+
+def _build_user(data: Dict):
+    """
+    Detached User (as if just loaded) from a snapshot. Credential columns are
+    left unset (unloaded), so they are never flushed back from the cache.
+    """
+    from app.models.user import User
+
+    values = {}
+    for attr in User.__mapper__.column_attrs:
+        if attr.key in _CREDENTIAL_COLUMNS:
+            continue
+        value = data.get(attr.key)
+        column_type = attr.columns[0].type
+        if value is not None:
+            if isinstance(column_type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column_type, SQLEnum) and column_type.enum_class:
+                value = column_type.enum_class(value)
+        values[attr.key] = value
+
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+async def get_cached_user(user_id: str):
+    """
+    Cached User for an ID, detached; attach it with session.merge(user, load=False).
+
+    Returns:
+        The User, or None on a cache miss
+    """
+    if not PRINCIPAL_CACHE_ENABLED:
+        return None
+
+    data = await _backend.get(user_id)
+    return _build_user(data) if data is not None else None
+
+
+async def cache_user(user):
+    """Store a freshly loaded User."""
+    if not PRINCIPAL_CACHE_ENABLED:
+        return
+
+    data = _serialize_user(user)
+    if data is not None:
+        await _backend.set(user.id, data)
+
+
+def invalidate_user(user_id: str):
+    """Drop a user's cache entry."""
+    _backend.delete(user_id)
+
+
+def clear_principal_cache():
+    """Drop all entries."""
+    _backend.clear()
+
+
+# ==============================================================================
+# INVALIDATION
+# ==============================================================================
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    from app.models.user import User
+
+    changed = {obj.id for obj in list(session.dirty) + list(session.deleted) if isinstance(obj, User)}
+    if changed:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).update(changed)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # After commit, so a concurrent request can't re-cache the old row in between
+    for user_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        invalidate_user(user_id)
@@ -1,15 +1,21 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+import os
+import asyncio
 import bcrypt
 import hashlib
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_async_db
+from app.core.principal_cache import get_cached_user, cache_user
 
 # Password hashing - using bcrypt directly to avoid passlib compatibility issues
 def get_password_hash(password: str) -> str:
@@ -17,7 +23,7 @@ def get_password_hash(password: str) -> str:
     # Bcrypt has 72 byte limit, so hash longer passwords first
     if len(password.encode('utf-8')) > 72:
         password = hashlib.sha256(password.encode('utf-8')).hexdigest()
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -28,8 +34,34 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         plain_password = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if a hash was made with a different cost factor than BCRYPT_ROUNDS."""
+    try:
+        # "$2b$12$<salt+hash>"
+        return int(hashed_password.split('$')[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
+
+# bcrypt releases the GIL while hashing, so a thread pool uses every core
+# without blocking the event loop
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 4,
+    thread_name_prefix="password-hash"
+)
+
+async def hash_password_async(password: str) -> str:
+    """get_password_hash on the password worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(_password_executor, get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password worker pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _password_executor, verify_password, plain_password, hashed_password
+    )
+
 # JWT Bearer scheme
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -56,33 +88,58 @@ def decode_access_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    """Get the current user from the JWT token."""
-    from app.models.user import User
-    
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
-    payload = decode_access_token(token)
+
+
+def _get_user_id(credentials: HTTPAuthorizationCredentials) -> str:
+    """Extract the user ID from the bearer token."""
+    payload = decode_access_token(credentials.credentials)
     
     if payload is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
+        raise _credentials_exception()
+    
+    return user_id
+
+
+def _ensure_active(current_user):
+    if not current_user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
+        )
+    return current_user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the current user from the JWT token.
+    Served from the principal cache when possible (attached to the route's session).
+    """
+    from app.models.user import User
+    
+    user_id = _get_user_id(credentials)
+    
+    cached = await get_cached_user(user_id)
+    if cached is not None:
+        return db.merge(cached, load=False)
     
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     
+    await cache_user(user)
     return user
 
 
@@ -90,9 +147,67 @@ async def get_current_active_user(
     current_user = Depends(get_current_user)
 ):
     """Get the current active user."""
-    if not current_user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Inactive user"
-        )
-    return current_user
+    return _ensure_active(current_user)
+
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the current user from the JWT token using the async session.
+    The user is attached to the same AsyncSession the route receives.
+    Served from the principal cache when possible.
+    """
+    from app.models.user import User
+    
+    user_id = _get_user_id(credentials)
+    
+    cached = await get_cached_user(user_id)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    
+    user = await db.scalar(select(User).where(User.id == user_id))
+    if user is None:
+        raise _credentials_exception()
+    
+    await cache_user(user)
+    return user
+
+
+async def get_current_active_user_async(
+    current_user = Depends(get_current_user_async)
+):
+    """Get the current active user (async session variant)."""
+    return _ensure_active(current_user)
+
+
+async def get_optional_user_async(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get the current active user if a valid token was sent, otherwise None.
+    For endpoints that also serve anonymous callers.
+    """
+    from app.models.user import User
+    
+    if credentials is None:
+        return None
+    
+    payload = decode_access_token(credentials.credentials)
+    if payload is None or payload.get("sub") is None:
+        return None
+    
+    user = await get_cached_user(payload["sub"])
+    if user is not None:
+        user = await db.merge(user, load=False)
+    else:
+        user = await db.scalar(select(User).where(User.id == payload["sub"]))
+        if user is not None:
+            await cache_user(user)
+    
+    if user is None or not user.is_active:
+        return None
+    
+    return user
@@ -28,6 +28,8 @@ async def lifespan(app: FastAPI):
             status = get_knowledge_base_status()
             print(f"✓ Knowledge Base loaded: {doc_count} documents, {status['chunk_count']} chunks")
             print(f"  University: {status['university_name']} ({status['university_id']})")
+            if status['snapshot_hits']:
+                print(f"  Reused {status['snapshot_hits']} unchanged documents from snapshot")
         finally:
             db.close()
     except Exception as e:
@@ -60,9 +62,77 @@ async def lifespan(app: FastAPI):
             print(f"⚠ Could not auto-seed database: {e}")
             print("You may need to run 'python seed_data.py' manually")
     
+    # Let S3 clean up presigned uploads that were never completed
+    from app.services.s3_service import s3_service, S3_MANAGE_UPLOAD_LIFECYCLE
+    if S3_MANAGE_UPLOAD_LIFECYCLE and s3_service.is_configured():
+        from fastapi.concurrency import run_in_threadpool
+        await run_in_threadpool(s3_service.ensure_upload_lifecycle_rules)
+    
+    # Uploads without S3 need a durable media storage backend
+    from app.services.media_storage import check_media_storage_config
+    media_storage_problem = check_media_storage_config()
+    if media_storage_problem:
+        print(f"⚠ {media_storage_problem}")
+    
+    # Build the fundraiser click rollup from existing clicks on first start
+    try:
+        from app.core.database import SessionLocal
+        from app.services.fundraiser_analytics import backfill_if_empty
+        db = SessionLocal()
+        try:
+            backfilled = backfill_if_empty(db)
+            if backfilled:
+                print(f"✓ Fundraiser click rollup backfilled: {backfilled} rows")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠ Could not backfill fundraiser click rollup: {e}")
+    
+    # Push channel for messages, notifications and badge counts
+    from app.services.realtime import realtime_bus
+    await realtime_bus.start()
+    
+    # Deliver queued emails in the background
+    email_dispatcher_task = None
+    from app.services.email_service import email_service
+    if email_service.enabled:
+        import asyncio
+        from app.services.email_dispatcher import run_email_dispatcher
+        email_dispatcher_task = asyncio.create_task(run_email_dispatcher())
+    
+    # Fill unread counters if empty, then recompute them periodically
+    unread_repair_task = None
+    from app.services.unread_counters import run_unread_counter_repair, UNREAD_COUNTER_REPAIR_INTERVAL
+    if UNREAD_COUNTER_REPAIR_INTERVAL > 0:
+        import asyncio
+        unread_repair_task = asyncio.create_task(run_unread_counter_repair())
+    
+    # Heartbeat this worker's import jobs and fail jobs whose process is gone
+    import asyncio
+    from app.services.alumni_import import run_import_job_monitor
+    import_job_monitor_task = asyncio.create_task(run_import_job_monitor())
+    
+    # Apply buffered ad impressions and clicks in batches
+    ad_counter_task = None
+    from app.services.ad_counters import run_ad_counter_flusher, shutdown_ad_counters, AD_COUNTER_FLUSH_INTERVAL
+    if AD_COUNTER_FLUSH_INTERVAL > 0:
+        import asyncio
+        ad_counter_task = asyncio.create_task(run_ad_counter_flusher())
+    
     yield
     # Shutdown
     print("Shutting down...")
+    if email_dispatcher_task:
+        email_dispatcher_task.cancel()
+    if unread_repair_task:
+        unread_repair_task.cancel()
+    import_job_monitor_task.cancel()
+    if ad_counter_task:
+        ad_counter_task.cancel()
+        await shutdown_ad_counters()
+    await realtime_bus.stop()
+    from app.services.llm_client import close_llm_http_client
+    await close_llm_http_client()
 
 
 # Create FastAPI application
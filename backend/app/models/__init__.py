@@ -9,15 +9,18 @@ from app.models.message import Conversation, Message
 from app.models.document import DocumentRequest, GeneratedDocument, DocumentStatus
 from app.models.support import SupportTicket, TicketResponse, TicketStatus, TicketPriority, TicketCategory
 from app.models.notification import Notification, NotificationType
+from app.models.unread_counter import UnreadCounter
 from app.models.mentor import Mentor, MentorMatch
-from app.models.fundraiser import Fundraiser, FundraiserClick, FundraiserStatus
+from app.models.fundraiser import Fundraiser, FundraiserClick, FundraiserClickDaily, FundraiserStatus
 from app.models.ad import Ad
 from app.models.lead_intelligence import (
-    AdClick, AdImpression, CareerRoadmapRequest, CareerRoadmapView,
-    UserEngagementEvent, LeadScore, DailyAnalytics, AIInsight,
+    LeadActivity, AdClick, AdImpression, CareerRoadmapRequest, CareerRoadmapView,
+    LeadScore, LeadScoreAggregate, AIInsight,
     EventType, LeadCategory
 )
-from app.models.media import Media
+from app.models.media import Media, MediaDerivative
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.models.import_job import AlumniImportJob, ImportJobStatus
 from app.models.knowledge_base import KnowledgeBaseDocument
 from app.models.career_roadmap import SavedRoadmap, RoadmapProgress
 from app.models.admin_management import (
@@ -36,13 +39,16 @@ __all__ = [
     "DocumentRequest", "GeneratedDocument", "DocumentStatus",
     "SupportTicket", "TicketResponse", "TicketStatus", "TicketPriority", "TicketCategory",
     "Notification", "NotificationType",
+    "UnreadCounter",
     "Mentor", "MentorMatch",
-    "Fundraiser", "FundraiserClick", "FundraiserStatus",
+    "Fundraiser", "FundraiserClick", "FundraiserClickDaily", "FundraiserStatus",
     "Ad",
     "AdClick", "AdImpression", "CareerRoadmapRequest", "CareerRoadmapView",
-    "UserEngagementEvent", "LeadScore", "DailyAnalytics", "AIInsight",
+    "LeadActivity", "LeadScore", "LeadScoreAggregate", "AIInsight",
     "EventType", "LeadCategory",
-    "Media",
+    "Media", "MediaDerivative",
+    "EmailOutbox", "EmailStatus",
+    "AlumniImportJob", "ImportJobStatus",
     "KnowledgeBaseDocument",
     "SavedRoadmap", "RoadmapProgress",
     "AdminPasswordResetRequest", "AdminAuditLog",
@@ -0,0 +1,54 @@
+"""
+Email outbox: outbound emails waiting to be sent
+
+Request handlers only insert rows here (see EmailService.queue_email); the
+email dispatcher (app.services.email_dispatcher) sends them in the
+background, in batches, with retries.
+
+Bodies can contain credentials (welcome and password reset emails), so they
+are cleared as soon as a row is sent or given up on, and finished rows are
+deleted after EMAIL_OUTBOX_RETENTION_DAYS.
+"""
+import uuid
+from enum import Enum
+from sqlalchemy import Column, String, Text, DateTime, Integer, Index, Enum as SQLEnum
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"  # Gave up after EMAIL_MAX_ATTEMPTS or a permanent error
+
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    university_id = Column(String, nullable=True, index=True)  # For per-university rate limiting
+
+    to_email = Column(String, nullable=False)
+    from_email = Column(String, nullable=False)
+    from_name = Column(String, nullable=True)
+    subject = Column(String, nullable=False)
+    # Cleared (NULL) once the email is sent or failed
+    text_body = Column(Text, nullable=True)
+    html_body = Column(Text, nullable=True)
+
+    status = Column(SQLEnum(EmailStatus), default=EmailStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    last_error = Column(Text, nullable=True)
+    message_id = Column(String, nullable=True)  # Brevo message ID once sent
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The dispatcher's "due emails" scan
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    def __repr__(self):
+        return f"<EmailOutbox {self.id} to={self.to_email} status={self.status}>"
@@ -97,3 +97,16 @@ class FundraiserClick(Base):
         Index('ix_fundraiser_clicks_fundraiser_date', 'fundraiser_id', 'clicked_at'),
         Index('ix_fundraiser_clicks_user', 'fundraiser_id', 'user_id'),
     )
+
+
+class FundraiserClickDaily(Base):
+    """
+    Clicks per fundraiser per day, kept in step with fundraiser_clicks so the
+    analytics dashboard reads a few rows per fundraiser instead of counting
+    clicks (see app.services.fundraiser_analytics).
+    """
+    __tablename__ = "fundraiser_click_daily"
+    
+    fundraiser_id = Column(String, ForeignKey("fundraisers.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    clicks = Column(Integer, default=0, server_default="0", nullable=False)
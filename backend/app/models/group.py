@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -67,3 +67,8 @@ class GroupMessage(Base):
     # Relationships
     group = relationship("Group", back_populates="messages")
     sender = relationship("User")
+
+    # Composite index for keyset pagination
+    __table_args__ = (
+        Index('ix_group_messages_group_created_id', 'group_id', 'created_at', 'id'),
+    )
@@ -0,0 +1,47 @@
+"""
+Alumni import jobs: progress and results of CSV bulk imports
+
+The import itself runs in the background (app.services.alumni_import);
+admins poll the job row for status. The process running a job records
+itself as owner and refreshes heartbeat_at while the job is queued or
+running, so jobs of a process that died can be told apart from live ones.
+"""
+import uuid
+from enum import Enum
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class ImportJobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"  # The import stopped early (see error); row errors don't fail a job
+
+
+class AlumniImportJob(Base):
+    __tablename__ = "alumni_import_jobs"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    university_id = Column(String, ForeignKey("universities.id"), nullable=True, index=True)
+    created_by = Column(String, ForeignKey("users.id"), nullable=True)
+    filename = Column(String, nullable=True)
+
+    status = Column(SQLEnum(ImportJobStatus), default=ImportJobStatus.QUEUED, nullable=False)
+    processed_rows = Column(Integer, default=0, nullable=False)
+    success_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    errors = Column(JSON, default=list)  # Per-row errors, "Row 12: a@b.com: Already exists" (capped)
+    error = Column(Text, nullable=True)  # Why the job failed
+
+    owner = Column(String, nullable=True)  # Process running the job (alumni_import.IMPORT_WORKER_ID)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self):
+        return f"<AlumniImportJob {self.id} status={self.status}>"
@@ -4,7 +4,7 @@ Comprehensive event tracking for lead scoring and analytics
 """
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Boolean, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Float, DateTime, Text, ForeignKey, JSON, Boolean, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -77,8 +77,8 @@ class LeadActivity(Base):
     reference_id = Column(String, nullable=True)
     reference_type = Column(String, nullable=True)  # ad, post, roadmap, mentor, etc.
     
-    # Additional metadata
-    metadata = Column(JSON, default=dict)
+    # Additional metadata ("metadata" is reserved on declarative models)
+    activity_metadata = Column("metadata", JSON, default=dict)
     
     # Scoring
     base_score = Column(Integer, default=0)  # Points for this activity
@@ -89,6 +89,11 @@ class LeadActivity(Base):
     # Relationships
     user = relationship("User", foreign_keys=[user_id])
     university = relationship("University", foreign_keys=[university_id])
+    
+    # Per-university date-range aggregations (analytics overview, monthly trends)
+    __table_args__ = (
+        Index('ix_lead_activities_university_created', 'university_id', 'created_at'),
+    )
 
 
 class LeadScore(Base):
@@ -138,6 +143,24 @@ class LeadScore(Base):
     university = relationship("University", foreign_keys=[university_id])
 
 
+class LeadScoreAggregate(Base):
+    """
+    Running per-user, per-category totals of LeadActivity scores.
+    Updated by track_activity; time decay is applied when scores are computed
+    (see lead_intelligence_service), so no activity rows are re-read.
+    """
+    __tablename__ = "lead_score_aggregates"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    event_category = Column(String, primary_key=True)
+    
+    activity_count = Column(Integer, default=0, nullable=False)
+    base_total = Column(Float, default=0.0, nullable=False)  # Sum of base_score
+    # Sum of base_score * exp((created_at - LEAD_DECAY_EPOCH) / LEAD_DECAY_TIME_CONSTANT)
+    forward_decayed_total = Column(Float, default=0.0, nullable=False)
+    last_activity_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class AdClick(Base):
     """Track when users click on ads"""
     __tablename__ = "ad_clicks"
@@ -1,9 +1,12 @@
 """
-Temporary media storage model for storing files in database
-This is a temporary solution until S3 public access is configured
+Media storage model for files uploaded without S3 (the upload fallback)
+
+The file itself lives in a media storage backend (see app.services.media_storage);
+the row only records where. Rows created before that still hold their file as
+base64 text in file_data until migrate_media.py moves them out.
 """
 import uuid
-from sqlalchemy import Column, String, Text, DateTime, Integer
+from sqlalchemy import Column, String, Text, DateTime, Integer, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -14,8 +17,29 @@ class Media(Base):
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)  # e.g., image/png, video/mp4
-    file_data = Column(Text, nullable=False)  # Base64 encoded file content
+    file_data = Column(Text, nullable=True)  # Legacy: base64 encoded file content (NULL once in a storage backend)
     file_size = Column(Integer, nullable=False)  # Size in bytes
+    storage_backend = Column(String, nullable=True)  # "local" or "s3"; NULL for legacy base64 rows
+    storage_key = Column(String, nullable=True)  # Key within the storage backend
+    etag = Column(String, nullable=True)  # Quoted content hash, used for If-None-Match
     
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+
+class MediaDerivative(Base):
+    """Resized / re-encoded variant of an uploaded image, keyed by the original's URL"""
+    __tablename__ = "media_derivatives"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    source_url = Column(String, nullable=False)  # URL returned for the original upload
+    url = Column(String, nullable=False)
+    format = Column(String, nullable=False)  # "webp" or "jpeg" / "png"
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    file_size = Column(Integer, nullable=False)  # Size in bytes
+    
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index('ix_media_derivatives_source_url', 'source_url'),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -17,12 +17,26 @@ class Conversation(Base):
     last_message = Column(String, default=None)
     last_message_time = Column(DateTime, default=None)
     
+    # Unread messages for each participant (see app.services.unread_counters)
+    user1_unread_count = Column(Integer, default=0, server_default="0", nullable=False)
+    user2_unread_count = Column(Integer, default=0, server_default="0", nullable=False)
+    
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     user1 = relationship("User", foreign_keys=[user1_id])
     user2 = relationship("User", foreign_keys=[user2_id])
     messages = relationship("Message", back_populates="conversation", cascade="all, delete-orphan")
+    
+    # Inbox: a participant's conversations, most recent first (see list_conversations)
+    __table_args__ = (
+        Index('ix_conversations_user1_last_message', user1_id, last_message_time.desc().nulls_last(), id.desc()),
+        Index('ix_conversations_user2_last_message', user2_id, last_message_time.desc().nulls_last(), id.desc()),
+    )
+    
+    def unread_count_for(self, user_id: str) -> int:
+        """Unread messages in this conversation for one participant."""
+        return (self.user1_unread_count if user_id == self.user1_id else self.user2_unread_count) or 0
 
 
 class Message(Base):
@@ -39,3 +53,9 @@ class Message(Base):
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     sender = relationship("User")
+
+    # Composite index for keyset pagination; unread lookups (mark read, counter repair)
+    __table_args__ = (
+        Index('ix_messages_conversation_created_id', 'conversation_id', 'created_at', 'id'),
+        Index('ix_messages_conversation_unread', 'conversation_id', 'is_read', 'sender_id'),
+    )
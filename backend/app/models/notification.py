@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Boolean, DateTime, Text, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -38,3 +38,8 @@ class Notification(Base):
 
     # Relationships
     user = relationship("User")
+
+    # Composite index for keyset pagination
+    __table_args__ = (
+        Index('ix_notifications_user_created_id', 'user_id', 'created_at', 'id'),
+    )
@@ -0,0 +1,24 @@
+"""
+Unread counters: per-user unread message and notification totals
+
+Maintained in the same transaction as the messages and notifications they
+count (see app.services.unread_counters), so badge polling is a primary-key
+read.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class UnreadCounter(Base):
+    __tablename__ = "user_unread_counters"
+    
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    messages = Column(Integer, default=0, server_default="0", nullable=False)
+    notifications = Column(Integer, default=0, server_default="0", nullable=False)
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<UnreadCounter {self.user_id} messages={self.messages} notifications={self.notifications}>"
@@ -54,6 +54,23 @@ class BulkImportResponse(BaseModel):
     errors: List[str]
 
 
+class ImportJobResponse(BaseModel):
+    id: str
+    status: str
+    filename: Optional[str] = None
+    processed_rows: int
+    success_count: int
+    failed_count: int
+    errors: List[str] = []
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class PasswordResetRequest(BaseModel):
     id: str
     user_name: str
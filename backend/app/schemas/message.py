@@ -33,3 +33,4 @@ class ConversationResponse(BaseModel):
 class ConversationMessagesResponse(BaseModel):
     conversation: ConversationResponse
     messages: List[MessageResponse]
+    next_cursor: Optional[str] = None  # Cursor for older messages in cursor mode
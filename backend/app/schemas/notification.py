@@ -21,7 +21,8 @@ class NotificationResponse(BaseModel):
 
 class NotificationListResponse(BaseModel):
     notifications: List[NotificationResponse]
-    total: int
+    total: Optional[int] = None  # Not computed in cursor mode
     unread_count: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Set in cursor mode when more notifications exist
@@ -55,7 +55,9 @@ class PostResponse(BaseModel):
     content: str
     media_url: Optional[str] = None
     video_url: Optional[str] = None
-    thumbnail_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None  # Explicit thumbnail, else the smallest generated derivative
+    srcset: Optional[str] = None  # Responsive WebP variants of media_url ("url 320w, ...")
+    srcset_fallback: Optional[str] = None  # Same widths in the original image format
     tag: Optional[str] = None
     job_title: Optional[str] = None
     company: Optional[str] = None
@@ -75,6 +77,7 @@ class PostResponse(BaseModel):
 
 class PostListResponse(BaseModel):
     posts: List[PostResponse]
-    total: int
+    total: Optional[int] = None  # Not computed in cursor mode
     page: int
     page_size: int
+    next_cursor: Optional[str] = None  # Set in cursor mode when more posts exist
@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class PresignUploadRequest(BaseModel):
+    kind: str  # "image", "video" or "document"
+    filename: str
+    content_type: str
+    file_size: int
+
+
+class PresignedPart(BaseModel):
+    part_number: int
+    url: str
+
+
+class PresignUploadResponse(BaseModel):
+    upload_token: str
+    key: str
+    multipart: bool
+    part_size: int
+    parts: List[PresignedPart]
+    expires_in: int
+
+
+class CompleteUploadRequest(BaseModel):
+    upload_token: str
+
+
+class CompleteUploadResponse(BaseModel):
+    url: str
+    type: str
+    key: str
+    file_size: int
+    content_type: Optional[str] = None
@@ -0,0 +1,233 @@
+"""
+Write-behind ad counters
+
+Every feed render records an ad impression, so impressions and clicks are
+not written per request. They are added to a buffer and applied every
+AD_COUNTER_FLUSH_INTERVAL seconds as one batch of atomic
+UPDATE ads SET impressions = impressions + n, clicks = clicks + m statements.
+The totals shown to admins therefore lag by up to one interval.
+
+Buffers:
+- In-process dict (default); each worker flushes its own increments
+- Redis hash, shared by all workers, when AD_COUNTER_REDIS_URL is set and
+  the redis package is installed; whichever worker flushes takes the whole
+  hash (RENAME), so each increment is applied once
+
+The flusher is started from the app lifespan and flushes once more on
+shutdown. Counts that fail to apply are put back into the in-process buffer
+and retried on the next flush. With AD_COUNTER_FLUSH_INTERVAL=0 increments
+are applied directly in the request's transaction instead.
+"""
+
+import os
+import uuid
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import update, bindparam, func
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.ad import Ad
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional shared buffer
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+# Seconds between flushes; 0 writes each increment straight to the database
+AD_COUNTER_FLUSH_INTERVAL = float(os.getenv("AD_COUNTER_FLUSH_INTERVAL", "5"))
+AD_COUNTER_REDIS_URL = os.getenv("AD_COUNTER_REDIS_URL")
+
+AD_COUNTER_FIELDS = ("impressions", "clicks")
+_REDIS_KEY = "ad_counters"  # Hash of "<ad id>:<field>" -> pending increment
+
+Counts = Dict[Tuple[str, str], int]  # (ad ID, field) -> increment
+
+
+# ==============================================================================
+# BUFFERS
+# ==============================================================================
+
+class LocalCounterBuffer:
+    """Pending increments for this worker; thread-safe since sync routes run on the threadpool."""
+    
+    name = "memory"
+    
+    def __init__(self):
+        self._counts: Counts = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def add(self, ad_id: str, field: str, amount: int = 1):
+        with self._lock:
+            self._counts[(ad_id, field)] += amount
+    
+    def add_all(self, counts: Counts):
+        with self._lock:
+            for key, amount in counts.items():
+                self._counts[key] += amount
+    
+    def drain(self) -> Counts:
+        """Take all pending increments, leaving the buffer empty."""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(int)
+        return dict(counts)
+
+
+class RedisCounterBuffer:
+    """
+    Pending increments in a Redis hash shared by all workers.
+    
+    Increments that cannot reach Redis go to the in-process buffer, which is
+    drained along with the hash.
+    """
+    
+    name = "redis"
+    
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.fallback = LocalCounterBuffer()
+    
+    def add(self, ad_id: str, field: str, amount: int = 1):
+        try:
+            self.client.hincrby(_REDIS_KEY, f"{ad_id}:{field}", amount)
+        except redis.RedisError as e:
+            logger.warning(f"Ad counter increment failed, buffering locally: {e}")
+            self.fallback.add(ad_id, field, amount)
+    
+    def add_all(self, counts: Counts):
+        self.fallback.add_all(counts)
+    
+    def drain(self) -> Counts:
+        counts = self.fallback.drain()
+        # RENAME is atomic: increments after it start a new hash
+        claimed_key = f"{_REDIS_KEY}:flushing:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(_REDIS_KEY, claimed_key)
+        except redis.ResponseError:
+            return counts  # No such key: nothing pending
+        except redis.RedisError as e:
+            logger.warning(f"Ad counter drain failed: {e}")
+            return counts
+        
+        try:
+            pending = self.client.hgetall(claimed_key)
+            self.client.delete(claimed_key)
+        except redis.RedisError as e:
+            # Left in Redis under the claimed key; log it rather than risk double counting
+            logger.error(f"Ad counter drain lost track of {claimed_key}: {e}")
+            return counts
+        
+        for key, amount in pending.items():
+            ad_id, field = key.decode().rsplit(":", 1)
+            counts[(ad_id, field)] = counts.get((ad_id, field), 0) + int(amount)
+        return counts
+
+
+def _create_buffer():
+    if AD_COUNTER_REDIS_URL and redis is not None:
+        logger.info("Ad counters: Redis buffer")
+        return RedisCounterBuffer(AD_COUNTER_REDIS_URL)
+    if AD_COUNTER_REDIS_URL:
+        logger.warning("AD_COUNTER_REDIS_URL is set but redis is not installed; buffering in-process")
+    return LocalCounterBuffer()
+
+
+_buffer = _create_buffer()
+
+
+# ==============================================================================
+# RECORDING AND FLUSHING
+# ==============================================================================
+
+def _apply_counts(db: Session, counts: Counts):
+    """One atomic increment per ad, sent as a single executemany batch."""
+    per_ad = defaultdict(lambda: dict.fromkeys(AD_COUNTER_FIELDS, 0))
+    for (ad_id, field), amount in counts.items():
+        if field in AD_COUNTER_FIELDS and amount:
+            per_ad[ad_id][field] += amount
+    if not per_ad:
+        return
+    
+    ads = Ad.__table__
+    db.execute(
+        update(ads).where(ads.c.id == bindparam("ad_id")).values(
+            impressions=func.coalesce(ads.c.impressions, 0) + bindparam("add_impressions"),
+            clicks=func.coalesce(ads.c.clicks, 0) + bindparam("add_clicks")
+        ),
+        [
+            {"ad_id": ad_id, "add_impressions": fields["impressions"], "add_clicks": fields["clicks"]}
+            for ad_id, fields in per_ad.items()
+        ]
+    )
+
+
+def record_ad_event(db: Session, ad_id: str, field: str):
+    """Count an impression or click for an ad ("impressions" or "clicks")."""
+    if AD_COUNTER_FLUSH_INTERVAL > 0:
+        _buffer.add(ad_id, field)
+        return
+    
+    _apply_counts(db, {(ad_id, field): 1})
+    db.commit()
+
+
+def flush_ad_counters(db: Session) -> int:
+    """
+    Apply all pending increments and commit.
+    
+    Returns:
+        Number of (ad, counter) increments applied
+    """
+    counts = _buffer.drain()
+    if not counts:
+        return 0
+    
+    try:
+        _apply_counts(db, counts)
+        db.commit()
+    except Exception:
+        db.rollback()
+        _buffer.add_all(counts)  # Retried on the next flush
+        raise
+    return len(counts)
+
+
+def _flush_with_new_session():
+    db = SessionLocal()
+    try:
+        return flush_ad_counters(db)
+    finally:
+        db.close()
+
+
+async def run_ad_counter_flusher(interval: float = AD_COUNTER_FLUSH_INTERVAL):
+    """Flush loop; started from the app lifespan and cancelled on shutdown."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(_flush_with_new_session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ad counter flush failed: {e}")
+
+
+async def shutdown_ad_counters():
+    """Final flush so buffered increments are not lost on shutdown."""
+    try:
+        flushed = await run_in_threadpool(_flush_with_new_session)
+        if flushed:
+            logger.info(f"Flushed {flushed} pending ad counters on shutdown")
+    except Exception as e:
+        logger.error(f"Ad counter flush on shutdown failed: {e}")
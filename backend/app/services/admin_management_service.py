@@ -82,6 +82,7 @@ def create_admin_user(
 ) -> Tuple[User, str]:
     """
     Create a new admin user with automatic password generation
+    Hashes with bcrypt (blocking); async callers use run_in_threadpool
     Returns (user, plain_password)
     """
     # Check if email exists
@@ -218,6 +219,7 @@ def approve_password_reset(
 ) -> Tuple[AdminPasswordResetRequest, str]:
     """
     Approve a password reset request and generate new password
+    Hashes with bcrypt (blocking); async callers use run_in_threadpool
     Returns (request, new_plain_password)
     """
     request = db.query(AdminPasswordResetRequest).filter(
@@ -444,6 +446,7 @@ def complete_first_login_password_change(
 ) -> User:
     """
     Complete first login password change
+    Hashes with bcrypt (blocking); async callers use run_in_threadpool
     """
     user = db.query(User).filter(User.id == user_id).first()
     
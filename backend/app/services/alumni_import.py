@@ -0,0 +1,486 @@
+"""
+Bulk Alumni Import Pipeline
+
+Imports alumni in chunks of IMPORT_CHUNK_SIZE rows instead of one round trip
+and commit per user:
+- Rows are validated with the AlumniUserCreate schema
+- Duplicate emails (within the import and against existing users) are found
+  with one set-based query per chunk
+- Passwords are bcrypt-hashed on a small thread pool (bcrypt releases the
+  GIL, so threads hash in parallel without starting extra processes)
+- Users, profiles and queued welcome emails are inserted with executemany
+  in one transaction per chunk; if a chunk hits a constraint (e.g. a user
+  created concurrently) it is retried row by row so only the bad rows fail
+
+CSV imports run as background jobs (AlumniImportJob) whose progress is
+updated after every chunk. Jobs run in the process that accepted the upload,
+which records itself as the job's owner and refreshes the job's heartbeat
+every IMPORT_JOB_HEARTBEAT_INTERVAL seconds (run_import_job_monitor). Jobs
+whose heartbeat is older than IMPORT_JOB_STALE_SECONDS belonged to a process
+that died and are marked failed (fail_stale_jobs); jobs of live workers and
+instances are left alone. Status changes are conditional on the current
+status, so a job that was failed this way stops at its next chunk instead of
+overwriting the failure.
+"""
+
+import os
+import csv
+import uuid
+import socket
+import asyncio
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Set
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import select, insert, update, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.models.user import User, UserProfile, UserRole
+from app.models.university import University
+from app.models.import_job import AlumniImportJob, ImportJobStatus
+from app.schemas.admin import AlumniUserCreate
+from app.services.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_HASH_WORKERS = 2  # Leave the rest of the CPU to request handling
+# Below this many passwords, hashing inline beats handing them to the pool
+IMPORT_POOL_MIN_PASSWORDS = 8
+IMPORT_MAX_ERRORS = 1000  # Per-row errors kept in a result
+CSV_REQUIRED_COLUMNS = ("email", "password", "name")
+
+# Seconds between heartbeats of this process's jobs, and the age at which a
+# heartbeat means the owning process is gone
+IMPORT_JOB_HEARTBEAT_INTERVAL = float(os.getenv("IMPORT_JOB_HEARTBEAT_INTERVAL", "30"))
+IMPORT_JOB_STALE_SECONDS = float(os.getenv("IMPORT_JOB_STALE_SECONDS", "300"))
+IMPORT_JOB_INTERRUPTED_ERROR = (
+    "Interrupted: the server running this import stopped. "
+    "Rows imported before that were kept; upload the file again to import the rest"
+)
+
+# Owner recorded on jobs started by this process
+IMPORT_WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def available_cpus() -> int:
+    """CPUs this process may use: its affinity mask, further limited by a cgroup v2 CPU quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on macOS/Windows
+        cpus = os.cpu_count() or 1
+
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", str(min(IMPORT_MAX_HASH_WORKERS, available_cpus()))))
+
+_hash_pool: Optional[ThreadPoolExecutor] = None
+# One import job at a time
+_job_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alumni-import")
+_active_jobs: Set[str] = set()  # Queued or running in this process; heartbeats are sent for these
+
+
+def _get_hash_pool() -> ThreadPoolExecutor:
+    global _hash_pool
+
+    if _hash_pool is None:
+        _hash_pool = ThreadPoolExecutor(max_workers=IMPORT_HASH_WORKERS, thread_name_prefix="alumni-import-hash")
+    return _hash_pool
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """bcrypt-hash passwords in parallel on the hash thread pool."""
+    if len(passwords) < IMPORT_POOL_MIN_PASSWORDS or IMPORT_HASH_WORKERS <= 1:
+        return [get_password_hash(password) for password in passwords]
+
+    return list(_get_hash_pool().map(get_password_hash, passwords))
+
+
+@dataclass
+class ImportRow:
+    """One user to import."""
+    row_number: Optional[int]  # CSV line number (None for JSON imports)
+    data: dict
+
+
+@dataclass
+class ImportResult:
+    """Counters and per-row errors of an import."""
+    processed: int = 0
+    success_count: int = 0
+    failed_count: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def fail(self, row: ImportRow, email: Optional[str], message: str):
+        self.failed_count += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            prefix = f"Row {row.row_number}: " if row.row_number is not None else ""
+            self.errors.append(f"{prefix}{email or '(no email)'}: {message}")
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+# ==============================================================================
+# IMPORT
+# ==============================================================================
+
+def _insert_users(db: Session, users: List[dict], profiles: List[dict]):
+    db.execute(insert(User), users)
+    db.execute(insert(UserProfile), profiles)
+
+
+def _import_chunk(
+    db: Session,
+    rows: List[ImportRow],
+    university_id: Optional[str],
+    result: ImportResult,
+    seen_emails: Set[str],
+    seen_usernames: Set[str],
+    email_service: Optional[EmailService],
+    university_name: Optional[str]
+):
+    # Validate and drop duplicates within the import
+    valid = []
+    for row in rows:
+        try:
+            user_data = AlumniUserCreate(**row.data)
+        except ValidationError as e:
+            result.fail(row, row.data.get("email"), _validation_message(e))
+            continue
+
+        email = str(user_data.email)
+        if email in seen_emails:
+            result.fail(row, email, "Duplicate email in import")
+            continue
+        seen_emails.add(email)
+        valid.append((row, user_data))
+
+    if not valid:
+        return
+
+    # Existing users, in one query
+    existing = set(db.scalars(
+        select(User.email).where(User.email.in_([str(user_data.email) for _, user_data in valid]))
+    ))
+    new = []
+    for row, user_data in valid:
+        if str(user_data.email) in existing:
+            result.fail(row, str(user_data.email), "Already exists")
+        else:
+            new.append((row, user_data))
+
+    if not new:
+        return
+
+    # Usernames are generated from the email and must stay unique; leave them empty on a clash
+    candidates = {str(user_data.email).split('@')[0] for _, user_data in new}
+    taken = set(db.scalars(select(User.username).where(User.username.in_(candidates)))) | seen_usernames
+
+    hashed_passwords = hash_passwords([user_data.password for _, user_data in new])
+
+    entries = []
+    for (row, user_data), hashed_password in zip(new, hashed_passwords):
+        user_id = str(uuid.uuid4())
+        username = str(user_data.email).split('@')[0]
+        if username in taken:
+            username = None
+        else:
+            taken.add(username)
+            seen_usernames.add(username)
+
+        user = {
+            "id": user_id,
+            "email": str(user_data.email),
+            "username": username,
+            "hashed_password": hashed_password,
+            "name": user_data.name,
+            "university_id": university_id,
+            "graduation_year": user_data.graduation_year,
+            "major": user_data.major,
+            "role": UserRole.ALUMNI,
+        }
+        profile = {"id": str(uuid.uuid4()), "user_id": user_id}
+        entries.append((row, user_data, user, profile))
+
+    def queue_welcome_email(user_data: AlumniUserCreate):
+        if email_service and email_service.enabled:
+            email_service.send_welcome_email(
+                to_email=str(user_data.email),
+                user_name=user_data.name,
+                password=user_data.password,  # Send plain password for initial login
+                university_name=university_name
+            )
+
+    try:
+        _insert_users(db, [user for _, _, user, _ in entries], [profile for _, _, _, profile in entries])
+        for _, user_data, _, _ in entries:
+            queue_welcome_email(user_data)
+        db.commit()
+        result.success_count += len(entries)
+        return
+    except IntegrityError:
+        db.rollback()
+        logger.warning("Bulk insert hit a constraint, retrying the chunk row by row")
+
+    for row, user_data, user, profile in entries:
+        try:
+            _insert_users(db, [user], [profile])
+            queue_welcome_email(user_data)
+            db.commit()
+            result.success_count += 1
+        except IntegrityError:
+            db.rollback()
+            result.fail(row, user["email"], "Already exists")
+
+
+def _chunks(rows: Iterable[ImportRow], size: int) -> Iterator[List[ImportRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_alumni(
+    db: Session,
+    rows: Iterable[ImportRow],
+    university_id: Optional[str],
+    send_emails: bool = True,
+    on_progress: Optional[Callable[[ImportResult], None]] = None
+) -> ImportResult:
+    """
+    Import alumni into a university, committing once per chunk.
+
+    Args:
+        db: Database session
+        rows: Users to import (consumed lazily, so a CSV is never fully in memory)
+        university_id: University of the new users
+        send_emails: Queue welcome emails with the credentials
+        on_progress: Called with the running result after each chunk
+
+    Returns:
+        ImportResult with counts and per-row errors
+    """
+    university = db.get(University, university_id) if university_id else None
+    email_service = EmailService.from_university(university, db=db) if send_emails else None
+    university_name = university.name if university else None
+
+    result = ImportResult()
+    seen_emails: Set[str] = set()
+    seen_usernames: Set[str] = set()
+
+    for chunk in _chunks(rows, IMPORT_CHUNK_SIZE):
+        _import_chunk(db, chunk, university_id, result, seen_emails, seen_usernames, email_service, university_name)
+        result.processed += len(chunk)
+        if on_progress:
+            on_progress(result)
+
+    logger.info(f"Alumni import: {result.success_count} created, {result.failed_count} failed")
+    return result
+
+
+# ==============================================================================
+# CSV JOBS
+# ==============================================================================
+
+def read_csv_rows(path: str) -> Iterator[ImportRow]:
+    """
+    Stream rows of an alumni CSV (columns: email, password, name, and
+    optionally graduation_year and major; header names are case-insensitive).
+
+    Raises:
+        ValueError: if a required column is missing
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        columns = [(name or "").strip().lower() for name in (reader.fieldnames or [])]
+        missing = [column for column in CSV_REQUIRED_COLUMNS if column not in columns]
+        if missing:
+            raise ValueError(f"CSV is missing columns: {', '.join(missing)}")
+        reader.fieldnames = columns
+
+        for record in reader:
+            data = {
+                key: (value.strip() or None) if isinstance(value, str) else value
+                for key, value in record.items() if key
+            }
+            yield ImportRow(row_number=reader.line_num, data=data)
+
+
+def save_upload(fileobj: BinaryIO) -> str:
+    """Copy an uploaded CSV to a temporary file (the upload is closed after the request)."""
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="alumni-import-", suffix=".csv", delete=False) as tmp:
+        shutil.copyfileobj(fileobj, tmp)
+        return tmp.name
+
+
+class ImportJobInterrupted(Exception):
+    """The job row is no longer ours to update (it was failed as stale)."""
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def run_import_job(job_id: str, path: str, send_emails: bool = True):
+    """Worker job: import a CSV file and record progress on the job row. Deletes the file when done."""
+    db = SessionLocal()
+
+    def set_job(expected_status: ImportJobStatus, **values) -> bool:
+        """Update the job if it still has expected_status; False if another process failed it."""
+        result = db.execute(
+            update(AlumniImportJob)
+            .where(AlumniImportJob.id == job_id, AlumniImportJob.status == expected_status)
+            .values(heartbeat_at=_utcnow(), **values)
+        )
+        db.commit()
+        return result.rowcount == 1
+
+    def record_progress(result: ImportResult):
+        updated = set_job(
+            ImportJobStatus.RUNNING,
+            processed_rows=result.processed,
+            success_count=result.success_count,
+            failed_count=result.failed_count,
+            errors=list(result.errors)
+        )
+        if not updated:
+            raise ImportJobInterrupted()
+
+    status = ImportJobStatus.QUEUED
+    try:
+        university_id = db.scalar(select(AlumniImportJob.university_id).where(AlumniImportJob.id == job_id))
+        if not set_job(ImportJobStatus.QUEUED, status=ImportJobStatus.RUNNING, owner=IMPORT_WORKER_ID, started_at=_utcnow()):
+            raise ImportJobInterrupted()
+        status = ImportJobStatus.RUNNING
+
+        import_alumni(db, read_csv_rows(path), university_id, send_emails, record_progress)
+
+        if not set_job(ImportJobStatus.RUNNING, status=ImportJobStatus.COMPLETED, finished_at=_utcnow()):
+            raise ImportJobInterrupted()
+    except ImportJobInterrupted:
+        logger.warning(f"Alumni import job {job_id} was marked failed elsewhere; stopped")
+    except Exception as e:
+        logger.error(f"Alumni import job {job_id} failed: {e}")
+        db.rollback()
+        set_job(status, status=ImportJobStatus.FAILED, error=str(e), finished_at=_utcnow())
+    finally:
+        _active_jobs.discard(job_id)
+        db.close()
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def start_import_job(job_id: str, path: str, send_emails: bool = True):
+    """Queue a CSV import job (created with owner=IMPORT_WORKER_ID) on the import worker."""
+    _active_jobs.add(job_id)
+    _job_executor.submit(run_import_job, job_id, path, send_emails)
+
+
+def heartbeat_import_jobs(db: Session) -> int:
+    """Refresh the heartbeat of this process's queued and running jobs."""
+    job_ids = list(_active_jobs)
+    if not job_ids:
+        return 0
+
+    result = db.execute(
+        update(AlumniImportJob)
+        .where(
+            AlumniImportJob.id.in_(job_ids),
+            AlumniImportJob.status.in_([ImportJobStatus.QUEUED, ImportJobStatus.RUNNING])
+        )
+        .values(heartbeat_at=_utcnow())
+    )
+    db.commit()
+    return result.rowcount
+
+
+def fail_stale_jobs(db: Session, stale_seconds: float = IMPORT_JOB_STALE_SECONDS) -> int:
+    """
+    Mark queued and running jobs whose heartbeat is older than stale_seconds
+    as failed: the process that owned them is gone, and so are its queue and
+    the uploaded file. Jobs of live processes keep a fresh heartbeat.
+
+    Returns:
+        Number of jobs marked failed
+    """
+    cutoff = _utcnow() - timedelta(seconds=stale_seconds)
+    last_seen = func.coalesce(AlumniImportJob.heartbeat_at, AlumniImportJob.created_at)
+    result = db.execute(
+        update(AlumniImportJob)
+        .where(
+            AlumniImportJob.status.in_([ImportJobStatus.QUEUED, ImportJobStatus.RUNNING]),
+            last_seen < cutoff
+        )
+        .values(
+            status=ImportJobStatus.FAILED,
+            error=IMPORT_JOB_INTERRUPTED_ERROR,
+            finished_at=_utcnow()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    if result.rowcount:
+        logger.warning(f"Marked {result.rowcount} abandoned alumni import jobs as failed")
+    return result.rowcount
+
+
+def _monitor_with_new_session():
+    db = SessionLocal()
+    try:
+        heartbeat_import_jobs(db)
+        return fail_stale_jobs(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_import_job_monitor(interval: float = IMPORT_JOB_HEARTBEAT_INTERVAL):
+    """
+    Heartbeat and stale-job loop; started from the app lifespan and
+    cancelled on shutdown. Every worker runs it, so abandoned jobs are
+    failed even if no process restarts.
+    """
+    while True:
+        try:
+            await run_in_threadpool(_monitor_with_new_session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Alumni import job monitor failed: {e}")
+
+        await asyncio.sleep(interval)
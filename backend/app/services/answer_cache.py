@@ -0,0 +1,157 @@
+"""
+Answer Cache for the Knowledge Base Chat
+
+Most chat traffic is FAQ-style, so the same question is asked over and over
+against the same retrieved context. Answers are cached in process:
+- Keyed on the normalized question, the retrieved chunk IDs and the knowledge
+  base version, so any document upload/delete naturally misses the old entries
+- Entries expire after a TTL and the least recently used are evicted beyond
+  a size limit
+- Concurrent identical questions share a single in-flight LLM call
+"""
+
+import os
+import re
+import time
+import asyncio
+import hashlib
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1024"))
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    question = re.sub(r'\s+', ' ', question.lower()).strip()
+    return question.rstrip('?!. ')
+
+
+def answer_cache_key(question: str, university_id: str, kb_version: int, chunk_ids: List[str]) -> str:
+    """
+    Build the cache key for a question.
+
+    Args:
+        question: User's question (normalized here)
+        university_id: University whose knowledge base answered it
+        kb_version: KnowledgeBase.version the chunks were retrieved from
+        chunk_ids: IDs of the retrieved chunks, in rank order
+
+    Returns:
+        Hex digest identifying the answer
+    """
+    raw = "\x1f".join([university_id, str(kb_version), normalize_question(question), *chunk_ids])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# ==============================================================================
+# CACHE
+# ==============================================================================
+
+class AnswerCache:
+    """
+    TTL + LRU cache of generated answers with single-flight loading.
+
+    Only used from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, ttl_seconds: int = ANSWER_CACHE_TTL_SECONDS, max_entries: int = ANSWER_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires at, answer)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a fresh cached answer, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, answer = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return answer
+
+    def set(self, key: str, answer: str):
+        """Store an answer, evicting the least recently used entries beyond max_entries."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all cached answers (in-flight calls are unaffected)."""
+        self._entries.clear()
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Return the cached answer for key, computing it at most once.
+
+        Callers arriving while the answer is being computed await the same
+        call. A None result (e.g. the LLM was unavailable) is shared with
+        those callers but not cached.
+
+        Args:
+            key: Cache key from answer_cache_key
+            compute: Coroutine factory producing the answer
+
+        Returns:
+            The answer, or None if compute returned None
+        """
+        answer = self.get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            answer = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception with no waiters isn't logged as unhandled
+            future.exception()
+            raise
+        else:
+            if answer is not None:
+                self.set(key, answer)
+            future.set_result(answer)
+            return answer
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict:
+        """Counters for the status endpoint."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+# Global instance shared by the chat endpoint
+answer_cache = AnswerCache()
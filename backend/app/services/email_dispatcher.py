@@ -0,0 +1,268 @@
+"""
+Background dispatcher for the email outbox
+
+Runs as an asyncio task for the lifetime of the app and, every
+EMAIL_DISPATCH_INTERVAL seconds (or right away while there is a backlog):
+- Claims due outbox rows (FOR UPDATE SKIP LOCKED on Postgres, so several
+  app instances can run a dispatcher without sending an email twice)
+- Takes at most what each university's rate limit allows
+- Sends emails from the same sender together as one Brevo batch request
+- Marks them sent, or schedules a retry with exponential backoff; after
+  EMAIL_MAX_ATTEMPTS (or a permanent error) the email is marked failed
+
+Bodies may hold plaintext credentials, so they are cleared when a row is
+marked sent or failed, and purge_email_outbox (run every
+EMAIL_PURGE_INTERVAL seconds) deletes finished rows older than
+EMAIL_OUTBOX_RETENTION_DAYS.
+
+The HTTP work runs on a worker thread, so the event loop is never blocked.
+"""
+
+import os
+import time
+import asyncio
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.email_outbox import EmailOutbox, EmailStatus
+from app.services.email_service import EmailService, BrevoError
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+EMAIL_DISPATCH_INTERVAL = float(os.getenv("EMAIL_DISPATCH_INTERVAL", "5"))
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "100"))  # Rows claimed per round
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "6"))
+EMAIL_RETRY_BASE_SECONDS = 30  # 30s, 1m, 2m, 4m, ... capped below
+EMAIL_RETRY_MAX_SECONDS = 3600
+# Emails per minute per university (bursts up to one minute's worth)
+EMAIL_RATE_PER_MINUTE = int(os.getenv("EMAIL_RATE_PER_MINUTE", "120"))
+# Sent and failed rows are kept this long (without bodies) for troubleshooting
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", "30"))
+EMAIL_PURGE_INTERVAL = 3600
+
+
+class RateLimiter:
+    """Token bucket per key (university ID), refilled continuously."""
+
+    def __init__(self, per_minute: int = EMAIL_RATE_PER_MINUTE):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._buckets: Dict[Optional[str], Tuple[float, float]] = {}  # key -> (tokens, updated at)
+
+    def available(self, key: Optional[str]) -> int:
+        """Number of emails that may be sent for key right now."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (self.capacity, now))
+        tokens = min(self.capacity, tokens + (now - updated_at) * self.rate)
+        self._buckets[key] = (tokens, now)
+        return int(tokens)
+
+    def consume(self, key: Optional[str], count: int):
+        tokens, updated_at = self._buckets.get(key, (self.capacity, time.monotonic()))
+        self._buckets[key] = (tokens - count, updated_at)
+
+
+def retry_delay(attempts: int) -> timedelta:
+    """Backoff before the next attempt after `attempts` failed ones."""
+    return timedelta(seconds=min(EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), EMAIL_RETRY_MAX_SECONDS))
+
+
+# ==============================================================================
+# DISPATCH
+# ==============================================================================
+
+_services: Dict[Tuple[str, Optional[str]], EmailService] = {}
+
+
+def _get_service(from_email: str, from_name: Optional[str]) -> EmailService:
+    """One EmailService per sender, reused across rounds."""
+    key = (from_email, from_name)
+    if key not in _services:
+        _services[key] = EmailService(from_email=from_email, from_name=from_name)
+    return _services[key]
+
+
+def _claim_due_emails(db: Session, limit: int) -> List[EmailOutbox]:
+    return db.scalars(
+        select(EmailOutbox)
+        .where(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= func.now())
+        .order_by(EmailOutbox.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+
+def _clear_bodies(email: EmailOutbox):
+    """Drop the content of a finished email; it may contain a password."""
+    email.text_body = None
+    email.html_body = None
+
+
+def _mark_failed_attempt(email: EmailOutbox, error: BrevoError, now: datetime):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if not error.retryable or email.attempts >= EMAIL_MAX_ATTEMPTS:
+        email.status = EmailStatus.FAILED
+        _clear_bodies(email)
+        logger.error(f"Giving up on email {email.id} to {email.to_email}: {error}")
+    else:
+        email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def _send_group(emails: List[EmailOutbox], now: datetime):
+    """Send emails that share a sender, in one batch request where possible."""
+    service = _get_service(emails[0].from_email, emails[0].from_name)
+    messages = [
+        {"to_email": email.to_email, "subject": email.subject, "body": email.text_body, "html_body": email.html_body}
+        for email in emails
+    ]
+
+    try:
+        message_ids = service.send_batch(messages)
+    except BrevoError as e:
+        if len(emails) > 1 and not e.retryable:
+            # One bad message rejects the whole batch: retry them one by one
+            for email in emails:
+                _send_group([email], now)
+            return
+        for email in emails:
+            _mark_failed_attempt(email, e, now)
+        return
+
+    for index, email in enumerate(emails):
+        email.status = EmailStatus.SENT
+        email.attempts += 1
+        email.sent_at = now
+        email.last_error = None
+        email.message_id = message_ids[index] if index < len(message_ids) else None
+        _clear_bodies(email)
+
+
+def dispatch_once(limiter: RateLimiter, batch_size: int = EMAIL_BATCH_SIZE) -> int:
+    """
+    Send one round of due emails.
+
+    The claimed rows stay locked until the round commits, so another
+    dispatcher skips them; emails over a university's rate limit are left
+    pending for a later round.
+
+    Returns:
+        Number of emails claimed and processed
+    """
+    db = SessionLocal()
+    try:
+        due = _claim_due_emails(db, batch_size)
+        if not due:
+            db.rollback()
+            return 0
+
+        # Apply the per-university rate limit
+        allowed: Dict[Optional[str], int] = {}
+        selected = []
+        for email in due:
+            key = email.university_id
+            if key not in allowed:
+                allowed[key] = limiter.available(key)
+            if allowed[key] > 0:
+                allowed[key] -= 1
+                selected.append(email)
+
+        # Group by sender; Brevo batches share one sender
+        groups = defaultdict(list)
+        for email in selected:
+            groups[(email.from_email, email.from_name)].append(email)
+
+        now = datetime.now(timezone.utc)
+        for emails in groups.values():
+            _send_group(emails, now)
+
+        for key in allowed:
+            limiter.consume(key, sum(1 for email in selected if email.university_id == key))
+
+        db.commit()
+        sent = sum(1 for email in selected if email.status == EmailStatus.SENT)
+        if selected:
+            logger.info(f"Email dispatcher: {sent}/{len(selected)} emails sent")
+        return len(selected)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def purge_email_outbox(db: Session, retention_days: int = EMAIL_OUTBOX_RETENTION_DAYS) -> int:
+    """
+    Delete sent and failed emails older than retention_days, and clear any
+    bodies still stored on finished rows (rows from before bodies were
+    cleared on completion).
+
+    Returns:
+        Number of rows deleted
+    """
+    finished = EmailOutbox.status.in_([EmailStatus.SENT, EmailStatus.FAILED])
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+    result = db.execute(delete(EmailOutbox).where(finished, EmailOutbox.created_at < cutoff))
+    db.execute(
+        update(EmailOutbox)
+        .where(finished, EmailOutbox.text_body.isnot(None) | EmailOutbox.html_body.isnot(None))
+        .values(text_body=None, html_body=None)
+    )
+    db.commit()
+
+    if result.rowcount:
+        logger.info(f"Purged {result.rowcount} finished emails from the outbox")
+    return result.rowcount
+
+
+def _purge_with_new_session():
+    db = SessionLocal()
+    try:
+        return purge_email_outbox(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_email_dispatcher(interval: float = EMAIL_DISPATCH_INTERVAL):
+    """Dispatch loop; started from the app lifespan and cancelled on shutdown."""
+    limiter = RateLimiter()
+    logger.info("Email dispatcher started")
+    last_purge = None
+
+    while True:
+        if last_purge is None or time.monotonic() - last_purge >= EMAIL_PURGE_INTERVAL:
+            last_purge = time.monotonic()
+            try:
+                await run_in_threadpool(_purge_with_new_session)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Email outbox purge failed: {e}")
+
+        try:
+            processed = await run_in_threadpool(dispatch_once, limiter)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Email dispatcher error: {e}")
+            processed = 0
+
+        # Keep draining while a full round was processed
+        if processed < EMAIL_BATCH_SIZE:
+            await asyncio.sleep(interval)
+
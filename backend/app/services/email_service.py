@@ -1,10 +1,16 @@
 """
 Email service for sending emails via Brevo HTTP API
 Render blocks SMTP ports, so we use HTTP API instead
+
+The send_*_email helpers queue the email in the email_outbox table and
+return immediately; the email dispatcher (app.services.email_dispatcher)
+delivers queued emails in the background. send_email / send_batch talk to
+Brevo directly over a pooled HTTP session.
 """
 import os
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import List, Optional
 import logging
 
 from app.core.config import settings
@@ -13,16 +19,48 @@ logger = logging.getLogger(__name__)
 
 # Brevo API endpoint
 BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
+BREVO_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+_http_session: Optional[requests.Session] = None
+
+
+def get_http_session() -> requests.Session:
+    """Process-wide HTTP session so connections to Brevo are reused."""
+    global _http_session
+    
+    if _http_session is None:
+        _http_session = requests.Session()
+        _http_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=10))
+    return _http_session
+
+
+class BrevoError(Exception):
+    """Brevo rejected a request or could not be reached."""
+    
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+    
+    @property
+    def retryable(self) -> bool:
+        """Network errors, rate limiting and server errors are worth retrying."""
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
 
 
 class EmailService:
     """Service for sending emails via Brevo HTTP API (works on Render!)"""
     
-    def __init__(self, api_key=None, from_email=None, from_name=None):
+    def __init__(self, api_key=None, from_email=None, from_name=None, university_id=None, db=None):
         """
         Initialize email service with Brevo API settings.
         If no settings provided, uses global settings from config/env.
+        
+        Queued emails are tagged with university_id (for per-university rate
+        limiting). If db is given they are added to that session and committed
+        with the caller's transaction; otherwise each is committed on its own.
         """
+        self.university_id = university_id
+        self.db = db
         try:
             self.api_key = api_key or os.getenv('BREVO_API_KEY') or getattr(settings, 'BREVO_API_KEY', None)
             self.from_email = from_email or os.getenv('SMTP_FROM_EMAIL') or os.getenv('BREVO_FROM_EMAIL') or getattr(settings, 'SMTP_FROM_EMAIL', None) or 'noreply@alumni-portal.com'
@@ -43,17 +81,125 @@ class EmailService:
             self.enabled = False
     
     @classmethod
-    def from_university(cls, university):
+    def from_university(cls, university, db=None):
         """
         Create EmailService instance from University model.
         Falls back to global settings if university doesn't have email configured.
         """
         # For now, all universities use the global Brevo API key
         # University-specific from_email can be supported later
+        university_id = university.id if university else None
         if university and university.email:
-            return cls(from_email=university.email, from_name=university.name)
+            return cls(from_email=university.email, from_name=university.name, university_id=university_id, db=db)
         # Fall back to global settings
-        return cls()
+        return cls(university_id=university_id, db=db)
+    
+    def _headers(self) -> dict:
+        return {
+            "accept": "application/json",
+            "api-key": self.api_key,
+            "content-type": "application/json"
+        }
+    
+    def _post(self, payload: dict) -> dict:
+        """
+        POST a payload to Brevo over the pooled session.
+        
+        Returns: the parsed response body
+        Raises: BrevoError on a non-2xx response or a network error
+        """
+        try:
+            response = get_http_session().post(
+                BREVO_API_URL,
+                headers=self._headers(),
+                json=payload,
+                timeout=BREVO_TIMEOUT
+            )
+        except requests.exceptions.RequestException as e:
+            raise BrevoError(f"Request error: {str(e)}")
+        
+        if response.status_code not in [200, 201, 202]:
+            raise BrevoError(f"Brevo API error: {response.status_code} - {response.text}", response.status_code)
+        
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+    
+    def send_batch(self, messages: List[dict]) -> List[str]:
+        """
+        Send several emails from this sender in one Brevo request.
+        
+        Each message is a dict with to_email, subject, body and optional
+        html_body; they are sent as Brevo messageVersions (max 1000).
+        
+        Returns: Brevo message IDs
+        Raises: BrevoError if the request failed (no email was sent)
+        """
+        first = messages[0]
+        payload = {
+            "sender": {
+                "name": self.from_name,
+                "email": self.from_email
+            },
+            "subject": first["subject"],
+            "textContent": first["body"],
+            "messageVersions": []
+        }
+        if any(message.get("html_body") for message in messages):
+            payload["htmlContent"] = first.get("html_body") or first["body"]
+        
+        for message in messages:
+            version = {
+                "to": [{"email": message["to_email"]}],
+                "subject": message["subject"],
+                "textContent": message["body"]
+            }
+            if "htmlContent" in payload:
+                version["htmlContent"] = message.get("html_body") or message["body"]
+            payload["messageVersions"].append(version)
+        
+        result = self._post(payload)
+        return result.get("messageIds") or ([result["messageId"]] if result.get("messageId") else [])
+    
+    def queue_email(
+        self,
+        to_email: str,
+        subject: str,
+        body: str,
+        html_body: Optional[str] = None
+    ) -> bool:
+        """Queue an email in the outbox for the background dispatcher"""
+        if not self.enabled:
+            logger.warning(f"Brevo API not configured (BREVO_API_KEY missing). Email to {to_email} not queued.")
+            return False
+        
+        from app.models.email_outbox import EmailOutbox
+        
+        email = EmailOutbox(
+            university_id=self.university_id,
+            to_email=to_email,
+            from_email=self.from_email,
+            from_name=self.from_name,
+            subject=subject,
+            text_body=body,
+            html_body=html_body
+        )
+        
+        if self.db is not None:
+            self.db.add(email)
+        else:
+            from app.core.database import SessionLocal
+            
+            db = SessionLocal()
+            try:
+                db.add(email)
+                db.commit()
+            finally:
+                db.close()
+        
+        logger.info(f"Email to {to_email} queued")
+        return True
     
     def send_email(
         self,
@@ -73,12 +219,6 @@ class EmailService:
         try:
             print(f"📤 Sending email to {to_email} via Brevo API...")
             
-            headers = {
-                "accept": "application/json",
-                "api-key": self.api_key,
-                "content-type": "application/json"
-            }
-            
             payload = {
                 "sender": {
                     "name": self.from_name,
@@ -97,29 +237,14 @@ class EmailService:
             if html_body:
                 payload["htmlContent"] = html_body
 
-            response = requests.post(
-                BREVO_API_URL,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code in [200, 201]:
-                print(f"✅ Email sent successfully to {to_email}")
-                logger.info(f"Email sent successfully to {to_email} via Brevo API")
-                return True
-            else:
-                print(f"❌ Brevo API error: {response.status_code} - {response.text}")
-                logger.error(f"Brevo API error: {response.status_code} - {response.text}")
-                return False
+            self._post(payload)
+            print(f"✅ Email sent successfully to {to_email}")
+            logger.info(f"Email sent successfully to {to_email} via Brevo API")
+            return True
                 
-        except requests.exceptions.Timeout:
-            print(f"❌ Timeout sending email to {to_email}")
-            logger.error(f"Timeout sending email to {to_email}")
-            return False
-        except requests.exceptions.RequestException as e:
-            print(f"❌ Request error sending email to {to_email}: {str(e)}")
-            logger.error(f"Request error sending email to {to_email}: {str(e)}")
+        except BrevoError as e:
+            print(f"❌ Error sending email to {to_email}: {str(e)}")
+            logger.error(f"Error sending email to {to_email}: {str(e)}")
             return False
         except Exception as e:
             print(f"❌ Error sending email to {to_email}: {str(e)}")
@@ -207,7 +332,7 @@ Alumni Portal Team
 </html>
 """
         
-        return self.send_email(to_email, subject, body, html_body)
+        return self.queue_email(to_email, subject, body, html_body)
 
     def send_admin_credentials_email(
         self,
@@ -301,7 +426,7 @@ Alumni Portal Team
 </html>
 """
         
-        return self.send_email(to_email, subject, body, html_body)
+        return self.queue_email(to_email, subject, body, html_body)
 
     def send_password_reset_approved_email(
         self,
@@ -376,7 +501,7 @@ Alumni Portal Team
 </html>
 """
         
-        return self.send_email(to_email, subject, body, html_body)
+        return self.queue_email(to_email, subject, body, html_body)
 
     def send_password_reset_rejected_email(
         self,
@@ -435,7 +560,7 @@ Alumni Portal Team
 </html>
 """
         
-        return self.send_email(to_email, subject, body, html_body)
+        return self.queue_email(to_email, subject, body, html_body)
 
 
 # Create singleton instance
@@ -0,0 +1,167 @@
+"""
+Fundraiser click analytics
+
+The admin dashboard shows total and unique clicks plus a 30-day series per
+fundraiser. Daily counts come from the fundraiser_click_daily rollup:
+- record_click adds one to today's row in the same transaction as the click
+- backfill_fundraiser_click_daily rebuilds rows set-wise from
+  fundraiser_clicks (on first start, and on demand from the admin API)
+
+Every query here takes a list of fundraiser IDs and returns results for all
+of them from one grouped statement. Unique clicks are distinct users, which
+do not add up across days, so they are counted from fundraiser_clicks
+(covered by ix_fundraiser_clicks_user).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, delete, insert, func, distinct
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.fundraiser import FundraiserClick, FundraiserClickDaily
+
+logger = logging.getLogger(__name__)
+
+
+# ==============================================================================
+# ROLLUP MAINTENANCE
+# ==============================================================================
+
+def record_click(db: Session, fundraiser_id: str):
+    """Count a new click in today's rollup row (not committed)."""
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    # current_date, like date(clicked_at) in the backfill, uses the database's clock and time zone
+    statement = dialect_insert(FundraiserClickDaily).values(
+        fundraiser_id=fundraiser_id,
+        day=func.current_date(),
+        clicks=1
+    )
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[FundraiserClickDaily.fundraiser_id, FundraiserClickDaily.day],
+        set_={"clicks": FundraiserClickDaily.clicks + 1}
+    ))
+
+
+def backfill_fundraiser_click_daily(db: Session, fundraiser_ids: Optional[List[str]] = None) -> int:
+    """
+    Rebuild rollup rows from fundraiser_clicks (one DELETE and one
+    INSERT ... SELECT ... GROUP BY), for the given fundraisers or all of them.
+    
+    Returns:
+        Number of rollup rows written
+    """
+    clear = delete(FundraiserClickDaily)
+    per_day = select(
+        FundraiserClick.fundraiser_id,
+        func.date(FundraiserClick.clicked_at).label("day"),
+        func.count(FundraiserClick.id)
+    ).group_by(FundraiserClick.fundraiser_id, func.date(FundraiserClick.clicked_at))
+    
+    if fundraiser_ids is not None:
+        clear = clear.where(FundraiserClickDaily.fundraiser_id.in_(fundraiser_ids))
+        per_day = per_day.where(FundraiserClick.fundraiser_id.in_(fundraiser_ids))
+    
+    db.execute(clear)
+    result = db.execute(insert(FundraiserClickDaily).from_select(["fundraiser_id", "day", "clicks"], per_day))
+    db.commit()
+    
+    logger.info(f"Backfilled {result.rowcount} fundraiser click rollup rows")
+    return result.rowcount
+
+
+def backfill_if_empty(db: Session) -> int:
+    """Build the rollup on first start (the table is new but clicks may not be)."""
+    rollup_empty = db.scalar(select(FundraiserClickDaily.fundraiser_id).limit(1)) is None
+    has_clicks = db.scalar(select(FundraiserClick.id).limit(1)) is not None
+    if rollup_empty and has_clicks:
+        return backfill_fundraiser_click_daily(db)
+    return 0
+
+
+# ==============================================================================
+# QUERIES
+# ==============================================================================
+
+def get_click_stats(db: Session, fundraiser_ids: List[str]) -> Dict[str, Tuple[int, int]]:
+    """(total clicks, unique users) per fundraiser ID, zero for those without clicks."""
+    stats = {fundraiser_id: (0, 0) for fundraiser_id in fundraiser_ids}
+    if not fundraiser_ids:
+        return stats
+    
+    totals = dict(db.execute(
+        select(FundraiserClickDaily.fundraiser_id, func.sum(FundraiserClickDaily.clicks))
+        .where(FundraiserClickDaily.fundraiser_id.in_(fundraiser_ids))
+        .group_by(FundraiserClickDaily.fundraiser_id)
+    ).all())
+    uniques = dict(db.execute(
+        select(FundraiserClick.fundraiser_id, func.count(distinct(FundraiserClick.user_id)))
+        .where(FundraiserClick.fundraiser_id.in_(fundraiser_ids), FundraiserClick.user_id.isnot(None))
+        .group_by(FundraiserClick.fundraiser_id)
+    ).all())
+    
+    for fundraiser_id in fundraiser_ids:
+        stats[fundraiser_id] = (int(totals.get(fundraiser_id) or 0), uniques.get(fundraiser_id, 0))
+    return stats
+
+
+def get_daily_clicks(
+    db: Session,
+    fundraiser_ids: List[str],
+    days: int = 30,
+    include_empty_days: bool = False
+) -> Dict[str, List[dict]]:
+    """
+    Clicks per day over the last `days` days (oldest first) for each
+    fundraiser, as [{"date": "2025-01-01", "clicks": 10}, ...].
+    
+    Days without clicks are left out unless include_empty_days is set.
+    """
+    if not fundraiser_ids:
+        return {}
+    
+    # The database's date, which record_click and the backfill also use
+    today = db.scalar(select(func.current_date()))
+    if isinstance(today, str):  # SQLite returns text
+        today = date.fromisoformat(today)
+    start = today - timedelta(days=days - 1)
+    counts = defaultdict(dict)
+    for fundraiser_id, day, clicks in db.execute(
+        select(FundraiserClickDaily.fundraiser_id, FundraiserClickDaily.day, FundraiserClickDaily.clicks)
+        .where(
+            FundraiserClickDaily.fundraiser_id.in_(fundraiser_ids),
+            FundraiserClickDaily.day >= start,
+            FundraiserClickDaily.day <= today
+        )
+    ):
+        counts[fundraiser_id][day] = clicks
+    
+    window = [start + timedelta(days=i) for i in range(days)]
+    series = {}
+    for fundraiser_id in fundraiser_ids:
+        by_day = counts.get(fundraiser_id, {})
+        series[fundraiser_id] = [
+            {"date": day.isoformat(), "clicks": by_day.get(day, 0)}
+            for day in window
+            if include_empty_days or by_day.get(day)
+        ]
+    return series
+
+
+def get_university_click_totals(db: Session, fundraiser_ids: List[str]) -> Tuple[int, int]:
+    """(total clicks, unique users) across a set of fundraisers."""
+    if not fundraiser_ids:
+        return 0, 0
+    
+    total = db.scalar(
+        select(func.coalesce(func.sum(FundraiserClickDaily.clicks), 0))
+        .where(FundraiserClickDaily.fundraiser_id.in_(fundraiser_ids))
+    )
+    unique = db.scalar(
+        select(func.count(distinct(FundraiserClick.user_id)))
+        .where(FundraiserClick.fundraiser_id.in_(fundraiser_ids), FundraiserClick.user_id.isnot(None))
+    )
+    return int(total or 0), unique or 0
@@ -0,0 +1,299 @@
+"""
+Image derivative pipeline for post media
+
+When an image is uploaded, resized copies (DERIVATIVE_WIDTHS) are produced
+in WebP and in the original's format on a small worker pool, off the request
+path. Each derivative is stored next to the original (S3 when configured,
+otherwise the media storage backend) and recorded as a MediaDerivative row
+keyed by the original's URL, so posts referencing that URL can expose a
+srcset and a thumbnail without any change to how posts are created.
+
+Pillow is optional: without it uploads work as before, just without derivatives.
+"""
+import os
+import io
+import uuid
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.logging import logger
+from app.models.media import Media, MediaDerivative
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - depends on the deployment
+    Image = None
+
+# Widths (px) generated for every uploaded image that is wider
+DERIVATIVE_WIDTHS = (320, 640, 1080)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+# Pillow releases the GIL while decoding / resizing / encoding, so threads scale
+DERIVATIVE_WORKERS = int(os.getenv("IMAGE_DERIVATIVE_WORKERS", "2"))
+
+_derivative_executor = ThreadPoolExecutor(max_workers=DERIVATIVE_WORKERS, thread_name_prefix="image-derivatives")
+
+
+def is_available() -> bool:
+    """True if Pillow is installed and derivatives can be generated."""
+    return Image is not None
+
+
+@dataclass
+class ImageSources:
+    """Responsive image URLs for one original."""
+    srcset: Optional[str] = None  # WebP variants, "url 320w, url 640w, ..."
+    srcset_fallback: Optional[str] = None  # Same widths in the original format
+    thumbnail_url: Optional[str] = None  # Smallest variant
+
+
+# ==============================================================================
+# RENDERING
+# ==============================================================================
+
+def render_derivatives(source: BinaryIO, widths: Iterable[int] = DERIVATIVE_WIDTHS) -> List[Tuple[str, int, int, bytes]]:
+    """
+    Resize an image to each width narrower than the original and encode it.
+    
+    Images narrower than every width get a single re-encoded copy at their
+    own width, so the feed still receives a compact WebP.
+    
+    Returns:
+        List of (format, width, height, encoded bytes)
+    """
+    image = Image.open(source)
+    widths = sorted(widths)
+    
+    # Let the JPEG decoder downscale while decoding when the largest target is small
+    image.draft("RGB", (widths[-1], widths[-1]))
+    image = ImageOps.exif_transpose(image)
+    
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    fallback_format = "png" if has_alpha else "jpeg"
+    
+    targets = [width for width in widths if width < image.width] or [image.width]
+    
+    derivatives = []
+    for width in targets:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        
+        webp = io.BytesIO()
+        resized.save(webp, "WEBP", quality=WEBP_QUALITY, method=4)
+        derivatives.append(("webp", width, height, webp.getvalue()))
+        
+        fallback = io.BytesIO()
+        if fallback_format == "jpeg":
+            resized.save(fallback, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            resized.save(fallback, "PNG", optimize=True)
+        derivatives.append((fallback_format, width, height, fallback.getvalue()))
+    
+    return derivatives
+
+
+# ==============================================================================
+# STORAGE
+# ==============================================================================
+
+def _store_derivative(data: bytes, image_format: str, name: str) -> str:
+    """Store one derivative and return its public URL."""
+    from app.services.s3_service import s3_service
+    
+    content_type = f"image/{image_format}"
+    
+    if s3_service.is_configured():
+        key = f"alumni-portal/images/derivatives/{name}.{image_format}"
+        s3_service.s3_client.put_object(
+            Bucket=s3_service.bucket_name,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl="public, max-age=31536000, immutable"
+        )
+        return s3_service._get_public_url(key)
+    
+    # Same fallback as the original upload: media storage backend + Media row
+    from app.core.database import SessionLocal
+    from app.services.media_storage import get_media_storage, media_storage_key
+    
+    storage = get_media_storage()
+    media_id = str(uuid.uuid4())
+    storage_key = media_storage_key(media_id)
+    size, etag = storage.save(storage_key, io.BytesIO(data), content_type)
+    
+    db = SessionLocal()
+    try:
+        db.add(Media(
+            id=media_id,
+            filename=f"{name}.{image_format}",
+            content_type=content_type,
+            file_size=size,
+            storage_backend=storage.name,
+            storage_key=storage_key,
+            etag=etag
+        ))
+        db.commit()
+    finally:
+        db.close()
+    
+    base_url = os.getenv("API_BASE_URL", "https://alumni-portal-yw7q.onrender.com")
+    return f"{base_url}/api/v1/feed/posts/media/{media_id}"
+
+
+def generate_derivatives(source_url: str, path: str):
+    """
+    Worker job: render, store and record all derivatives of one image.
+    Deletes the temporary copy at `path` when done.
+    """
+    from app.core.database import SessionLocal
+    
+    try:
+        with open(path, "rb") as source:
+            derivatives = render_derivatives(source)
+        
+        name = uuid.uuid4().hex
+        rows = []
+        for image_format, width, height, data in derivatives:
+            url = _store_derivative(data, image_format, f"{name}_w{width}")
+            rows.append(MediaDerivative(
+                source_url=source_url,
+                url=url,
+                format=image_format,
+                width=width,
+                height=height,
+                file_size=len(data)
+            ))
+        
+        db = SessionLocal()
+        try:
+            db.add_all(rows)
+            db.commit()
+        finally:
+            db.close()
+        
+        logger.info(f"Generated {len(rows)} image derivatives for {source_url}")
+    except Exception as e:
+        logger.error(f"Could not generate image derivatives for {source_url}: {e}")
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def _copy_to_tempfile(fileobj: BinaryIO) -> str:
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="derivative-", delete=False) as tmp:
+        shutil.copyfileobj(fileobj, tmp)
+        return tmp.name
+
+
+async def schedule_image_derivatives(source_url: str, file: UploadFile) -> bool:
+    """
+    Queue derivative generation for an uploaded image.
+    
+    The upload's spool file is copied to a temporary file (it is closed when
+    the request ends) and the rest happens on the worker pool.
+    
+    Returns:
+        True if the job was queued
+    """
+    if not is_available():
+        return False
+    
+    try:
+        path = await run_in_threadpool(_copy_to_tempfile, file.file)
+    except Exception as e:
+        logger.error(f"Could not queue image derivatives for {source_url}: {e}")
+        return False
+    
+    _derivative_executor.submit(generate_derivatives, source_url, path)
+    return True
+
+
+def _generate_s3_derivatives(source_url: str, key: str):
+    """Worker job: download an object uploaded directly to S3, then derive it."""
+    from app.services.s3_service import s3_service
+    
+    with tempfile.NamedTemporaryFile(prefix="derivative-", delete=False) as tmp:
+        path = tmp.name
+        try:
+            s3_service.s3_client.download_fileobj(s3_service.bucket_name, key, tmp)
+        except Exception as e:
+            logger.error(f"Could not download {key} for image derivatives: {e}")
+            tmp.close()
+            os.unlink(path)
+            return
+    
+    generate_derivatives(source_url, path)
+
+
+def schedule_s3_image_derivatives(source_url: str, key: str) -> bool:
+    """
+    Queue derivative generation for an image uploaded straight to S3
+    (presigned upload); the object is downloaded on the worker pool.
+    
+    Returns:
+        True if the job was queued
+    """
+    if not is_available():
+        return False
+    
+    _derivative_executor.submit(_generate_s3_derivatives, source_url, key)
+    return True
+
+
+# ==============================================================================
+# LOOKUP
+# ==============================================================================
+
+async def get_image_sources(urls: Iterable[Optional[str]], db: AsyncSession) -> Dict[str, ImageSources]:
+    """
+    Responsive image URLs for a batch of originals, in one query.
+    
+    Returns:
+        Original URL -> ImageSources (originals without derivatives are omitted)
+    """
+    urls = {url for url in urls if url}
+    if not urls:
+        return {}
+    
+    derivatives = (await db.scalars(
+        select(MediaDerivative)
+        .where(MediaDerivative.source_url.in_(urls))
+        .order_by(MediaDerivative.source_url, MediaDerivative.width)
+    )).all()
+    
+    by_source: Dict[str, List[MediaDerivative]] = {}
+    for derivative in derivatives:
+        by_source.setdefault(derivative.source_url, []).append(derivative)
+    
+    sources = {}
+    for source_url, variants in by_source.items():
+        webp = [variant for variant in variants if variant.format == "webp"]
+        fallback = [variant for variant in variants if variant.format != "webp"]
+        sources[source_url] = ImageSources(
+            srcset=", ".join(f"{variant.url} {variant.width}w" for variant in webp) or None,
+            srcset_fallback=", ".join(f"{variant.url} {variant.width}w" for variant in fallback) or None,
+            thumbnail_url=(fallback or webp)[0].url
+        )
+    return sources
+
+
+def image_fields(thumbnail_url: Optional[str], sources: Optional[ImageSources]) -> Dict[str, Optional[str]]:
+    """PostResponse image fields; an explicit thumbnail_url wins over the generated one."""
+    return {
+        "thumbnail_url": thumbnail_url or (sources.thumbnail_url if sources else None),
+        "srcset": sources.srcset if sources else None,
+        "srcset_fallback": sources.srcset_fallback if sources else None,
+    }
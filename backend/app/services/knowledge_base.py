@@ -7,18 +7,31 @@ Documents can be loaded from:
 2. S3 bucket via CloudFront URL (stored in database)
 
 Features:
-- Supports multiple universities
+- Supports multiple universities (one lazily loaded knowledge base per tenant)
 - S3 document storage with CloudFront CDN
-- Simple keyword matching for retrieval (can upgrade to vector search)
+- BM25 retrieval over an inverted index built once at load time
+- Optional semantic / hybrid retrieval via the in-process vector engine (semantic_search.py)
 - In-memory caching of document chunks
 """
 
 import os
 import re
+import json
+import math
+import mmap
+import heapq
+import struct
+import hashlib
+import threading
 import requests
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,19 +40,62 @@ logger = logging.getLogger(__name__)
 # CONSTANTS - Hardcoded for MVP
 # ==============================================================================
 
-# DUMMY: Single university hardcoded
+# Default university, loaded at startup and never evicted
 UNIVERSITY_ID = "mit"
 UNIVERSITY_NAME = "Massachusetts Institute of Technology"
 
 # Path to knowledge base folder (relative to backend directory)
 # On Render, this will be: /opt/render/project/src/backend/data/knowledge_base/mit/
 BASE_DIR = Path(__file__).resolve().parent.parent.parent  # backend/
-KNOWLEDGE_BASE_PATH = BASE_DIR / "data" / "knowledge_base" / UNIVERSITY_ID
+KNOWLEDGE_BASE_ROOT = BASE_DIR / "data" / "knowledge_base"
+KNOWLEDGE_BASE_PATH = KNOWLEDGE_BASE_ROOT / UNIVERSITY_ID
+
+# On-disk snapshot of chunks and term counts, reused across restarts
+SNAPSHOT_PATH = KNOWLEDGE_BASE_ROOT / f"{UNIVERSITY_ID}.kbsnap"
+SNAPSHOT_MAGIC = b"KBSNAP"
+SNAPSHOT_VERSION = 1  # Bump when the record layout, chunking or tokenization changes
+SNAPSHOT_HEADER = struct.Struct("<6sHQQ")  # magic, version, manifest offset, manifest length
+
+# Estimated memory all loaded tenants may use before cold ones are evicted
+KB_MEMORY_BUDGET_BYTES = int(os.getenv("KB_MEMORY_BUDGET_MB", "256")) * 1024 * 1024
+
+# S3 ingestion settings
+S3_FETCH_WORKERS = 8  # Concurrent document downloads
+S3_FETCH_TIMEOUT = (5, 30)  # Connect / read timeout in seconds
+S3_FETCH_RETRIES = 3  # Retries per document, with exponential backoff
 
 # Chunking settings
 CHUNK_SIZE = 500  # Characters per chunk
 CHUNK_OVERLAP = 50  # Overlap between chunks for context continuity
 
+# BM25 ranking parameters
+BM25_K1 = 1.5  # Term frequency saturation
+BM25_B = 0.75  # Chunk length normalization
+
+# Retrieval mode used when callers don't pick one: bm25, keyword, semantic or hybrid
+KB_RETRIEVAL_MODE = os.getenv("KB_RETRIEVAL_MODE", "bm25")
+HYBRID_SEMANTIC_WEIGHT = 0.5  # Share of the semantic score in hybrid ranking
+HYBRID_CANDIDATES = 4  # Each ranker contributes top_k * this many candidates
+
+TOKEN_PATTERN = re.compile(r'\b\w+\b')
+
+# Common stop words ignored by indexing and keyword scoring
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'shall',
+    'can', 'need', 'to', 'of', 'in', 'for', 'on', 'with', 'at',
+    'by', 'from', 'as', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'between', 'under', 'again',
+    'further', 'then', 'once', 'here', 'there', 'when', 'where',
+    'why', 'how', 'all', 'each', 'few', 'more', 'most', 'other',
+    'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
+    'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if',
+    'or', 'because', 'until', 'while', 'what', 'which', 'who',
+    'this', 'that', 'these', 'those', 'i', 'me', 'my', 'we', 'our',
+    'you', 'your', 'it', 'its', 'they', 'them', 'their'
+})
+
 
 # ==============================================================================
 # DATA CLASSES
@@ -52,11 +108,124 @@ class DocumentChunk:
     document_name: str
     content: str
     university_id: str = UNIVERSITY_ID
+    term_counts: Dict[str, int] = field(default_factory=dict, repr=False)  # keyword -> frequency
     
     def __repr__(self):
         return f"Chunk({self.chunk_id}: {self.content[:50]}...)"
 
 
+@dataclass
+class SearchIndex:
+    """
+    Inverted index over document chunks for BM25 retrieval.
+    
+    Built once from the chunks' precomputed term counts, so a query only
+    touches the postings of its own terms instead of the whole corpus.
+    """
+    postings: Dict[str, Dict[str, int]] = field(default_factory=dict)  # term -> {chunk_id: term frequency}
+    chunks_by_id: Dict[str, DocumentChunk] = field(default_factory=dict)
+    chunk_lengths: Dict[str, int] = field(default_factory=dict)  # chunk_id -> number of indexed terms
+    total_length: int = 0
+    
+    @classmethod
+    def build(cls, chunks: List[DocumentChunk]) -> "SearchIndex":
+        """Build an index from a list of chunks."""
+        return cls().patched([], chunks)
+    
+    def patched(self, removed: List[DocumentChunk], added: List[DocumentChunk]) -> "SearchIndex":
+        """
+        Return a new index with some chunks removed and others added.
+        
+        The current index is left untouched: only the postings of affected
+        terms are copied, so readers holding it keep a consistent view.
+        
+        Args:
+            removed: Chunks to drop
+            added: Chunks to insert
+        
+        Returns:
+            Patched copy of the index
+        """
+        postings = dict(self.postings)
+        chunks_by_id = dict(self.chunks_by_id)
+        chunk_lengths = dict(self.chunk_lengths)
+        total_length = self.total_length
+        copied = set()
+        
+        def term_postings(term: str) -> Dict[str, int]:
+            # Copy a term's postings the first time it is touched
+            if term not in copied:
+                postings[term] = dict(postings.get(term, {}))
+                copied.add(term)
+            return postings.setdefault(term, {})
+        
+        for chunk in removed:
+            if chunk.chunk_id not in chunks_by_id:
+                continue
+            del chunks_by_id[chunk.chunk_id]
+            total_length -= chunk_lengths.pop(chunk.chunk_id)
+            for term in chunk.term_counts:
+                entries = term_postings(term)
+                entries.pop(chunk.chunk_id, None)
+                if not entries:
+                    del postings[term]
+        
+        for chunk in added:
+            length = sum(chunk.term_counts.values())
+            chunks_by_id[chunk.chunk_id] = chunk
+            chunk_lengths[chunk.chunk_id] = length
+            total_length += length
+            for term, frequency in chunk.term_counts.items():
+                term_postings(term)[chunk.chunk_id] = frequency
+        
+        return SearchIndex(
+            postings=postings,
+            chunks_by_id=chunks_by_id,
+            chunk_lengths=chunk_lengths,
+            total_length=total_length
+        )
+    
+    @property
+    def average_length(self) -> float:
+        if not self.chunk_lengths:
+            return 0.0
+        return self.total_length / len(self.chunk_lengths)
+    
+    def search(self, query_terms: List[str], top_k: int) -> List[Tuple[float, DocumentChunk]]:
+        """
+        Score chunks containing any query term with BM25.
+        
+        Args:
+            query_terms: Keywords extracted from the query
+            top_k: Number of results to return
+            
+        Returns:
+            List of (score, chunk), best first
+        """
+        chunk_count = len(self.chunk_lengths)
+        if not chunk_count or not query_terms:
+            return []
+        
+        average_length = self.average_length or 1.0
+        scores: Dict[str, float] = {}
+        
+        for term in set(query_terms):
+            term_postings = self.postings.get(term)
+            if not term_postings:
+                continue
+            
+            idf = math.log(1 + (chunk_count - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+            for chunk_id, frequency in term_postings.items():
+                length_norm = 1 - BM25_B + BM25_B * self.chunk_lengths[chunk_id] / average_length
+                term_score = idf * frequency * (BM25_K1 + 1) / (frequency + BM25_K1 * length_norm)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + term_score
+        
+        return [
+            (score, self.chunks_by_id[chunk_id])
+            for chunk_id, score in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        ]
+
+
 @dataclass
 class KnowledgeBase:
     """
@@ -69,18 +238,205 @@ class KnowledgeBase:
     university_name: str = UNIVERSITY_NAME
     documents: Dict[str, str] = field(default_factory=dict)  # filename -> full content
     chunks: List[DocumentChunk] = field(default_factory=list)
+    document_chunks: Dict[str, List[DocumentChunk]] = field(default_factory=dict)  # filename -> its chunks
+    fingerprints: Dict[str, str] = field(default_factory=dict)  # filename -> content hash / version key
+    etags: Dict[str, str] = field(default_factory=dict)  # s3 document key -> ETag of the fetched object
+    index: Optional[SearchIndex] = None  # Rebuilt lazily after chunks change
+    vector_index: Optional[object] = None  # semantic_search.VectorIndex, built on first semantic query
+    snapshot_hits: int = 0  # Documents reused from the on-disk snapshot on last load
+    version: int = 0  # Bumped on every corpus change; part of the chat answer cache key
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    _reload_lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    # Upserts (key -> add_document args) and removals (key -> None) made during a reload
+    _reload_changes: Optional[Dict[str, Optional[tuple]]] = field(default=None, repr=False, compare=False)
     
     def clear(self):
-        """Clear all documents and chunks."""
-        self.documents.clear()
-        self.chunks.clear()
+        """Clear all documents and chunks (swapping in empty containers)."""
+        with self._lock:
+            self._swap_in(KnowledgeBase(university_id=self.university_id, university_name=self.university_name))
+    
+    def _swap_in(self, staged: "KnowledgeBase"):
+        """Take over another knowledge base's corpus and indexes. Caller holds the lock."""
+        self.documents = staged.documents
+        self.chunks = staged.chunks
+        self.document_chunks = staged.document_chunks
+        self.fingerprints = staged.fingerprints
+        self.etags = staged.etags
+        self.index = staged.index
+        self.vector_index = staged.vector_index
+        self.snapshot_hits = staged.snapshot_hits
+        self.version += 1
+    
+    @contextmanager
+    def reloading(self):
+        """
+        Rebuild the corpus: yields an empty KnowledgeBase to fill, which is
+        swapped in under the lock in one step when the block exits.
+        
+        Queries keep using the current corpus until then. Upserts and removals
+        made meanwhile are replayed onto the new corpus before the swap, so
+        they are not lost. Reloads of one knowledge base run one at a time.
+        """
+        with self._reload_lock:
+            staged = KnowledgeBase(university_id=self.university_id, university_name=self.university_name)
+            with self._lock:
+                self._reload_changes = {}
+            try:
+                yield staged
+                with self._lock:
+                    for key, change in self._reload_changes.items():
+                        if change is None:
+                            staged.remove_document(key)
+                        else:
+                            staged.upsert_document(key, *change)
+                    self._swap_in(staged)
+            finally:
+                with self._lock:
+                    self._reload_changes = None
+    
+    def add_document(self, key: str, content: str, chunks: List[DocumentChunk], fingerprint: str,
+                     etag: Optional[str] = None):
+        """Store a document with its chunks and invalidate the search index."""
+        self.documents[key] = content
+        self.document_chunks[key] = chunks
+        self.fingerprints[key] = fingerprint
+        if etag:
+            self.etags[key] = etag
+        self.chunks.extend(chunks)
+        self.index = None
+        self.vector_index = None
+        self.version += 1
+    
+    def upsert_document(self, key: str, content: str, chunks: List[DocumentChunk], fingerprint: str,
+                        etag: Optional[str] = None):
+        """
+        Add or replace a single document without rebuilding everything.
+        
+        Copy-on-write: new containers and a patched copy of the index are built
+        first and then swapped in, so concurrent queries see either the old or
+        the new corpus, never a half-updated one.
+        """
+        with self._lock:
+            if self._reload_changes is not None:
+                self._reload_changes[key] = (content, chunks, fingerprint, etag)
+            
+            previous = self.document_chunks.get(key, [])
+            previous_ids = {chunk.chunk_id for chunk in previous}
+            
+            self.documents = {**self.documents, key: content}
+            self.document_chunks = {**self.document_chunks, key: chunks}
+            self.fingerprints = {**self.fingerprints, key: fingerprint}
+            if etag:
+                self.etags = {**self.etags, key: etag}
+            self.chunks = [chunk for chunk in self.chunks if chunk.chunk_id not in previous_ids] + chunks
+            self.index = (
+                self.index.patched(previous, chunks) if self.index is not None
+                else SearchIndex.build(self.chunks)
+            )
+            if self.vector_index is not None:
+                self.vector_index = self.vector_index.patched(previous, chunks)
+            self.version += 1
+    
+    def remove_document(self, key: str) -> bool:
+        """
+        Remove a single document, swapping in a patched copy of the index.
+        
+        Returns:
+            True if the document was loaded
+        """
+        with self._lock:
+            if self._reload_changes is not None:
+                self._reload_changes[key] = None
+            if key not in self.documents:
+                return False
+            
+            previous = self.document_chunks.get(key, [])
+            previous_ids = {chunk.chunk_id for chunk in previous}
+            
+            self.documents = {k: v for k, v in self.documents.items() if k != key}
+            self.document_chunks = {k: v for k, v in self.document_chunks.items() if k != key}
+            self.fingerprints = {k: v for k, v in self.fingerprints.items() if k != key}
+            self.etags = {k: v for k, v in self.etags.items() if k != key}
+            self.chunks = [chunk for chunk in self.chunks if chunk.chunk_id not in previous_ids]
+            self.index = (
+                self.index.patched(previous, []) if self.index is not None
+                else SearchIndex.build(self.chunks)
+            )
+            if self.vector_index is not None:
+                self.vector_index = self.vector_index.patched(previous, [])
+            self.version += 1
+            return True
+    
+    def get_index(self) -> SearchIndex:
+        """Return the search index, building it if the chunks changed."""
+        index = self.index
+        if index is None:
+            with self._lock:
+                if self.index is None:
+                    self.index = SearchIndex.build(self.chunks)
+                    logger.info(f"Built search index: {len(self.index.postings)} terms, {len(self.chunks)} chunks")
+                index = self.index
+        return index
+    
+    def get_vector_index(self):
+        """
+        Return the embedding matrix for semantic search, building it on first use.
+        
+        Returns:
+            semantic_search.VectorIndex, or None if NumPy is not installed
+        """
+        from app.services import semantic_search
+        
+        if not semantic_search.is_available():
+            return None
+        
+        vector_index = self.vector_index
+        if vector_index is None:
+            with self._lock:
+                if self.vector_index is None:
+                    self.vector_index = semantic_search.VectorIndex.build(self.chunks)
+                    logger.info(f"Built vector index: {len(self.chunks)} chunks for {self.university_id}")
+                vector_index = self.vector_index
+        return vector_index
+
+    @property
+    def storage_path(self) -> Path:
+        """Folder holding this university's local .txt documents."""
+        return knowledge_base_path(self.university_id)
+    
+    @property
+    def snapshot_path(self) -> Path:
+        """Snapshot file for this university."""
+        return snapshot_path(self.university_id)
+    
+    def estimated_bytes(self) -> int:
+        """Rough in-memory size of the corpus, used for the registry's memory budget."""
+        document_bytes = sum(len(content) for content in self.documents.values())
+        chunk_bytes = sum(len(chunk.content) + 64 * len(chunk.term_counts) for chunk in self.chunks)
+        vector_bytes = self.vector_index.matrix.nbytes if self.vector_index is not None else 0
+        return document_bytes + chunk_bytes + vector_bytes
+
+
+def _safe_university_id(university_id: str) -> str:
+    """University ID made safe for use in file names."""
+    return re.sub(r'[^\w\-]', '_', university_id)
+
+
+def knowledge_base_path(university_id: str) -> Path:
+    """Local document folder for a university."""
+    return KNOWLEDGE_BASE_ROOT / _safe_university_id(university_id)
+
+
+def snapshot_path(university_id: str) -> Path:
+    """Snapshot file for a university."""
+    return KNOWLEDGE_BASE_ROOT / f"{_safe_university_id(university_id)}.kbsnap"
 
 
 # ==============================================================================
 # GLOBAL KNOWLEDGE BASE INSTANCE
 # ==============================================================================
 
-# DUMMY: Global in-memory storage
+# Default tenant; other universities are loaded through knowledge_base_registry
 knowledge_base = KnowledgeBase()
 
 
@@ -130,6 +486,207 @@ def chunk_text(text: str, chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVE
     return [c for c in chunks if c]  # Remove empty chunks
 
 
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase keywords, dropping stop words.
+    
+    Args:
+        text: Text to tokenize
+    
+    Returns:
+        List of keywords in order of appearance
+    """
+    return [word for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def build_chunks(content: str, chunk_id_prefix: str, document_name: str,
+                 university_id: str = UNIVERSITY_ID) -> List[DocumentChunk]:
+    """
+    Chunk a document and precompute each chunk's term counts for indexing.
+    
+    Args:
+        content: Full document text
+        chunk_id_prefix: Prefix for chunk IDs (e.g. file stem or s3_<doc id>)
+        document_name: Name shown as the chunk's source
+        university_id: University the document belongs to
+    
+    Returns:
+        List of document chunks
+    """
+    return [
+        DocumentChunk(
+            chunk_id=f"{chunk_id_prefix}_chunk_{i}",
+            document_name=document_name,
+            content=chunk_content,
+            university_id=university_id,
+            term_counts=dict(Counter(tokenize(chunk_content)))
+        )
+        for i, chunk_content in enumerate(chunk_text(content))
+    ]
+
+
+def content_fingerprint(content: str) -> str:
+    """SHA-256 of a document's text, used to detect changed documents."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+# ==============================================================================
+# SNAPSHOT PERSISTENCE
+# ==============================================================================
+
+class KnowledgeBaseSnapshot:
+    """
+    Read-only view of a snapshot file written by save_snapshot.
+    
+    Layout: a fixed header (magic, version, manifest offset and length), one
+    JSON record per document, then a JSON manifest mapping each document key to
+    its fingerprint and byte range. The file is memory-mapped and only the
+    records of documents that are still current get decoded.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        
+        try:
+            magic, version, manifest_offset, manifest_length = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+            if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {version}")
+            
+            manifest = json.loads(self._map[manifest_offset:manifest_offset + manifest_length])
+            if manifest.get("chunk_size") != CHUNK_SIZE or manifest.get("chunk_overlap") != CHUNK_OVERLAP:
+                raise ValueError("snapshot was built with different chunk settings")
+            self.university_id: str = manifest.get("university_id", UNIVERSITY_ID)
+            self.documents: Dict[str, Dict] = manifest["documents"]
+        except Exception:
+            self.close()
+            raise
+    
+    def get_document(self, key: str, fingerprint: Optional[str] = None) -> Optional[Tuple[str, List[DocumentChunk]]]:
+        """
+        Return (content, chunks) for a document if the snapshot holds the same version.
+        
+        Args:
+            key: Document key (filename or s3_<filename>)
+            fingerprint: Current fingerprint of the document; None skips the check
+        
+        Returns:
+            Tuple of content and chunks, or None if missing or stale
+        """
+        entry = self.documents.get(key)
+        if not entry or (fingerprint is not None and entry["fingerprint"] != fingerprint):
+            return None
+        
+        record = json.loads(self._map[entry["offset"]:entry["offset"] + entry["length"]])
+        chunks = [
+            DocumentChunk(
+                chunk_id=chunk_id,
+                document_name=document_name,
+                content=chunk_content,
+                university_id=self.university_id,
+                term_counts=term_counts
+            )
+            for chunk_id, document_name, chunk_content, term_counts in record["chunks"]
+        ]
+        return record["content"], chunks
+    
+    def get_etag(self, key: str) -> Optional[str]:
+        """ETag recorded when an S3 document was last fetched, if any."""
+        entry = self.documents.get(key)
+        return entry.get("etag") if entry else None
+    
+    def close(self):
+        """Release the memory map and file handle."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[KnowledgeBaseSnapshot]:
+    """
+    Open the knowledge base snapshot if one exists and is compatible.
+    
+    Returns:
+        Snapshot, or None if missing, outdated or corrupt
+    """
+    if not path.exists():
+        return None
+    
+    try:
+        snapshot = KnowledgeBaseSnapshot(path)
+        logger.info(f"Opened knowledge base snapshot: {path} ({len(snapshot.documents)} documents)")
+        return snapshot
+    except Exception as e:
+        logger.warning(f"Ignoring knowledge base snapshot {path}: {e}")
+        return None
+
+
+def save_snapshot(path: Path = SNAPSHOT_PATH, kb: Optional[KnowledgeBase] = None) -> bool:
+    """
+    Write the in-memory documents, chunks and term counts to a snapshot file.
+    
+    The file is written next to the target and renamed into place, so a crash
+    mid-write never leaves a truncated snapshot behind.
+    
+    Args:
+        path: Snapshot file to write
+        kb: Knowledge base to persist (default tenant if omitted)
+    
+    Returns:
+        True if successful
+    """
+    kb = kb or knowledge_base
+    
+    try:
+        records = []
+        entries = {}
+        offset = SNAPSHOT_HEADER.size
+        for key, content in kb.documents.items():
+            record = json.dumps({
+                "content": content,
+                "chunks": [
+                    [chunk.chunk_id, chunk.document_name, chunk.content, chunk.term_counts]
+                    for chunk in kb.document_chunks.get(key, [])
+                ]
+            }, separators=(',', ':')).encode('utf-8')
+            entries[key] = {
+                "fingerprint": kb.fingerprints.get(key, ""),
+                "etag": kb.etags.get(key),
+                "offset": offset,
+                "length": len(record)
+            }
+            records.append(record)
+            offset += len(record)
+        
+        manifest = json.dumps({
+            "university_id": kb.university_id,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+            "documents": entries
+        }, separators=(',', ':')).encode('utf-8')
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, offset, len(manifest)))
+            for record in records:
+                f.write(record)
+            f.write(manifest)
+        os.replace(tmp_path, path)
+        
+        logger.info(f"Saved knowledge base snapshot: {path} ({len(entries)} documents)")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to save knowledge base snapshot {path}: {e}")
+        return False
+
+
 def load_document(filepath: Path) -> Optional[str]:
     """
     Load a single document from disk.
@@ -150,72 +707,141 @@ def load_document(filepath: Path) -> Optional[str]:
         return None
 
 
-def load_all_documents() -> int:
+def _load_local_documents(snapshot: Optional[KnowledgeBaseSnapshot], kb: KnowledgeBase) -> int:
+    """Add the .txt documents from the tenant's folder to kb, reusing snapshot chunks for unchanged files."""
+    storage_path = kb.storage_path
+    
+    # Find all .txt files
+    txt_files = list(storage_path.glob("*.txt")) if storage_path.exists() else []
+    logger.info(f"Found {len(txt_files)} .txt files in {storage_path}")
+    
+    loaded_count = 0
+    chunk_counter = 0
+    
+    for filepath in txt_files:
+        content = load_document(filepath)
+        if content:
+            fingerprint = content_fingerprint(content)
+            cached = snapshot.get_document(filepath.name, fingerprint) if snapshot else None
+            if cached:
+                chunks = cached[1]
+                kb.snapshot_hits += 1
+            else:
+                chunks = build_chunks(content, filepath.stem, filepath.name, kb.university_id)
+            
+            # Store full document and its chunks
+            kb.add_document(filepath.name, content, chunks, fingerprint)
+            loaded_count += 1
+            chunk_counter += len(chunks)
+    
+    logger.info(f"Loaded {loaded_count} documents, {chunk_counter} chunks for {kb.university_id}")
+    return loaded_count
+
+
+def load_all_documents(snapshot: Optional[KnowledgeBaseSnapshot] = None,
+                       kb: Optional[KnowledgeBase] = None) -> int:
     """
-    Load all .txt documents from the knowledge base folder.
+    Replace the knowledge base with all .txt documents from its folder.
     
     This function:
-    1. Clears existing in-memory data
-    2. Reads all .txt files from /data/knowledge_base/mit/
-    3. Chunks each document
-    4. Stores chunks in memory
+    1. Reads all .txt files from /data/knowledge_base/{university_id}/
+    2. Chunks each document, reusing snapshot chunks for unchanged files
+    3. Swaps the new corpus in, in one step (see KnowledgeBase.reloading)
+    
+    Args:
+        snapshot: Optional snapshot from a previous load
+        kb: Knowledge base to fill (default tenant if omitted)
     
     Returns:
         Number of documents loaded
     """
-    global knowledge_base
+    kb = kb or knowledge_base
     
-    # Clear existing data
-    knowledge_base.clear()
+    with kb.reloading() as staged:
+        return _load_local_documents(snapshot, staged)
+
+
+def s3_document_fingerprint(doc) -> str:
+    """
+    Version key for an S3-backed document, known without downloading it.
+    Re-uploading a file creates a new row, so key, size and update time change with the content.
+    """
+    updated_at = doc.updated_at.isoformat() if doc.updated_at else ""
+    return f"{doc.s3_key}:{doc.file_size}:{updated_at}"
+
+
+_http_session: Optional[requests.Session] = None
+
+
+def get_http_session() -> requests.Session:
+    """
+    Shared HTTP session for S3/CloudFront downloads.
     
-    # Ensure directory exists
-    KNOWLEDGE_BASE_PATH.mkdir(parents=True, exist_ok=True)
+    Keeps connections alive across documents and reloads, and retries
+    connection errors and 429/5xx responses with exponential backoff.
+    """
+    global _http_session
     
-    # Find all .txt files
-    txt_files = list(KNOWLEDGE_BASE_PATH.glob("*.txt"))
-    logger.info(f"Found {len(txt_files)} .txt files in {KNOWLEDGE_BASE_PATH}")
+    if _http_session is None:
+        retry = Retry(
+            total=S3_FETCH_RETRIES,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=S3_FETCH_WORKERS, pool_maxsize=S3_FETCH_WORKERS, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _http_session = session
     
-    chunk_counter = 0
+    return _http_session
+
+
+def fetch_s3_document(url: str, etag: Optional[str] = None) -> Tuple[Optional[str], Optional[str], bool]:
+    """
+    Download a document, sending a conditional GET when an ETag is known.
     
-    for filepath in txt_files:
-        content = load_document(filepath)
-        if content:
-            # Store full document
-            knowledge_base.documents[filepath.name] = content
-            
-            # Create chunks
-            text_chunks = chunk_text(content)
-            for i, chunk_content in enumerate(text_chunks):
-                chunk = DocumentChunk(
-                    chunk_id=f"{filepath.stem}_chunk_{i}",
-                    document_name=filepath.name,
-                    content=chunk_content,
-                    university_id=UNIVERSITY_ID
-                )
-                knowledge_base.chunks.append(chunk)
-                chunk_counter += 1
+    Args:
+        url: S3/CloudFront URL of the document
+        etag: ETag from the previous fetch
+    
+    Returns:
+        Tuple of (content, etag, not_modified); content is None when not modified
+    """
+    headers = {"If-None-Match": etag} if etag else {}
+    response = get_http_session().get(url, headers=headers, timeout=S3_FETCH_TIMEOUT)
+    
+    if response.status_code == 304:
+        return None, etag, True
     
-    logger.info(f"Loaded {len(knowledge_base.documents)} documents, {chunk_counter} chunks")
-    return len(knowledge_base.documents)
+    response.raise_for_status()
+    return response.text, response.headers.get("ETag"), False
 
 
-def load_documents_from_s3(db_session=None) -> int:
+def load_documents_from_s3(db_session=None, snapshot: Optional[KnowledgeBaseSnapshot] = None,
+                           kb: Optional[KnowledgeBase] = None) -> int:
     """
     Load documents from S3 URLs stored in the database.
     
     This function:
     1. Queries the knowledge_base_documents table for active documents
-    2. Fetches content from S3/CloudFront URLs
+    2. Fetches content from S3/CloudFront URLs concurrently, skipping documents
+       whose current version is already in the snapshot and sending
+       conditional GETs for the rest
     3. Chunks each document
     4. Adds chunks to the in-memory knowledge base
     
     Args:
         db_session: SQLAlchemy database session
-        
+        snapshot: Optional snapshot from a previous load
+        kb: Knowledge base to fill (default tenant if omitted)
+    
     Returns:
         Number of documents loaded from S3
     """
-    global knowledge_base
+    kb = kb or knowledge_base
     
     if db_session is None:
         logger.warning("No database session provided for S3 document loading")
@@ -226,57 +852,72 @@ def load_documents_from_s3(db_session=None) -> int:
         
         # Query active documents for the university
         docs = db_session.query(KnowledgeBaseDocument).filter(
-            KnowledgeBaseDocument.university_id == UNIVERSITY_ID,
+            KnowledgeBaseDocument.university_id == kb.university_id,
             KnowledgeBaseDocument.is_active == True
         ).all()
         
         if not docs:
-            logger.info(f"No S3 documents found for {UNIVERSITY_ID}")
+            logger.info(f"No S3 documents found for {kb.university_id}")
             return 0
         
         loaded_count = 0
+        pending = []
         
         for doc in docs:
-            try:
-                # Fetch content from S3/CloudFront URL
-                response = requests.get(doc.s3_url, timeout=30)
-                response.raise_for_status()
-                
-                # Handle text content
-                if doc.file_type in ['txt', 'md']:
-                    content = response.text
-                else:
-                    # For PDF/DOC, we'd need additional processing
-                    # For now, skip non-text files
-                    logger.warning(f"Skipping non-text file: {doc.filename} ({doc.file_type})")
-                    continue
-                
-                if not content:
-                    logger.warning(f"Empty content from S3: {doc.filename}")
-                    continue
-                
-                # Store full document
-                doc_key = f"s3_{doc.filename}"
-                knowledge_base.documents[doc_key] = content
-                
-                # Create chunks
-                text_chunks = chunk_text(content)
-                for i, chunk_content in enumerate(text_chunks):
-                    chunk = DocumentChunk(
-                        chunk_id=f"s3_{doc.id}_chunk_{i}",
-                        document_name=doc.title or doc.filename,
-                        content=chunk_content,
-                        university_id=UNIVERSITY_ID
-                    )
-                    knowledge_base.chunks.append(chunk)
-                
+            doc_key = f"s3_{doc.filename}"
+            fingerprint = s3_document_fingerprint(doc)
+            cached = snapshot.get_document(doc_key, fingerprint) if snapshot else None
+            if cached:
+                kb.add_document(doc_key, cached[0], cached[1], fingerprint, snapshot.get_etag(doc_key))
+                kb.snapshot_hits += 1
                 loaded_count += 1
-                logger.info(f"Loaded S3 document: {doc.title} ({len(content)} chars, {len(text_chunks)} chunks)")
+                continue
+            
+            # Handle text content only
+            if doc.file_type not in ['txt', 'md']:
+                # For PDF/DOC, we'd need additional processing
+                # For now, skip non-text files
+                logger.warning(f"Skipping non-text file: {doc.filename} ({doc.file_type})")
+                continue
+            
+            previous_etag = snapshot.get_etag(doc_key) if snapshot else None
+            pending.append((doc, doc_key, fingerprint, previous_etag))
+        
+        if not pending:
+            logger.info(f"Loaded {loaded_count} documents from S3")
+            return loaded_count
+        
+        # Download changed documents concurrently; results are applied in query order
+        with ThreadPoolExecutor(max_workers=min(S3_FETCH_WORKERS, len(pending))) as executor:
+            futures = [
+                executor.submit(fetch_s3_document, doc.s3_url, previous_etag)
+                for doc, _, _, previous_etag in pending
+            ]
+            
+            for (doc, doc_key, fingerprint, previous_etag), future in zip(pending, futures):
+                try:
+                    content, etag, not_modified = future.result()
+                    
+                    if not_modified:
+                        # Object unchanged since the snapshot; reuse its text
+                        content = snapshot.get_document(doc_key)[0]
+                    
+                    if not content:
+                        logger.warning(f"Empty content from S3: {doc.filename}")
+                        continue
+                    
+                    # Store full document and its chunks
+                    text_chunks = build_chunks(content, f"s3_{doc.id}", doc.title or doc.filename, kb.university_id)
+                    kb.add_document(doc_key, content, text_chunks, fingerprint, etag)
+                    
+                    loaded_count += 1
+                    source = "not modified" if not_modified else "fetched"
+                    logger.info(f"Loaded S3 document: {doc.title} ({len(content)} chars, {len(text_chunks)} chunks, {source})")
                 
-            except requests.RequestException as e:
-                logger.error(f"Failed to fetch S3 document {doc.filename}: {e}")
-            except Exception as e:
-                logger.error(f"Error processing S3 document {doc.filename}: {e}")
+                except requests.RequestException as e:
+                    logger.error(f"Failed to fetch S3 document {doc.filename}: {e}")
+                except Exception as e:
+                    logger.error(f"Error processing S3 document {doc.filename}: {e}")
         
         logger.info(f"Loaded {loaded_count} documents from S3")
         return loaded_count
@@ -286,38 +927,170 @@ def load_documents_from_s3(db_session=None) -> int:
         return 0
 
 
-def load_all_documents_with_s3(db_session=None) -> int:
+def load_all_documents_with_s3(db_session=None, use_snapshot: bool = True,
+                               kb: Optional[KnowledgeBase] = None) -> int:
     """
     Load documents from both local files and S3.
     
+    Unchanged documents are taken from the on-disk snapshot instead of being
+    re-read from S3 and re-chunked; the snapshot is rewritten if anything changed.
+    
     Args:
         db_session: SQLAlchemy database session for S3 documents
-        
+        use_snapshot: Reuse and refresh the on-disk snapshot
+        kb: Knowledge base to fill (default tenant if omitted)
+    
     Returns:
         Total number of documents loaded
     """
-    # First load local documents
-    local_count = load_all_documents()
+    kb = kb or knowledge_base
     
-    # Then load S3 documents
-    s3_count = load_documents_from_s3(db_session)
+    # Built off to the side and swapped in at the end, so queries never see a partial corpus
+    with kb.reloading() as staged:
+        snapshot = load_snapshot(kb.snapshot_path) if use_snapshot else None
+        try:
+            # First load local documents
+            local_count = _load_local_documents(snapshot, staged)
+            
+            # Then load S3 documents
+            s3_count = load_documents_from_s3(db_session, snapshot, staged)
+            
+            snapshot_fingerprints = (
+                {key: entry["fingerprint"] for key, entry in snapshot.documents.items()}
+                if snapshot else None
+            )
+        finally:
+            if snapshot:
+                snapshot.close()
+        
+        if use_snapshot and snapshot_fingerprints != staged.fingerprints:
+            save_snapshot(kb.snapshot_path, staged)
+        
+        # Build the search index now rather than on the first query
+        staged.get_index()
+        if KB_RETRIEVAL_MODE in ("semantic", "hybrid"):
+            staged.get_vector_index()
     
     total = local_count + s3_count
-    logger.info(f"Total knowledge base: {total} documents ({local_count} local, {s3_count} S3)")
+    logger.info(f"Total knowledge base for {kb.university_id}: {total} documents ({local_count} local, {s3_count} S3)")
     
     return total
 
 
 # ==============================================================================
-# RETRIEVAL FUNCTIONS - SIMPLE KEYWORD MATCHING
+# TENANT REGISTRY
+# ==============================================================================
+
+class KnowledgeBaseRegistry:
+    """
+    Per-university knowledge bases, loaded on first use.
+    
+    Tenants are kept in least-recently-used order. When the estimated size of
+    all loaded corpora exceeds the memory budget, the coldest tenants are
+    dropped and reload from their snapshot on next use. The default tenant is
+    loaded at startup and always stays resident.
+    """
+    
+    def __init__(self, default: KnowledgeBase, memory_budget: int = KB_MEMORY_BUDGET_BYTES):
+        self.default = default
+        self.memory_budget = memory_budget
+        self._tenants: "OrderedDict[str, KnowledgeBase]" = OrderedDict({default.university_id: default})
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+    
+    def peek(self, university_id: str) -> Optional[KnowledgeBase]:
+        """Return a tenant's knowledge base only if it is already loaded."""
+        with self._lock:
+            return self._tenants.get(university_id)
+    
+    def loaded(self) -> List[str]:
+        """University IDs currently in memory, coldest first."""
+        with self._lock:
+            return list(self._tenants)
+    
+    def get(self, university_id: str, db_session=None) -> KnowledgeBase:
+        """
+        Return a tenant's knowledge base, loading it if needed.
+        
+        Concurrent requests for the same cold tenant wait for a single load.
+        
+        Args:
+            university_id: University to look up
+            db_session: Optional SQLAlchemy session; one is opened if omitted
+        
+        Returns:
+            The tenant's knowledge base
+        """
+        with self._lock:
+            kb = self._tenants.get(university_id)
+            if kb is not None:
+                self._tenants.move_to_end(university_id)
+                return kb
+            load_lock = self._load_locks.setdefault(university_id, threading.Lock())
+        
+        with load_lock:
+            with self._lock:
+                kb = self._tenants.get(university_id)
+                if kb is not None:
+                    self._tenants.move_to_end(university_id)
+                    return kb
+            
+            kb = self._load(university_id, db_session)
+            
+            with self._lock:
+                self._tenants[university_id] = kb
+                self._load_locks.pop(university_id, None)
+                self._evict()
+            return kb
+    
+    def _load(self, university_id: str, db_session=None) -> KnowledgeBase:
+        """Build a tenant's knowledge base from its snapshot, local files and S3."""
+        from app.core.database import SessionLocal
+        from app.models.university import University
+        
+        kb = KnowledgeBase(university_id=university_id, university_name=university_id.upper())
+        session = db_session or SessionLocal()
+        try:
+            university = session.query(University).filter(University.id == university_id).first()
+            if university:
+                kb.university_name = university.name
+            load_all_documents_with_s3(session, kb=kb)
+        finally:
+            if db_session is None:
+                session.close()
+        
+        logger.info(f"Loaded knowledge base for {university_id} (~{kb.estimated_bytes() // 1024} KB)")
+        return kb
+    
+    def _evict(self):
+        """Drop least recently used tenants until the memory budget is met. Caller holds the lock."""
+        sizes = {university_id: kb.estimated_bytes() for university_id, kb in self._tenants.items()}
+        total = sum(sizes.values())
+        
+        # Never evict the default tenant or the one just loaded
+        for university_id in list(self._tenants)[:-1]:
+            if total <= self.memory_budget:
+                break
+            if university_id == self.default.university_id:
+                continue
+            del self._tenants[university_id]
+            total -= sizes[university_id]
+            logger.info(f"Evicted knowledge base for {university_id} ({sizes[university_id] // 1024} KB)")
+
+
+knowledge_base_registry = KnowledgeBaseRegistry(knowledge_base)
+
+
+# ==============================================================================
+# RETRIEVAL FUNCTIONS - BM25 OVER AN INVERTED INDEX
 # ==============================================================================
 
 def calculate_relevance_score(query: str, chunk: DocumentChunk) -> float:
     """
     Calculate relevance score using simple keyword matching.
     
-    DUMMY: This uses basic keyword overlap, not semantic similarity.
-    In production, use vector embeddings and cosine similarity.
+    Kept as the "keyword" scorer of retrieve_relevant_chunks for callers
+    that rely on its 0.0 - 1.0 scale; default retrieval uses BM25.
     
     Args:
         query: User's question
@@ -327,30 +1100,11 @@ def calculate_relevance_score(query: str, chunk: DocumentChunk) -> float:
         Relevance score (0.0 to 1.0)
     """
     # Normalize text
-    query_lower = query.lower()
     content_lower = chunk.content.lower()
     
-    # Extract keywords (simple tokenization)
-    query_words = set(re.findall(r'\b\w+\b', query_lower))
-    content_words = set(re.findall(r'\b\w+\b', content_lower))
-    
-    # Remove common stop words
-    stop_words = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been', 
-                  'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-                  'would', 'could', 'should', 'may', 'might', 'must', 'shall',
-                  'can', 'need', 'to', 'of', 'in', 'for', 'on', 'with', 'at',
-                  'by', 'from', 'as', 'into', 'through', 'during', 'before',
-                  'after', 'above', 'below', 'between', 'under', 'again',
-                  'further', 'then', 'once', 'here', 'there', 'when', 'where',
-                  'why', 'how', 'all', 'each', 'few', 'more', 'most', 'other',
-                  'some', 'such', 'no', 'nor', 'not', 'only', 'own', 'same',
-                  'so', 'than', 'too', 'very', 'just', 'and', 'but', 'if',
-                  'or', 'because', 'until', 'while', 'what', 'which', 'who',
-                  'this', 'that', 'these', 'those', 'i', 'me', 'my', 'we', 'our',
-                  'you', 'your', 'it', 'its', 'they', 'them', 'their'}
-    
-    query_keywords = query_words - stop_words
-    content_keywords = content_words - stop_words
+    # Extract keywords, reusing the chunk's precomputed term counts
+    query_keywords = set(tokenize(query))
+    content_keywords = set(chunk.term_counts) if chunk.term_counts else set(tokenize(chunk.content))
     
     if not query_keywords:
         return 0.0
@@ -367,35 +1121,103 @@ def calculate_relevance_score(query: str, chunk: DocumentChunk) -> float:
     return min(score, 1.0)
 
 
-def retrieve_relevant_chunks(query: str, top_k: int = 3) -> List[DocumentChunk]:
+def retrieve_semantic_chunks(query: str, top_k: int, kb: KnowledgeBase) -> Optional[List[Tuple[float, DocumentChunk]]]:
+    """
+    Rank chunks by embedding similarity.
+    
+    Returns:
+        List of (similarity, chunk), best first, or None if semantic search is unavailable
+    """
+    vector_index = kb.get_vector_index()
+    if vector_index is None:
+        return None
+    
+    index = kb.get_index()
+    return [
+        (score, index.chunks_by_id[chunk_id])
+        for score, chunk_id in vector_index.search(query, top_k)
+        if chunk_id in index.chunks_by_id
+    ]
+
+
+def retrieve_hybrid_chunks(query: str, top_k: int, kb: KnowledgeBase) -> Optional[List[Tuple[float, DocumentChunk]]]:
+    """
+    Fuse BM25 and semantic rankings.
+    
+    Each ranker contributes its top candidates; BM25 scores are scaled to
+    0 - 1 by the best candidate and blended with cosine similarity using
+    HYBRID_SEMANTIC_WEIGHT.
+    
+    Returns:
+        List of (fused score, chunk), best first, or None if semantic search is unavailable
+    """
+    candidates = top_k * HYBRID_CANDIDATES
+    semantic = retrieve_semantic_chunks(query, candidates, kb)
+    if semantic is None:
+        return None
+    
+    keyword = kb.get_index().search(tokenize(query), candidates)
+    best_keyword = keyword[0][0] if keyword else 0.0
+    
+    fused: Dict[str, float] = {}
+    chunks: Dict[str, DocumentChunk] = {}
+    for score, chunk in keyword:
+        fused[chunk.chunk_id] = (1 - HYBRID_SEMANTIC_WEIGHT) * score / best_keyword
+        chunks[chunk.chunk_id] = chunk
+    for score, chunk in semantic:
+        fused[chunk.chunk_id] = fused.get(chunk.chunk_id, 0.0) + HYBRID_SEMANTIC_WEIGHT * score
+        chunks[chunk.chunk_id] = chunk
+    
+    return [
+        (score, chunks[chunk_id])
+        for chunk_id, score in heapq.nlargest(top_k, fused.items(), key=lambda item: item[1])
+    ]
+
+
+def retrieve_relevant_chunks(query: str, top_k: int = 3, scorer: Optional[str] = None,
+                             kb: Optional[KnowledgeBase] = None) -> List[DocumentChunk]:
     """
     Retrieve the most relevant chunks for a query.
     
-    DUMMY: Uses keyword matching. In production, use vector similarity search.
+    The "bm25" scorer only visits chunks sharing a term with the query via the
+    inverted index and keeps the top k in a heap. "keyword" scans every chunk
+    with calculate_relevance_score. "semantic" ranks by embedding similarity
+    and "hybrid" blends it with BM25; both fall back to BM25 without NumPy.
     
     Args:
         query: User's question
         top_k: Number of chunks to return
-        
+        scorer: "bm25", "keyword", "semantic" or "hybrid" (default: KB_RETRIEVAL_MODE)
+        kb: Knowledge base to search (default tenant if omitted)
+    
     Returns:
         List of most relevant chunks
     """
-    if not knowledge_base.chunks:
-        logger.warning("No chunks in knowledge base")
+    kb = kb or knowledge_base
+    scorer = scorer or KB_RETRIEVAL_MODE
+    
+    if not kb.chunks:
+        logger.warning(f"No chunks in knowledge base for {kb.university_id}")
         return []
     
-    # Score all chunks
-    scored_chunks = []
-    for chunk in knowledge_base.chunks:
-        score = calculate_relevance_score(query, chunk)
-        if score > 0:
-            scored_chunks.append((score, chunk))
+    scored_chunks = None
+    if scorer in ("semantic", "hybrid"):
+        retrieve = retrieve_semantic_chunks if scorer == "semantic" else retrieve_hybrid_chunks
+        scored_chunks = retrieve(query, top_k, kb)
+        if scored_chunks is None:
+            logger.warning(f"Semantic search unavailable (NumPy not installed), using BM25 for {scorer} query")
     
-    # Sort by score (descending)
-    scored_chunks.sort(key=lambda x: x[0], reverse=True)
+    if scored_chunks is None and scorer == "keyword":
+        scored_chunks = []
+        for chunk in kb.chunks:
+            score = calculate_relevance_score(query, chunk)
+            if score > 0:
+                scored_chunks.append((score, chunk))
+        scored_chunks = heapq.nlargest(top_k, scored_chunks, key=lambda x: x[0])
+    elif scored_chunks is None:
+        scored_chunks = kb.get_index().search(tokenize(query), top_k)
     
-    # Return top k
-    top_chunks = [chunk for score, chunk in scored_chunks[:top_k]]
+    top_chunks = [chunk for score, chunk in scored_chunks]
     
     logger.info(f"Retrieved {len(top_chunks)} chunks for query: {query[:50]}...")
     return top_chunks
@@ -425,7 +1247,7 @@ def build_context(chunks: List[DocumentChunk]) -> str:
 # ADMIN FUNCTIONS
 # ==============================================================================
 
-def save_uploaded_document(filename: str, content: bytes) -> bool:
+def save_uploaded_document(filename: str, content: bytes, university_id: str = UNIVERSITY_ID) -> bool:
     """
     Save an uploaded document to the knowledge base folder.
     
@@ -435,20 +1257,22 @@ def save_uploaded_document(filename: str, content: bytes) -> bool:
     Args:
         filename: Name of the file
         content: File content as bytes
-        
+        university_id: University the document belongs to
+    
     Returns:
         True if successful
     """
     try:
         # Ensure directory exists
-        KNOWLEDGE_BASE_PATH.mkdir(parents=True, exist_ok=True)
+        storage_path = knowledge_base_path(university_id)
+        storage_path.mkdir(parents=True, exist_ok=True)
         
         # Sanitize filename
         safe_filename = re.sub(r'[^\w\-_\.]', '_', filename)
         if not safe_filename.endswith('.txt'):
             safe_filename += '.txt'
         
-        filepath = KNOWLEDGE_BASE_PATH / safe_filename
+        filepath = storage_path / safe_filename
         
         # Save file
         with open(filepath, 'wb') as f:
@@ -456,8 +1280,12 @@ def save_uploaded_document(filename: str, content: bytes) -> bool:
         
         logger.info(f"Saved document: {safe_filename}")
         
-        # Reload all documents to update chunks
-        load_all_documents()
+        # Chunk and index only this document (tenants not in memory pick it up on load)
+        kb = knowledge_base_registry.peek(university_id)
+        text = load_document(filepath)
+        if kb and text:
+            chunks = build_chunks(text, filepath.stem, filepath.name, university_id)
+            kb.upsert_document(filepath.name, text, chunks, content_fingerprint(text))
         
         return True
     except Exception as e:
@@ -465,44 +1293,51 @@ def save_uploaded_document(filename: str, content: bytes) -> bool:
         return False
 
 
-def list_documents() -> List[Dict]:
+def list_documents(university_id: str = UNIVERSITY_ID) -> List[Dict]:
     """
     List all documents in the knowledge base.
     
+    Args:
+        university_id: University whose documents to list
+    
     Returns:
         List of document info dicts
     """
     documents = []
+    storage_path = knowledge_base_path(university_id)
     
-    if KNOWLEDGE_BASE_PATH.exists():
-        for filepath in KNOWLEDGE_BASE_PATH.glob("*.txt"):
+    if storage_path.exists():
+        for filepath in storage_path.glob("*.txt"):
             stat = filepath.stat()
             documents.append({
                 "filename": filepath.name,
                 "size_bytes": stat.st_size,
-                "university_id": UNIVERSITY_ID
+                "university_id": university_id
             })
     
     return documents
 
 
-def delete_document(filename: str) -> bool:
+def delete_document(filename: str, university_id: str = UNIVERSITY_ID) -> bool:
     """
     Delete a document from the knowledge base.
     
     Args:
         filename: Name of the file to delete
-        
+        university_id: University the document belongs to
+    
     Returns:
         True if successful
     """
     try:
-        filepath = KNOWLEDGE_BASE_PATH / filename
+        filepath = knowledge_base_path(university_id) / filename
         if filepath.exists():
             filepath.unlink()
             logger.info(f"Deleted document: {filename}")
-            # Reload documents
-            load_all_documents()
+            # Drop only this document's chunks from the index
+            kb = knowledge_base_registry.peek(university_id)
+            if kb:
+                kb.remove_document(filename)
             return True
         return False
     except Exception as e:
@@ -510,26 +1345,80 @@ def delete_document(filename: str) -> bool:
         return False
 
 
+def add_s3_document(doc, content: bytes) -> bool:
+    """
+    Index a freshly uploaded S3 document from the bytes already in memory.
+    Tenants that are not loaded pick the document up from the database on load.
+    
+    Args:
+        doc: KnowledgeBaseDocument row (committed)
+        content: Uploaded file content
+        
+    Returns:
+        True if the document was indexed
+    """
+    kb = knowledge_base_registry.peek(doc.university_id)
+    if kb is None or doc.file_type not in ['txt', 'md']:
+        return False
+    
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError as e:
+        logger.warning(f"Could not decode S3 document {doc.filename}: {e}")
+        return False
+    
+    if not text:
+        return False
+    
+    chunks = build_chunks(text, f"s3_{doc.id}", doc.title or doc.filename, kb.university_id)
+    kb.upsert_document(f"s3_{doc.filename}", text, chunks, s3_document_fingerprint(doc))
+    logger.info(f"Indexed S3 document: {doc.title} ({len(text)} chars, {len(chunks)} chunks)")
+    return True
+
+
+def remove_s3_document(filename: str, university_id: str = UNIVERSITY_ID) -> bool:
+    """
+    Drop an S3 document's chunks from the in-memory knowledge base.
+    
+    Args:
+        filename: Filename of the deleted KnowledgeBaseDocument
+        university_id: University the document belonged to
+    
+    Returns:
+        True if the document was loaded
+    """
+    kb = knowledge_base_registry.peek(university_id)
+    return kb.remove_document(f"s3_{filename}") if kb else False
+
+
 # ==============================================================================
 # STATUS FUNCTIONS
 # ==============================================================================
 
-def get_knowledge_base_status() -> Dict:
+def get_knowledge_base_status(kb: Optional[KnowledgeBase] = None) -> Dict:
     """
     Get current status of the knowledge base.
     
+    Args:
+        kb: Knowledge base to describe (default tenant if omitted)
+    
     Returns:
         Status dictionary
     """
+    kb = kb or knowledge_base
+    
     return {
-        "university_id": UNIVERSITY_ID,
-        "university_name": UNIVERSITY_NAME,
-        "document_count": len(knowledge_base.documents),
-        "chunk_count": len(knowledge_base.chunks),
-        "documents": list(knowledge_base.documents.keys()),
-        "storage_path": str(KNOWLEDGE_BASE_PATH),
+        "university_id": kb.university_id,
+        "university_name": kb.university_name,
+        "document_count": len(kb.documents),
+        "chunk_count": len(kb.chunks),
+        "documents": list(kb.documents.keys()),
+        "storage_path": str(kb.storage_path),
         "is_dummy": True,  # Flag indicating this is a demo implementation
-        "notes": "This is a dummy MVP implementation using keyword matching. "
+        "indexed_terms": len(kb.index.postings) if kb.index else 0,
+        "snapshot_hits": kb.snapshot_hits,
+        "loaded_universities": knowledge_base_registry.loaded(),
+        "notes": "This is a dummy MVP implementation using BM25 keyword ranking. "
                  "Production will use vector embeddings for semantic search."
     }
 
@@ -2,17 +2,19 @@
 Lead Intelligence Service
 Handles lead scoring, analytics computation, and AI insights generation
 """
+import math
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, case, distinct
+from sqlalchemy import func, and_, or_, case, distinct, select, insert, update, delete, union_all, DateTime
+from sqlalchemy.exc import IntegrityError
 from collections import defaultdict
 
 from app.models.user import User, UserProfile, UserRole
 from app.models.university import University
 from app.models.lead_intelligence import (
-    LeadActivity, LeadScore, AdClick, AdImpression,
+    LeadActivity, LeadScore, LeadScoreAggregate, AdClick, AdImpression,
     CareerRoadmapRequest, CareerRoadmapView, MentorConnect,
     FeedEngagement, AIInsight, EventType, LeadCategory
 )
@@ -76,6 +78,23 @@ LEAD_THRESHOLDS = {
     'cold': 0,
 }
 
+# Normalization: category score that maps to 100
+MAX_CATEGORY_SCORES = {
+    'ad': 500,      # Assuming max reasonable ad engagement
+    'career': 300,  # Assuming max reasonable career engagement
+    'feed': 200,    # Assuming max reasonable feed engagement
+    'mentor': 150,  # Assuming max reasonable mentor engagement
+    'event': 100,   # Assuming max reasonable event engagement
+}
+
+# Time decay: an activity's weight falls from 1.0 towards LEAD_DECAY_FLOOR as
+# floor + (1 - floor) * exp(-age / time constant). Stored as "forward decay"
+# (each activity adds base * exp((t - epoch) / time constant)), so running
+# aggregates only ever grow by addition and decay is applied at read time.
+LEAD_DECAY_FLOOR = 0.5
+LEAD_DECAY_TIME_CONSTANT = timedelta(days=30)
+LEAD_DECAY_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
 
 # =============================================================================
 # ACTIVITY TRACKING
@@ -104,20 +123,58 @@ def track_activity(
         event_category=event_category,
         reference_id=reference_id,
         reference_type=reference_type,
-        metadata=metadata or {},
+        activity_metadata=metadata or {},
         base_score=base_score
     )
     
     db.add(activity)
+    _increment_aggregate(db, user_id, event_category, base_score, datetime.now(timezone.utc))
     db.commit()
     db.refresh(activity)
     
-    # Trigger score recalculation asynchronously (in production, use a task queue)
-    # For now, we'll batch update scores periodically
+    # Scores are refreshed from the running aggregates (cheap) by
+    # calculate_user_lead_score / batch_update_lead_scores
     
     return activity
 
 
+def _forward_decay_weight(at: datetime) -> float:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return math.exp((at - LEAD_DECAY_EPOCH) / LEAD_DECAY_TIME_CONSTANT)
+
+
+def _increment_aggregate(db: Session, user_id: str, event_category: str, base_score: int, at: datetime):
+    """Add one activity to the user's running aggregate for its category."""
+    forward = base_score * _forward_decay_weight(at)
+    increment = update(LeadScoreAggregate).where(
+        LeadScoreAggregate.user_id == user_id,
+        LeadScoreAggregate.event_category == event_category
+    ).values(
+        activity_count=LeadScoreAggregate.activity_count + 1,
+        base_total=LeadScoreAggregate.base_total + base_score,
+        forward_decayed_total=LeadScoreAggregate.forward_decayed_total + forward,
+        last_activity_at=at
+    )
+    
+    if db.execute(increment).rowcount:
+        return
+    
+    try:
+        with db.begin_nested():
+            db.add(LeadScoreAggregate(
+                user_id=user_id,
+                event_category=event_category,
+                activity_count=1,
+                base_total=base_score,
+                forward_decayed_total=forward,
+                last_activity_at=at
+            ))
+    except IntegrityError:
+        # Created concurrently by another request
+        db.execute(increment)
+
+
 def track_ad_click(db: Session, user_id: str, ad_id: str, university_id: Optional[str] = None):
     """Track ad click event"""
     # Legacy table
@@ -240,69 +297,41 @@ def track_feed_engagement(
 # LEAD SCORING
 # =============================================================================
 
-def calculate_user_lead_score(db: Session, user_id: str) -> LeadScore:
-    """
-    Calculate comprehensive lead score for a single user.
-    """
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise ValueError(f"User {user_id} not found")
-    
-    now = datetime.utcnow()
-    seven_days_ago = now - timedelta(days=7)
-    thirty_days_ago = now - timedelta(days=30)
-    
-    # Get all activities for this user
-    activities = db.query(LeadActivity).filter(
-        LeadActivity.user_id == user_id
-    ).all()
-    
-    # Calculate activity counts
-    total_activities = len(activities)
-    activities_7d = sum(1 for a in activities if a.created_at >= seven_days_ago)
-    activities_30d = sum(1 for a in activities if a.created_at >= thirty_days_ago)
-    
-    # Calculate engagement multiplier based on recent activity
+def _engagement_multiplier(activities_7d: int) -> float:
+    """Engagement multiplier based on recent activity"""
     if activities_7d >= 10:
-        multiplier = 1.5
+        return 1.5
     elif activities_7d >= 5:
-        multiplier = 1.25
+        return 1.25
     elif activities_7d >= 2:
-        multiplier = 1.1
-    else:
-        multiplier = 1.0
-    
-    # Group activities by category and calculate scores
-    category_scores = defaultdict(float)
-    career_interests = defaultdict(int)
+        return 1.1
+    return 1.0
+
+
+def _compute_score_fields(
+    aggregates: List[Tuple[str, int, float, float, Optional[datetime]]],
+    activities_7d: int,
+    activities_30d: int,
+    career_interests: Dict[str, int],
+    now: datetime
+) -> Dict[str, Any]:
+    """
+    LeadScore column values from a user's running aggregates.
     
-    for activity in activities:
-        # Apply time decay (more recent = more valuable)
-        days_old = (now - activity.created_at).days
-        decay = max(0.5, 1.0 - (days_old / 90))  # Min 50% weight for activities within 90 days
-        
-        weighted_score = activity.base_score * decay * multiplier
-        category_scores[activity.event_category] += weighted_score
-        
-        # Track career interests
-        if activity.event_category == 'career' and activity.metadata:
-            goal = activity.metadata.get('career_goal')
-            if goal:
-                career_interests[goal] += 1
-    
-    # Normalize category scores to 0-100
-    max_possible = {
-        'ad': 500,      # Assuming max reasonable ad engagement
-        'career': 300,  # Assuming max reasonable career engagement
-        'feed': 200,    # Assuming max reasonable feed engagement
-        'mentor': 150,  # Assuming max reasonable mentor engagement
-        'event': 100,   # Assuming max reasonable event engagement
-    }
+    Args:
+        aggregates: (category, activity count, base total, forward decayed total, last activity) rows
+        activities_7d / activities_30d: Activity counts in the last 7 / 30 days
+        career_interests: Career goal -> number of roadmap views/generations
+        now: Time the decay is evaluated at
+    """
+    multiplier = _engagement_multiplier(activities_7d)
+    read_decay = math.exp(-((now - LEAD_DECAY_EPOCH) / LEAD_DECAY_TIME_CONSTANT))
     
     normalized_scores = {}
-    for category, score in category_scores.items():
-        max_score = max_possible.get(category, 100)
-        normalized_scores[category] = min(100, (score / max_score) * 100)
+    for category, _, base_total, forward_total, _ in aggregates:
+        decayed = LEAD_DECAY_FLOOR * base_total + (1 - LEAD_DECAY_FLOOR) * forward_total * read_decay
+        max_score = MAX_CATEGORY_SCORES.get(category, 100)
+        normalized_scores[category] = min(100, (decayed * multiplier / max_score) * 100)
     
     # Calculate overall score using category weights
     overall_score = sum(
@@ -319,8 +348,80 @@ def calculate_user_lead_score(db: Session, user_id: str) -> LeadScore:
     else:
         lead_category = LeadCategory.COLD.value
     
-    # Determine primary career interest
-    primary_interest = max(career_interests, key=career_interests.get) if career_interests else None
+    return {
+        "ad_engagement_score": normalized_scores.get('ad', 0),
+        "career_engagement_score": normalized_scores.get('career', 0),
+        "feed_engagement_score": normalized_scores.get('feed', 0),
+        "mentor_engagement_score": normalized_scores.get('mentor', 0),
+        "event_engagement_score": normalized_scores.get('event', 0),
+        "overall_score": round(overall_score, 2),
+        "lead_category": lead_category,
+        "total_activities": sum(row[1] for row in aggregates),
+        "activities_last_7_days": activities_7d,
+        "activities_last_30_days": activities_30d,
+        "engagement_multiplier": multiplier,
+        "primary_career_interest": max(career_interests, key=career_interests.get) if career_interests else None,
+        "career_interests": list(career_interests.keys()),
+        "conversion_probability": calculate_conversion_probability(overall_score, activities_7d),
+        "last_activity_at": max((row[4] for row in aggregates if row[4] is not None), default=None),
+        "score_updated_at": now,
+    }
+
+
+def _aggregate_columns():
+    return (
+        LeadScoreAggregate.event_category,
+        LeadScoreAggregate.activity_count,
+        LeadScoreAggregate.base_total,
+        LeadScoreAggregate.forward_decayed_total,
+        LeadScoreAggregate.last_activity_at,
+    )
+
+
+def _recent_activity_counts(now: datetime):
+    """(user_id, activities in 30 days, activities in 7 days) select; reads only recent rows."""
+    return select(
+        LeadActivity.user_id,
+        func.count(LeadActivity.id),
+        func.sum(case((LeadActivity.created_at >= now - timedelta(days=7), 1), else_=0))
+    ).where(
+        LeadActivity.created_at >= now - timedelta(days=30)
+    ).group_by(LeadActivity.user_id)
+
+
+def _career_interest_counts():
+    """(user_id, career_goal, count) select over roadmap views and generations."""
+    goals = union_all(
+        select(CareerRoadmapView.user_id.label("user_id"), CareerRoadmapView.career_goal.label("career_goal")),
+        select(CareerRoadmapRequest.user_id.label("user_id"), CareerRoadmapRequest.career_goal.label("career_goal")),
+    ).subquery()
+    return select(goals.c.user_id, goals.c.career_goal, func.count()).group_by(goals.c.user_id, goals.c.career_goal), goals
+
+
+def calculate_user_lead_score(db: Session, user_id: str) -> LeadScore:
+    """
+    Calculate comprehensive lead score for a single user.
+    Reads the user's running aggregates, not their activity history.
+    """
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise ValueError(f"User {user_id} not found")
+    
+    now = datetime.now(timezone.utc)
+    
+    aggregates = db.execute(
+        select(*_aggregate_columns()).where(LeadScoreAggregate.user_id == user_id)
+    ).all()
+    
+    recent = db.execute(_recent_activity_counts(now).where(LeadActivity.user_id == user_id)).first()
+    activities_30d, activities_7d = (recent[1], int(recent[2] or 0)) if recent else (0, 0)
+    
+    interests_query, goals = _career_interest_counts()
+    career_interests = {
+        goal: count for _, goal, count in db.execute(interests_query.where(goals.c.user_id == user_id))
+    }
+    
+    fields = _compute_score_fields(aggregates, activities_7d, activities_30d, career_interests, now)
     
     # Get or create lead score record
     lead_score = db.query(LeadScore).filter(LeadScore.user_id == user_id).first()
@@ -329,23 +430,8 @@ def calculate_user_lead_score(db: Session, user_id: str) -> LeadScore:
         lead_score = LeadScore(user_id=user_id, university_id=user.university_id)
         db.add(lead_score)
     
-    # Update lead score
-    lead_score.ad_engagement_score = normalized_scores.get('ad', 0)
-    lead_score.career_engagement_score = normalized_scores.get('career', 0)
-    lead_score.feed_engagement_score = normalized_scores.get('feed', 0)
-    lead_score.mentor_engagement_score = normalized_scores.get('mentor', 0)
-    lead_score.event_engagement_score = normalized_scores.get('event', 0)
-    lead_score.overall_score = round(overall_score, 2)
-    lead_score.lead_category = lead_category
-    lead_score.total_activities = total_activities
-    lead_score.activities_last_7_days = activities_7d
-    lead_score.activities_last_30_days = activities_30d
-    lead_score.engagement_multiplier = multiplier
-    lead_score.primary_career_interest = primary_interest
-    lead_score.career_interests = list(career_interests.keys())
-    lead_score.conversion_probability = calculate_conversion_probability(overall_score, activities_7d)
-    lead_score.last_activity_at = max((a.created_at for a in activities), default=None)
-    lead_score.score_updated_at = now
+    for key, value in fields.items():
+        setattr(lead_score, key, value)
     
     db.commit()
     db.refresh(lead_score)
@@ -360,26 +446,107 @@ def calculate_conversion_probability(overall_score: float, recent_activity: int)
     return min(1.0, base_probability + activity_boost)
 
 
-def batch_update_lead_scores(db: Session, university_id: Optional[str] = None):
+def rebuild_lead_score_aggregates(db: Session, university_id: Optional[str] = None) -> int:
+    """
+    Recompute the running aggregates from lead_activities with one
+    INSERT ... SELECT ... GROUP BY (e.g. after a backfill or a change to
+    the decay settings).
+    
+    Returns:
+        Number of aggregate rows written
+    """
+    users = select(User.id).where(User.university_id == university_id) if university_id else None
+    
+    clear = delete(LeadScoreAggregate)
+    if users is not None:
+        clear = clear.where(LeadScoreAggregate.user_id.in_(users))
+    db.execute(clear)
+    
+    # base_score * exp((created_at - epoch) / time constant), in SQL
+    forward = LeadActivity.base_score * func.exp(
+        (func.extract('epoch', LeadActivity.created_at) - LEAD_DECAY_EPOCH.timestamp())
+        / LEAD_DECAY_TIME_CONSTANT.total_seconds()
+    )
+    totals = select(
+        LeadActivity.user_id,
+        LeadActivity.event_category,
+        func.count(LeadActivity.id),
+        func.coalesce(func.sum(LeadActivity.base_score), 0),
+        func.coalesce(func.sum(forward), 0),
+        func.max(LeadActivity.created_at)
+    ).group_by(LeadActivity.user_id, LeadActivity.event_category)
+    if users is not None:
+        totals = totals.where(LeadActivity.user_id.in_(users))
+    
+    result = db.execute(insert(LeadScoreAggregate).from_select(
+        ["user_id", "event_category", "activity_count", "base_total", "forward_decayed_total", "last_activity_at"],
+        totals
+    ))
+    db.commit()
+    
+    logger.info(f"Rebuilt {result.rowcount} lead score aggregates")
+    return result.rowcount
+
+
+def batch_update_lead_scores(db: Session, university_id: Optional[str] = None, rebuild_aggregates: bool = False):
     """
     Batch update lead scores for all users (or users of a specific university).
     Should be run periodically (e.g., every hour or daily).
+    
+    Set-based: a handful of grouped queries over the running aggregates and
+    the last 30 days of activity, then bulk insert / update of lead_scores in
+    one transaction.
+    
+    Args:
+        rebuild_aggregates: Recompute the aggregates from lead_activities first
+            (done automatically when none exist yet but activities do)
     """
-    query = db.query(User).filter(User.role == UserRole.ALUMNI, User.is_active == True)
+    if rebuild_aggregates or (
+        db.query(LeadScoreAggregate.user_id).first() is None and db.query(LeadActivity.id).first() is not None
+    ):
+        rebuild_lead_score_aggregates(db, university_id)
+    
+    now = datetime.now(timezone.utc)
     
+    user_filter = [User.role == UserRole.ALUMNI, User.is_active == True]
     if university_id:
-        query = query.filter(User.university_id == university_id)
+        user_filter.append(User.university_id == university_id)
+    users = db.execute(select(User.id, User.university_id).where(*user_filter)).all()
+    user_ids = select(User.id).where(*user_filter)
+    
+    aggregates = defaultdict(list)
+    for row in db.execute(select(LeadScoreAggregate.user_id, *_aggregate_columns()).where(LeadScoreAggregate.user_id.in_(user_ids))):
+        aggregates[row[0]].append(tuple(row[1:]))
+    
+    recent = {
+        user_id: (count_30d, int(count_7d or 0))
+        for user_id, count_30d, count_7d in db.execute(_recent_activity_counts(now).where(LeadActivity.user_id.in_(user_ids)))
+    }
     
-    users = query.all()
-    updated_count = 0
+    interests_query, goals = _career_interest_counts()
+    career_interests = defaultdict(dict)
+    for user_id, goal, count in db.execute(interests_query.where(goals.c.user_id.in_(user_ids))):
+        career_interests[user_id][goal] = count
     
-    for user in users:
-        try:
-            calculate_user_lead_score(db, user.id)
-            updated_count += 1
-        except Exception as e:
-            logger.error(f"Failed to update score for user {user.id}: {e}")
+    existing = dict(db.execute(select(LeadScore.user_id, LeadScore.id).where(LeadScore.user_id.in_(user_ids))).all())
     
+    updates = []
+    inserts = []
+    for user_id, user_university_id in users:
+        activities_30d, activities_7d = recent.get(user_id, (0, 0))
+        fields = _compute_score_fields(aggregates.get(user_id, []), activities_7d, activities_30d, career_interests.get(user_id, {}), now)
+        if user_id in existing:
+            updates.append({"id": existing[user_id], **fields})
+        else:
+            inserts.append({"user_id": user_id, "university_id": user_university_id, **fields})
+    
+    if updates:
+        db.execute(update(LeadScore), updates)
+    if inserts:
+        db.execute(insert(LeadScore), inserts)
+    db.commit()
+    
+    updated_count = len(updates) + len(inserts)
     logger.info(f"Updated lead scores for {updated_count} users")
     return updated_count
 
@@ -388,6 +555,21 @@ def batch_update_lead_scores(db: Session, university_id: Optional[str] = None):
 # ANALYTICS QUERIES
 # =============================================================================
 
+def _count_where(condition):
+    """COUNT(*) FILTER (WHERE condition)"""
+    return func.count().filter(condition)
+
+
+def _lead_funnel_columns():
+    return (
+        func.count(LeadScore.id).label('total'),
+        _count_where(LeadScore.lead_category == LeadCategory.HOT.value).label('hot'),
+        _count_where(LeadScore.lead_category == LeadCategory.WARM.value).label('warm'),
+        _count_where(LeadScore.lead_category == LeadCategory.COLD.value).label('cold'),
+        func.coalesce(func.avg(LeadScore.overall_score), 0).label('avg_score'),
+    )
+
+
 def get_lead_analytics_overview(
     db: Session,
     university_id: Optional[str] = None,
@@ -396,78 +578,77 @@ def get_lead_analytics_overview(
 ) -> Dict[str, Any]:
     """
     Get comprehensive lead analytics overview.
+    Two aggregate queries (lead scores, activities); no rows are loaded.
     """
-    # Base query for lead scores
-    query = db.query(LeadScore)
-    
+    # Lead funnel and score averages
+    score_query = select(
+        *_lead_funnel_columns(),
+        # Conversion rate (leads with score > 60 who had mentor connects)
+        _count_where(LeadScore.mentor_engagement_score > 50).label('high_intent'),
+        func.coalesce(func.avg(LeadScore.ad_engagement_score), 0).label('avg_ad'),
+        func.coalesce(func.avg(LeadScore.career_engagement_score), 0).label('avg_career'),
+        func.coalesce(func.avg(LeadScore.feed_engagement_score), 0).label('avg_feed'),
+        func.coalesce(func.avg(LeadScore.mentor_engagement_score), 0).label('avg_mentor'),
+    )
     if university_id:
-        query = query.filter(LeadScore.university_id == university_id)
-    
-    lead_scores = query.all()
-    
-    # Lead funnel metrics
-    total_leads = len(lead_scores)
-    hot_leads = sum(1 for l in lead_scores if l.lead_category == LeadCategory.HOT.value)
-    warm_leads = sum(1 for l in lead_scores if l.lead_category == LeadCategory.WARM.value)
-    cold_leads = sum(1 for l in lead_scores if l.lead_category == LeadCategory.COLD.value)
-    
-    avg_score = sum(l.overall_score for l in lead_scores) / total_leads if total_leads > 0 else 0
-    
-    # Conversion rate (leads with score > 60 who had mentor connects)
-    high_intent_leads = sum(1 for l in lead_scores if l.mentor_engagement_score > 50)
-    conversion_rate = (high_intent_leads / total_leads * 100) if total_leads > 0 else 0
-    
-    # Activity query with date filters
-    activity_query = db.query(LeadActivity)
+        score_query = score_query.where(LeadScore.university_id == university_id)
+    
+    scores = db.execute(score_query).one()
+    total_leads = scores.total
+    conversion_rate = (scores.high_intent / total_leads * 100) if total_leads > 0 else 0
+    
+    # Engagement metrics: event counts with date filters
+    counted_events = {
+        'ad_views': EventType.AD_VIEW,
+        'ad_clicks': EventType.AD_CLICK,
+        'roadmap_views': EventType.ROADMAP_VIEW,
+        'roadmap_generates': EventType.ROADMAP_GENERATE,
+        'mentor_connects': EventType.MENTOR_CONNECT,
+        'feed_likes': EventType.POST_LIKE,
+        'feed_comments': EventType.POST_COMMENT,
+        'feed_shares': EventType.POST_SHARE,
+    }
+    activity_query = select(*(
+        _count_where(LeadActivity.event_type == event_type.value).label(name)
+        for name, event_type in counted_events.items()
+    )).where(LeadActivity.event_type.in_([event_type.value for event_type in counted_events.values()]))
     if university_id:
-        activity_query = activity_query.filter(LeadActivity.university_id == university_id)
+        activity_query = activity_query.where(LeadActivity.university_id == university_id)
     if start_date:
-        activity_query = activity_query.filter(LeadActivity.created_at >= start_date)
+        activity_query = activity_query.where(LeadActivity.created_at >= start_date)
     if end_date:
-        activity_query = activity_query.filter(LeadActivity.created_at <= end_date)
-    
-    activities = activity_query.all()
-    
-    # Engagement metrics
-    ad_views = sum(1 for a in activities if a.event_type == EventType.AD_VIEW.value)
-    ad_clicks = sum(1 for a in activities if a.event_type == EventType.AD_CLICK.value)
-    ctr = (ad_clicks / ad_views * 100) if ad_views > 0 else 0
-    
-    roadmap_views = sum(1 for a in activities if a.event_type == EventType.ROADMAP_VIEW.value)
-    roadmap_generates = sum(1 for a in activities if a.event_type == EventType.ROADMAP_GENERATE.value)
-    mentor_connects = sum(1 for a in activities if a.event_type == EventType.MENTOR_CONNECT.value)
+        activity_query = activity_query.where(LeadActivity.created_at <= end_date)
     
-    feed_likes = sum(1 for a in activities if a.event_type == EventType.POST_LIKE.value)
-    feed_comments = sum(1 for a in activities if a.event_type == EventType.POST_COMMENT.value)
-    feed_shares = sum(1 for a in activities if a.event_type == EventType.POST_SHARE.value)
+    events = db.execute(activity_query).one()._mapping
+    ctr = (events['ad_clicks'] / events['ad_views'] * 100) if events['ad_views'] > 0 else 0
     
     return {
         'funnel': {
             'total_leads': total_leads,
-            'hot_leads': hot_leads,
-            'warm_leads': warm_leads,
-            'cold_leads': cold_leads,
+            'hot_leads': scores.hot,
+            'warm_leads': scores.warm,
+            'cold_leads': scores.cold,
             'conversion_rate': round(conversion_rate, 2),
-            'avg_lead_score': round(avg_score, 2),
-            'hot_percentage': round(hot_leads / total_leads * 100, 1) if total_leads > 0 else 0,
+            'avg_lead_score': round(float(scores.avg_score), 2),
+            'hot_percentage': round(scores.hot / total_leads * 100, 1) if total_leads > 0 else 0,
         },
         'engagement': {
-            'ad_views': ad_views,
-            'ad_clicks': ad_clicks,
+            'ad_views': events['ad_views'],
+            'ad_clicks': events['ad_clicks'],
             'ctr': round(ctr, 2),
-            'roadmap_views': roadmap_views,
-            'roadmap_generates': roadmap_generates,
-            'mentor_connects': mentor_connects,
-            'feed_likes': feed_likes,
-            'feed_comments': feed_comments,
-            'feed_shares': feed_shares,
-            'total_feed_engagement': feed_likes + feed_comments + feed_shares,
+            'roadmap_views': events['roadmap_views'],
+            'roadmap_generates': events['roadmap_generates'],
+            'mentor_connects': events['mentor_connects'],
+            'feed_likes': events['feed_likes'],
+            'feed_comments': events['feed_comments'],
+            'feed_shares': events['feed_shares'],
+            'total_feed_engagement': events['feed_likes'] + events['feed_comments'] + events['feed_shares'],
         },
         'score_distribution': {
-            'avg_ad_score': round(sum(l.ad_engagement_score for l in lead_scores) / total_leads, 2) if total_leads > 0 else 0,
-            'avg_career_score': round(sum(l.career_engagement_score for l in lead_scores) / total_leads, 2) if total_leads > 0 else 0,
-            'avg_feed_score': round(sum(l.feed_engagement_score for l in lead_scores) / total_leads, 2) if total_leads > 0 else 0,
-            'avg_mentor_score': round(sum(l.mentor_engagement_score for l in lead_scores) / total_leads, 2) if total_leads > 0 else 0,
+            'avg_ad_score': round(float(scores.avg_ad), 2),
+            'avg_career_score': round(float(scores.avg_career), 2),
+            'avg_feed_score': round(float(scores.avg_feed), 2),
+            'avg_mentor_score': round(float(scores.avg_mentor), 2),
         }
     }
 
@@ -476,30 +657,24 @@ def get_university_comparison(db: Session) -> List[Dict[str, Any]]:
     """
     Get lead analytics comparison across universities.
     """
-    universities = db.query(University).filter(University.is_enabled == True).all()
+    rows = db.execute(
+        select(University.id, University.name, *_lead_funnel_columns())
+        .join(LeadScore, LeadScore.university_id == University.id)
+        .where(University.is_enabled == True)
+        .group_by(University.id, University.name)
+    ).all()
     
     results = []
-    for uni in universities:
-        lead_scores = db.query(LeadScore).filter(LeadScore.university_id == uni.id).all()
-        
-        total = len(lead_scores)
-        if total == 0:
-            continue
-            
-        hot = sum(1 for l in lead_scores if l.lead_category == LeadCategory.HOT.value)
-        warm = sum(1 for l in lead_scores if l.lead_category == LeadCategory.WARM.value)
-        cold = sum(1 for l in lead_scores if l.lead_category == LeadCategory.COLD.value)
-        avg_score = sum(l.overall_score for l in lead_scores) / total
-        
+    for row in rows:
         results.append({
-            'university_id': uni.id,
-            'university_name': uni.name,
-            'total_leads': total,
-            'hot_leads': hot,
-            'warm_leads': warm,
-            'cold_leads': cold,
-            'avg_score': round(avg_score, 2),
-            'hot_percentage': round(hot / total * 100, 1),
+            'university_id': row.id,
+            'university_name': row.name,
+            'total_leads': row.total,
+            'hot_leads': row.hot,
+            'warm_leads': row.warm,
+            'cold_leads': row.cold,
+            'avg_score': round(float(row.avg_score), 2),
+            'hot_percentage': round(row.hot / row.total * 100, 1),
         })
     
     return sorted(results, key=lambda x: x['avg_score'], reverse=True)
@@ -560,51 +735,54 @@ def get_career_intelligence(
     }
 
 
+def _month_key(value: datetime) -> Tuple[int, int]:
+    return value.year, value.month
+
+
 def get_monthly_trends(
     db: Session,
     university_id: Optional[str] = None,
     months: int = 12
 ) -> List[Dict[str, Any]]:
     """
-    Get monthly engagement trends.
+    Get monthly engagement trends for the last `months` calendar months.
+    One query per table, grouped by date_trunc('month', created_at).
     """
     now = datetime.utcnow()
-    trends = []
+    first_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(months - 1):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+    
+    activity_month = func.date_trunc('month', LeadActivity.created_at, type_=DateTime).label('month')
+    activity_query = select(
+        activity_month,
+        _count_where(LeadActivity.event_category == 'ad').label('ad'),
+        _count_where(LeadActivity.event_category == 'career').label('career'),
+        _count_where(LeadActivity.event_category == 'feed').label('feed'),
+        _count_where(LeadActivity.event_category == 'mentor').label('mentor'),
+    ).where(LeadActivity.created_at >= first_month).group_by(activity_month)
+    if university_id:
+        activity_query = activity_query.where(LeadActivity.university_id == university_id)
     
-    for i in range(months - 1, -1, -1):
-        # Calculate month start and end
-        month_start = (now.replace(day=1) - timedelta(days=i * 30)).replace(day=1)
-        if i == 0:
-            month_end = now
-        else:
-            next_month = month_start.replace(day=28) + timedelta(days=4)
-            month_end = next_month.replace(day=1)
-        
-        # Query activities for this month
-        query = db.query(LeadActivity).filter(
-            LeadActivity.created_at >= month_start,
-            LeadActivity.created_at < month_end
-        )
-        
-        if university_id:
-            query = query.filter(LeadActivity.university_id == university_id)
-        
-        activities = query.all()
-        
-        # Calculate metrics
-        ad_engagement = sum(1 for a in activities if a.event_category == 'ad')
-        career_engagement = sum(1 for a in activities if a.event_category == 'career')
-        feed_engagement = sum(1 for a in activities if a.event_category == 'feed')
-        mentor_engagement = sum(1 for a in activities if a.event_category == 'mentor')
-        
-        # Count new leads this month
-        new_leads_query = db.query(LeadScore).filter(
-            LeadScore.created_at >= month_start,
-            LeadScore.created_at < month_end
+    engagement = {_month_key(row.month): row for row in db.execute(activity_query)}
+    
+    # New leads per month
+    lead_month = func.date_trunc('month', LeadScore.created_at, type_=DateTime).label('month')
+    lead_query = select(lead_month, func.count(LeadScore.id)).where(
+        LeadScore.created_at >= first_month
+    ).group_by(lead_month)
+    if university_id:
+        lead_query = lead_query.where(LeadScore.university_id == university_id)
+    
+    new_leads = {_month_key(month): count for month, count in db.execute(lead_query)}
+    
+    trends = []
+    month_start = first_month
+    for _ in range(months):
+        row = engagement.get(_month_key(month_start))
+        ad_engagement, career_engagement, feed_engagement, mentor_engagement = (
+            (row.ad, row.career, row.feed, row.mentor) if row else (0, 0, 0, 0)
         )
-        if university_id:
-            new_leads_query = new_leads_query.filter(LeadScore.university_id == university_id)
-        new_leads = new_leads_query.count()
         
         trends.append({
             'month': month_start.strftime('%b'),
@@ -614,8 +792,9 @@ def get_monthly_trends(
             'feed_engagement': feed_engagement,
             'mentor_engagement': mentor_engagement,
             'total_engagement': ad_engagement + career_engagement + feed_engagement + mentor_engagement,
-            'new_leads': new_leads,
+            'new_leads': new_leads.get(_month_key(month_start), 0),
         })
+        month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
     
     return trends
 
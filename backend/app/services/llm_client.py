@@ -0,0 +1,37 @@
+"""
+Shared async HTTP client for LLM providers (Groq / OpenAI)
+
+One httpx.AsyncClient per process keeps connections to the provider warm
+instead of opening a new TLS connection per chat question, and never blocks
+the event loop while waiting for a completion.
+"""
+
+from typing import Optional
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+LLM_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+LLM_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """Return the process-wide async client, creating it on first use."""
+    global _client
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=LLM_TIMEOUT, limits=LLM_LIMITS)
+    return _client
+
+
+async def close_llm_http_client():
+    """Close the shared client (called on application shutdown)."""
+    global _client
+
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
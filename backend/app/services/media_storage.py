@@ -0,0 +1,274 @@
+"""
+Media storage backends for files served by the API (the S3-less upload fallback)
+
+Files are stored as raw bytes in a blob store instead of base64 text in
+Postgres, and read back in byte ranges so the media endpoint can stream
+them and answer HTTP Range requests (video seeking) without loading the
+whole file.
+
+Backends:
+- local: a directory on disk; only available when MEDIA_STORAGE_PATH is set
+  explicitly, and it must be on a persistent disk shared by all instances
+  (the app filesystem on Render is wiped on every deploy)
+- s3: the configured S3 bucket, read with ranged GetObject calls
+
+The backend for new uploads is chosen with MEDIA_STORAGE_BACKEND.
+"""
+import os
+import hashlib
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+from app.core.logging import logger
+
+# Backend for new uploads: "local" or "s3"
+MEDIA_STORAGE_BACKEND = os.getenv("MEDIA_STORAGE_BACKEND", "local")
+# Root directory of the local backend; no default, so files never land on an ephemeral disk by accident
+MEDIA_STORAGE_PATH = Path(os.environ["MEDIA_STORAGE_PATH"]) if os.getenv("MEDIA_STORAGE_PATH") else None
+# Key prefix of the S3 backend
+MEDIA_S3_PREFIX = "alumni-portal/media-store"
+# Bytes read per chunk when saving and streaming
+MEDIA_STREAM_CHUNK_SIZE = 256 * 1024
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested byte range lies outside the file."""
+
+
+class MediaStorageNotConfigured(RuntimeError):
+    """The requested storage backend cannot be used with the current settings."""
+
+
+class MediaFileMissing(LookupError):
+    """The stored file for a key does not exist."""
+
+
+def parse_range_header(range_header: Optional[str], file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range HTTP Range header.
+    
+    Args:
+        range_header: Value of the Range header (e.g. "bytes=0-1023", "bytes=-500")
+        file_size: Total size of the file
+    
+    Returns:
+        Inclusive (start, end) byte offsets, or None to serve the whole file
+        (no header, or a form we don't support such as multiple ranges)
+    
+    Raises:
+        RangeNotSatisfiable: if the range starts beyond the end of the file
+    """
+    if not range_header or not range_header.startswith("bytes="):
+        return None
+    
+    spec = range_header[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+    
+    start_text, end_text = (part.strip() for part in spec.split("-", 1))
+    try:
+        start = int(start_text) if start_text else None
+        end = int(end_text) if end_text else None
+    except ValueError:
+        return None
+    
+    if start is None:
+        # Suffix range: the last N bytes
+        if not end or file_size == 0:
+            raise RangeNotSatisfiable(range_header)
+        return max(file_size - end, 0), file_size - 1
+    
+    if end is None:
+        end = file_size - 1
+    if start >= file_size or start > end:
+        raise RangeNotSatisfiable(range_header)
+    return start, min(end, file_size - 1)
+
+
+class MediaStorage:
+    """Interface of a media blob store; keys are relative paths like "media/<id>"."""
+    
+    name = "base"
+    
+    def save(self, key: str, fileobj: BinaryIO, content_type: str) -> Tuple[int, str]:
+        """
+        Store a file, reading it in chunks.
+        
+        Returns:
+            (size in bytes, quoted ETag)
+        """
+        raise NotImplementedError
+    
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        """
+        Open the file and return an iterator over the bytes from start to end
+        (inclusive) in chunks. The file is opened before this returns, so a
+        missing file is reported before any response is sent.
+        
+        Raises:
+            MediaFileMissing: if nothing is stored under key
+        """
+        raise NotImplementedError
+    
+    def delete(self, key: str) -> bool:
+        """Delete a stored file. Returns True if something was deleted."""
+        raise NotImplementedError
+
+
+class LocalMediaStorage(MediaStorage):
+    """Files in a local directory."""
+    
+    name = "local"
+    
+    def __init__(self, root: Optional[Path] = None):
+        root = root or MEDIA_STORAGE_PATH
+        if root is None:
+            raise MediaStorageNotConfigured(
+                "The local media storage backend needs MEDIA_STORAGE_PATH set to a persistent directory"
+            )
+        self.root = Path(root)
+    
+    def _path(self, key: str) -> Path:
+        path = (self.root / key).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Invalid media key: {key}")
+        return path
+    
+    def save(self, key: str, fileobj: BinaryIO, content_type: str) -> Tuple[int, str]:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        
+        digest = hashlib.md5()
+        size = 0
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as out:
+            while True:
+                chunk = fileobj.read(MEDIA_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                out.write(chunk)
+        os.replace(tmp_path, path)
+        
+        return size, f'"{digest.hexdigest()}"'
+    
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        try:
+            f = open(self._path(key), "rb")
+        except FileNotFoundError:
+            raise MediaFileMissing(key)
+        
+        def chunks():
+            with f:
+                f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = f.read(min(MEDIA_STREAM_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    yield chunk
+        
+        return chunks()
+    
+    def delete(self, key: str) -> bool:
+        path = self._path(key)
+        if path.exists():
+            path.unlink()
+            return True
+        return False
+
+
+class S3MediaStorage(MediaStorage):
+    """Objects in the configured S3 bucket."""
+    
+    name = "s3"
+    
+    def __init__(self, s3=None):
+        from app.services.s3_service import s3_service
+        
+        self.s3 = s3 or s3_service
+    
+    def _key(self, key: str) -> str:
+        return f"{MEDIA_S3_PREFIX}/{key}"
+    
+    def save(self, key: str, fileobj: BinaryIO, content_type: str) -> Tuple[int, str]:
+        if not self.s3.is_configured():
+            raise RuntimeError("S3 is not configured")
+        
+        # upload_fileobj streams the file in parts (multipart above its threshold)
+        self.s3.s3_client.upload_fileobj(
+            fileobj, self.s3.bucket_name, self._key(key),
+            ExtraArgs={"ContentType": content_type}
+        )
+        head = self.s3.s3_client.head_object(Bucket=self.s3.bucket_name, Key=self._key(key))
+        return head["ContentLength"], head["ETag"]
+    
+    def iter_range(self, key: str, start: int, end: int) -> Iterator[bytes]:
+        try:
+            response = self.s3.s3_client.get_object(
+                Bucket=self.s3.bucket_name,
+                Key=self._key(key),
+                Range=f"bytes={start}-{end}"
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise MediaFileMissing(key)
+            raise
+        body = response["Body"]
+        
+        def chunks():
+            try:
+                yield from body.iter_chunks(MEDIA_STREAM_CHUNK_SIZE)
+            finally:
+                body.close()
+        
+        return chunks()
+    
+    def delete(self, key: str) -> bool:
+        if not self.s3.is_configured():
+            return False
+        self.s3.s3_client.delete_object(Bucket=self.s3.bucket_name, Key=self._key(key))
+        return True
+
+
+STORAGE_BACKENDS = {
+    "local": LocalMediaStorage,
+    "s3": S3MediaStorage,
+}
+
+_storages: Dict[str, MediaStorage] = {}
+
+
+def get_media_storage(name: Optional[str] = None) -> MediaStorage:
+    """
+    Return the storage backend by name (default: MEDIA_STORAGE_BACKEND).
+    Instances are created once and reused.
+    """
+    name = name or MEDIA_STORAGE_BACKEND
+    if name not in _storages:
+        if name not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown media storage backend: {name}")
+        _storages[name] = STORAGE_BACKENDS[name]()
+        logger.info(f"Media storage backend: {name}")
+    return _storages[name]
+
+
+def check_media_storage_config() -> Optional[str]:
+    """
+    Problem with the configured upload backend, or None if it is usable.
+    Logged at startup; uploads to a refused backend fail with a clear error.
+    """
+    if MEDIA_STORAGE_BACKEND not in STORAGE_BACKENDS:
+        return f"Unknown MEDIA_STORAGE_BACKEND: {MEDIA_STORAGE_BACKEND}"
+    if MEDIA_STORAGE_BACKEND == "local" and MEDIA_STORAGE_PATH is None:
+        return "MEDIA_STORAGE_BACKEND=local but MEDIA_STORAGE_PATH is not set; uploads without S3 are disabled"
+    return None
+
+
+def media_storage_key(media_id: str) -> str:
+    """Storage key of a Media row's file."""
+    return f"media/{media_id}"
@@ -0,0 +1,226 @@
+"""
+Real-time push: in-process hub plus a cross-worker broker
+
+Connected clients (WebSocket or SSE, see app.api.routes.realtime) subscribe
+to their user ID on the ConnectionHub of the worker they landed on. Events
+are published through a broker:
+- InMemoryBroker: delivers straight to this worker's hub (single worker,
+  development and tests)
+- RedisBroker: Redis pub/sub, so an event published on any worker reaches
+  the user's connections on every worker; used when REALTIME_REDIS_URL is
+  set and the redis package is installed
+
+Events are plain dicts with a "type": message, group_message, notification,
+badge (unread count deltas) and counts (absolute, sent on connect).
+
+Events about database changes should only go out once the change is
+committed: queue_event stores them on the session and they are published
+from its after_commit hook (dropped on rollback). publish can be called from
+the event loop or from worker threads (sync routes).
+"""
+
+import os
+import json
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # pragma: no cover - optional cross-worker broker
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+REALTIME_REDIS_URL = os.getenv("REALTIME_REDIS_URL")
+REALTIME_REDIS_CHANNEL = os.getenv("REALTIME_REDIS_CHANNEL", "realtime:events")
+REALTIME_QUEUE_SIZE = int(os.getenv("REALTIME_QUEUE_SIZE", "100"))  # Pending events per connection
+
+_PENDING_EVENTS = "realtime_pending_events"  # Session.info key
+
+
+# ==============================================================================
+# HUB
+# ==============================================================================
+
+class Subscription:
+    """One client connection's event queue."""
+    
+    def __init__(self, hub: "ConnectionHub", user_id: str):
+        self.hub = hub
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=REALTIME_QUEUE_SIZE)
+    
+    def put(self, payload: dict):
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            # Slow client: drop what it missed and tell it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+    
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class ConnectionHub:
+    """Subscriptions of the clients connected to this worker, by user ID (event loop only)."""
+    
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = defaultdict(set)
+    
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id)
+        self._subscriptions[user_id].add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is not None:
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+    
+    def deliver(self, user_ids: Iterable[str], payload: dict):
+        for user_id in user_ids:
+            for subscription in list(self._subscriptions.get(user_id, ())):
+                subscription.put(payload)
+    
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+
+# ==============================================================================
+# BROKERS
+# ==============================================================================
+
+class InMemoryBroker:
+    """Delivers to this worker's hub only."""
+    
+    name = "memory"
+    
+    def __init__(self, hub: ConnectionHub):
+        self.hub = hub
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    async def publish(self, user_ids: List[str], payload: dict):
+        self.hub.deliver(user_ids, payload)
+
+
+class RedisBroker:
+    """Redis pub/sub on one channel; every worker delivers to its own connections."""
+    
+    name = "redis"
+    
+    def __init__(self, hub: ConnectionHub, url: str, channel: str = REALTIME_REDIS_CHANNEL):
+        self.hub = hub
+        self.channel = channel
+        self.client = redis_asyncio.Redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+        await self.client.aclose()
+    
+    async def publish(self, user_ids: List[str], payload: dict):
+        try:
+            await self.client.publish(self.channel, json.dumps({"user_ids": user_ids, "payload": payload}))
+        except redis_asyncio.RedisError as e:
+            logger.warning(f"Realtime publish failed: {e}")
+    
+    async def _listen(self):
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self.hub.deliver(data["user_ids"], data["payload"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Realtime Redis listener error, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+
+# ==============================================================================
+# BUS
+# ==============================================================================
+
+class RealtimeBus:
+    """Hub plus broker for this worker; started and stopped from the app lifespan."""
+    
+    def __init__(self):
+        self.hub = ConnectionHub()
+        self.broker = self._create_broker()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def _create_broker(self):
+        if REALTIME_REDIS_URL and redis_asyncio is not None:
+            return RedisBroker(self.hub, REALTIME_REDIS_URL)
+        if REALTIME_REDIS_URL:
+            logger.warning("REALTIME_REDIS_URL is set but redis is not installed; events stay on this worker")
+        return InMemoryBroker(self.hub)
+    
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start()
+        logger.info(f"Realtime bus started ({self.broker.name} broker)")
+    
+    async def stop(self):
+        await self.broker.stop()
+        self._loop = None
+    
+    def subscribe(self, user_id: str) -> Subscription:
+        return self.hub.subscribe(user_id)
+    
+    def publish(self, user_ids: Iterable[str], payload: dict):
+        """Send an event to users' connections; safe to call from any thread."""
+        user_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id]
+        if not user_ids or self._loop is None:
+            return  # Not started (scripts, tests) or nobody to tell
+        
+        asyncio.run_coroutine_threadsafe(self.broker.publish(user_ids, payload), self._loop)
+
+
+realtime_bus = RealtimeBus()
+
+
+def queue_event(session, user_ids: Iterable[str], payload: dict):
+    """Publish an event when the session's transaction commits."""
+    session.info.setdefault(_PENDING_EVENTS, []).append((list(user_ids), payload))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_events(session):
+    for user_ids, payload in session.info.pop(_PENDING_EVENTS, ()):
+        realtime_bus.publish(user_ids, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session):
+    session.info.pop(_PENDING_EVENTS, None)
@@ -1,12 +1,30 @@
 """
 S3 Service for media uploads (images, videos, and documents)
 Uses CloudFront for serving files when configured
-Supports large file uploads up to 500MB using multipart upload
+Supports large file uploads up to 500MB using streaming multipart upload:
+uploads are read part by part and never held in memory as a whole
+
+Presigned direct uploads that are never completed must not pile up in the
+bucket. Every presigned URL signs its exact Content-Length. Single PUTs land
+under PRESIGNED_PENDING_PREFIX and are only moved to their final key by
+/complete. Multipart uploads create no object until they are completed. Two
+bucket lifecycle rules clean up the rest (see ensure_upload_lifecycle_rules):
+- expire objects under PRESIGNED_PENDING_PREFIX after UPLOAD_CLEANUP_DAYS
+- abort incomplete multipart uploads after UPLOAD_CLEANUP_DAYS
+Set S3_MANAGE_UPLOAD_LIFECYCLE=true to have the app add them at startup
+(needs s3:GetLifecycleConfiguration and s3:PutLifecycleConfiguration), or
+create the same rules in the S3 console.
 """
+import io
+import os
+import math
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import boto3
 from botocore.exceptions import ClientError
 from botocore.config import Config
-from typing import Optional, Tuple
+from typing import Awaitable, Callable, Optional, Tuple
 import uuid
 from pathlib import Path
 from fastapi import UploadFile
@@ -18,13 +36,37 @@ BOTO_CONFIG = Config(
     retries={'max_attempts': 3, 'mode': 'adaptive'},
     max_pool_connections=50,
     connect_timeout=60,
-    read_timeout=300  # 5 minutes for large uploads
+    read_timeout=300,  # 5 minutes for large uploads
+    signature_version='s3v4'  # Presigned URLs must sign Content-Length (SigV2 URLs can't)
 )
 
-# Multipart upload threshold (100MB)
-MULTIPART_THRESHOLD = 100 * 1024 * 1024
-# Multipart chunk size (50MB)
-MULTIPART_CHUNKSIZE = 50 * 1024 * 1024
+# Multipart part size (16MB); files that fit in one part use a single PUT
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+# Parts of one upload in flight at once; bounds memory to this many parts per upload
+MULTIPART_CONCURRENCY = 4
+# Threads shared by all uploads for blocking boto3 calls
+UPLOAD_WORKERS = 8
+
+# Presigned direct uploads: URL lifetime and part size (single PUT up to one part)
+PRESIGNED_URL_EXPIRY = 3600
+PRESIGNED_PART_SIZE = 64 * 1024 * 1024
+# Single-PUT uploads wait here until /complete moves them to their final key
+PRESIGNED_PENDING_PREFIX = "alumni-portal/pending-uploads"
+UPLOAD_CLEANUP_DAYS = 1
+UPLOAD_LIFECYCLE_RULE_IDS = ("alumni-portal-expire-pending-uploads", "alumni-portal-abort-incomplete-multipart")
+S3_MANAGE_UPLOAD_LIFECYCLE = os.getenv("S3_MANAGE_UPLOAD_LIFECYCLE", "false").lower() == "true"
+
+_upload_executor = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS, thread_name_prefix="s3-upload")
+
+
+def _bytes_reader(file_content: bytes) -> Callable[[int], Awaitable[bytes]]:
+    """Wrap in-memory content in the async read(size) interface of UploadFile."""
+    buffer = io.BytesIO(file_content)
+    
+    async def read(size: int) -> bytes:
+        return buffer.read(size)
+    
+    return read
 
 
 class S3Service:
@@ -36,6 +78,7 @@ class S3Service:
         self.access_key = getattr(settings, 'AWS_ACCESS_KEY_ID', None)
         self.secret_key = getattr(settings, 'AWS_SECRET_ACCESS_KEY', None)
         self.cloudfront_url = getattr(settings, 'CLOUDFRONT_URL', None)
+        self.endpoint_url = getattr(settings, 'S3_ENDPOINT_URL', None)
         
         # Clean CloudFront URL (remove trailing slash if present)
         if self.cloudfront_url:
@@ -52,6 +95,7 @@ class S3Service:
                     aws_access_key_id=self.access_key,
                     aws_secret_access_key=self.secret_key,
                     region_name=self.region,
+                    endpoint_url=self.endpoint_url,
                     config=BOTO_CONFIG
                 )
                 logger.info(f"S3 Service initialized: Bucket={self.bucket_name}, Region={self.region}, CloudFront={'YES' if self.cloudfront_url else 'NO'}")
@@ -82,6 +126,9 @@ class S3Service:
         if self.cloudfront_url:
             # Use CloudFront URL
             return f"{self.cloudfront_url}/{key}"
+        elif self.endpoint_url:
+            # S3-compatible endpoint (path-style)
+            return f"{self.endpoint_url.rstrip('/')}/{self.bucket_name}/{key}"
         else:
             # Fall back to S3 URL
             if self.region == 'us-east-1':
@@ -89,65 +136,122 @@ class S3Service:
             else:
                 return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
     
-    def _multipart_upload(self, key: str, file_content: bytes, content_type: str) -> bool:
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking boto3 call on the shared upload thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_upload_executor, functools.partial(func, *args, **kwargs))
+    
+    async def _upload_part(self, key: str, upload_id: str, part_number: int, body: bytes) -> Tuple[int, str]:
+        """Upload one part and return (part number, ETag)"""
+        response = await self._run(
+            self.s3_client.upload_part,
+            Bucket=self.bucket_name,
+            Key=key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            Body=body
+        )
+        logger.info(f"Uploaded part {part_number} ({len(body)} bytes)")
+        return part_number, response['ETag']
+    
+    async def _multipart_upload(
+        self,
+        key: str,
+        first_part: bytes,
+        read: Callable[[int], Awaitable[bytes]],
+        content_type: str
+    ) -> int:
         """
-        Perform multipart upload for large files
+        Perform multipart upload for large files, streaming from `read`.
+        
+        Parts are read one at a time and uploaded concurrently; at most
+        MULTIPART_CONCURRENCY parts are in memory at once. Raises on failure
+        after aborting the upload. Returns the number of bytes uploaded.
         """
+        # Initiate multipart upload
+        response = await self._run(
+            self.s3_client.create_multipart_upload,
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type
+        )
+        upload_id = response['UploadId']
+        
+        etags = {}
+        pending = set()
+        part_number = 0
+        total_size = 0
+        
         try:
-            # Initiate multipart upload
-            response = self.s3_client.create_multipart_upload(
-                Bucket=self.bucket_name,
-                Key=key,
-                ContentType=content_type
-            )
-            upload_id = response['UploadId']
-            
-            parts = []
-            part_number = 1
-            
-            # Upload parts
-            for i in range(0, len(file_content), MULTIPART_CHUNKSIZE):
-                chunk = file_content[i:i + MULTIPART_CHUNKSIZE]
-                
-                part_response = self.s3_client.upload_part(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    PartNumber=part_number,
-                    UploadId=upload_id,
-                    Body=chunk
-                )
+            chunk = first_part
+            while chunk:
+                part_number += 1
+                total_size += len(chunk)
+                pending.add(asyncio.ensure_future(self._upload_part(key, upload_id, part_number, chunk)))
+                chunk = None
                 
-                parts.append({
-                    'PartNumber': part_number,
-                    'ETag': part_response['ETag']
-                })
+                # Wait for a free slot before reading the next part
+                if len(pending) >= MULTIPART_CONCURRENCY:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        number, etag = task.result()
+                        etags[number] = etag
                 
-                logger.info(f"Uploaded part {part_number} ({len(chunk)} bytes)")
-                part_number += 1
+                chunk = await read(MULTIPART_CHUNKSIZE)
+            
+            if pending:
+                done, pending = await asyncio.wait(pending)
+                for task in done:
+                    number, etag = task.result()
+                    etags[number] = etag
             
             # Complete multipart upload
-            self.s3_client.complete_multipart_upload(
+            await self._run(
+                self.s3_client.complete_multipart_upload,
                 Bucket=self.bucket_name,
                 Key=key,
                 UploadId=upload_id,
-                MultipartUpload={'Parts': parts}
+                MultipartUpload={'Parts': [{'PartNumber': number, 'ETag': etags[number]} for number in sorted(etags)]}
             )
             
-            logger.info(f"Multipart upload completed: {key}")
-            return True
+            logger.info(f"Multipart upload completed: {key} ({part_number} parts)")
+            return total_size
             
-        except Exception as e:
-            logger.error(f"Multipart upload failed: {e}")
-            # Try to abort the multipart upload
+        except BaseException as e:
+            logger.error(f"Multipart upload failed: {e!r}")
+            # Let in-flight parts finish, then try to abort the multipart upload
+            await asyncio.gather(*pending, return_exceptions=True)
             try:
-                self.s3_client.abort_multipart_upload(
+                await self._run(
+                    self.s3_client.abort_multipart_upload,
                     Bucket=self.bucket_name,
                     Key=key,
                     UploadId=upload_id
                 )
-            except:
+            except Exception:
                 pass
-            return False
+            raise
+    
+    async def _stream_upload(self, key: str, read: Callable[[int], Awaitable[bytes]], content_type: str) -> int:
+        """
+        Upload from an async reader: a single PUT if the content fits in one
+        part, multipart otherwise. Returns the number of bytes uploaded.
+        """
+        first_part = await read(MULTIPART_CHUNKSIZE)
+        
+        if len(first_part) < MULTIPART_CHUNKSIZE:
+            # Regular upload for smaller files
+            await self._run(
+                self.s3_client.put_object,
+                Bucket=self.bucket_name,
+                Key=key,
+                Body=first_part,
+                ContentType=content_type
+            )
+            return len(first_part)
+        
+        logger.info(f"Using multipart upload for large file: {key}")
+        return await self._multipart_upload(key, first_part, read, content_type)
     
     async def upload_file(
         self,
@@ -157,7 +261,8 @@ class S3Service:
     ) -> Optional[str]:
         """
         Upload file to S3 (supports files up to 500MB)
-        Uses multipart upload for files > 100MB
+        Streams the upload's spool file in parts instead of reading it whole;
+        uses multipart upload for files larger than one part
         Returns: CloudFront/S3 URL or None on error
         """
         if not self.s3_client:
@@ -170,35 +275,20 @@ class S3Service:
             file_ext = self._get_file_extension(file.filename)
             key = self._generate_key(folder, file.filename, file_ext)
             
-            # Read file content
-            file_content = await file.read()
-            file_size = len(file_content)
-            
             # Determine content type
             if not content_type:
                 content_type = file.content_type or 'application/octet-stream'
             
-            logger.info(f"Uploading to S3: {key} ({file_size / (1024*1024):.2f} MB, {content_type})")
+            logger.info(f"Uploading to S3: {key} ({content_type})")
             
-            # Use multipart upload for large files
-            if file_size > MULTIPART_THRESHOLD:
-                logger.info(f"Using multipart upload for large file ({file_size / (1024*1024):.2f} MB)")
-                success = self._multipart_upload(key, file_content, content_type)
-                if not success:
-                    return None
-            else:
-                # Regular upload for smaller files
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    Body=file_content,
-                    ContentType=content_type
-                )
+            # Stream from the start of the spooled upload
+            await file.seek(0)
+            file_size = await self._stream_upload(key, file.read, content_type)
             
             # Generate public URL (CloudFront or S3)
             url = self._get_public_url(key)
             
-            logger.info(f"File uploaded successfully: {url}")
+            logger.info(f"File uploaded successfully: {url} ({file_size / (1024*1024):.2f} MB)")
             return url
             
         except ClientError as e:
@@ -235,20 +325,7 @@ class S3Service:
             
             logger.info(f"Uploading to S3: {key} ({file_size / (1024*1024):.2f} MB, {content_type})")
             
-            # Use multipart upload for large files
-            if file_size > MULTIPART_THRESHOLD:
-                logger.info(f"Using multipart upload for large file ({file_size / (1024*1024):.2f} MB)")
-                success = self._multipart_upload(key, file_content, content_type)
-                if not success:
-                    return None
-            else:
-                # Regular upload for smaller files
-                self.s3_client.put_object(
-                    Bucket=self.bucket_name,
-                    Key=key,
-                    Body=file_content,
-                    ContentType=content_type
-                )
+            await self._stream_upload(key, _bytes_reader(file_content), content_type)
             
             # Generate public URL
             url = self._get_public_url(key)
@@ -289,6 +366,162 @@ class S3Service:
         """Upload document file to S3 (max 500MB)"""
         return await self.upload_file(file, folder=folder, content_type=file.content_type)
     
+    def create_presigned_upload(self, folder: str, filename: str, content_type: str, file_size: int) -> dict:
+        """
+        Prepare a direct browser-to-S3 upload under a server-chosen key.
+        
+        Files up to PRESIGNED_PART_SIZE get one presigned PUT URL (content
+        type and length signed) for a pending key; larger files get a
+        multipart upload with one presigned URL per part (each part's length
+        signed). S3 rejects bodies of any other size. The bucket's CORS
+        policy must allow PUT from the frontend origin.
+        
+        Returns: dict with key, upload_id (None for a single PUT), part_size and
+        parts: [{"part_number", "url"}]
+        """
+        key = self._generate_key(folder, filename, self._get_file_extension(filename))
+        
+        if file_size <= PRESIGNED_PART_SIZE:
+            url = self.s3_client.generate_presigned_url(
+                'put_object',
+                Params={
+                    'Bucket': self.bucket_name,
+                    'Key': self._pending_key(key),
+                    'ContentType': content_type,
+                    'ContentLength': file_size
+                },
+                ExpiresIn=PRESIGNED_URL_EXPIRY
+            )
+            return {"key": key, "upload_id": None, "part_size": file_size, "parts": [{"part_number": 1, "url": url}]}
+        
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            ContentType=content_type
+        )['UploadId']
+        
+        part_count = math.ceil(file_size / PRESIGNED_PART_SIZE)
+        parts = [
+            {
+                "part_number": part_number,
+                "url": self.s3_client.generate_presigned_url(
+                    'upload_part',
+                    Params={
+                        'Bucket': self.bucket_name,
+                        'Key': key,
+                        'UploadId': upload_id,
+                        'PartNumber': part_number,
+                        # Full parts, then the remainder
+                        'ContentLength': min(PRESIGNED_PART_SIZE, file_size - (part_number - 1) * PRESIGNED_PART_SIZE)
+                    },
+                    ExpiresIn=PRESIGNED_URL_EXPIRY
+                )
+            }
+            for part_number in range(1, part_count + 1)
+        ]
+        return {"key": key, "upload_id": upload_id, "part_size": PRESIGNED_PART_SIZE, "parts": parts}
+    
+    def _pending_key(self, key: str) -> str:
+        """Where a single-PUT upload for key is stored until it is completed"""
+        return f"{PRESIGNED_PENDING_PREFIX}/{key}"
+    
+    def complete_presigned_upload(self, key: str, upload_id: Optional[str] = None) -> dict:
+        """
+        Finish a direct upload and describe the stored object.
+        
+        For multipart uploads the parts are listed server-side (the client's
+        ETags are not trusted) and the upload is completed first; single PUTs
+        are copied from their pending key to the final key.
+        
+        Returns: dict with size, content_type and etag from a HEAD request
+        Raises: ClientError if the object (or an uploaded part) is missing
+        """
+        if upload_id:
+            parts = []
+            paginator = self.s3_client.get_paginator('list_parts')
+            for page in paginator.paginate(Bucket=self.bucket_name, Key=key, UploadId=upload_id):
+                parts.extend({'PartNumber': part['PartNumber'], 'ETag': part['ETag']} for part in page.get('Parts', []))
+            
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        else:
+            pending_key = self._pending_key(key)
+            # Server-side copy (single PUTs are at most PRESIGNED_PART_SIZE)
+            self.s3_client.copy_object(
+                Bucket=self.bucket_name,
+                Key=key,
+                CopySource={'Bucket': self.bucket_name, 'Key': pending_key}
+            )
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=pending_key)
+        
+        head = self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+        return {
+            "size": head['ContentLength'],
+            "content_type": head.get('ContentType'),
+            "etag": head.get('ETag'),
+        }
+    
+    def abort_presigned_upload(self, key: str, upload_id: Optional[str] = None):
+        """Abandon a direct upload: abort the multipart upload and delete anything stored"""
+        if upload_id:
+            try:
+                self.s3_client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+            except ClientError:
+                pass
+        else:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=self._pending_key(key))
+        self.s3_client.delete_object(Bucket=self.bucket_name, Key=key)
+    
+    def ensure_upload_lifecycle_rules(self) -> bool:
+        """
+        Add the bucket lifecycle rules that clean up abandoned presigned
+        uploads, keeping any other rules the bucket already has.
+        
+        Returns: True if the rules are in place, False if they could not be set
+        """
+        if not self.s3_client:
+            return False
+        
+        try:
+            try:
+                rules = self.s3_client.get_bucket_lifecycle_configuration(Bucket=self.bucket_name)['Rules']
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'NoSuchLifecycleConfiguration':
+                    raise
+                rules = []
+            
+            existing_ids = {rule.get('ID') for rule in rules}
+            if all(rule_id in existing_ids for rule_id in UPLOAD_LIFECYCLE_RULE_IDS):
+                return True
+            
+            rules = [rule for rule in rules if rule.get('ID') not in UPLOAD_LIFECYCLE_RULE_IDS] + [
+                {
+                    'ID': UPLOAD_LIFECYCLE_RULE_IDS[0],
+                    'Filter': {'Prefix': f"{PRESIGNED_PENDING_PREFIX}/"},
+                    'Status': 'Enabled',
+                    'Expiration': {'Days': UPLOAD_CLEANUP_DAYS},
+                },
+                {
+                    'ID': UPLOAD_LIFECYCLE_RULE_IDS[1],
+                    'Filter': {'Prefix': ''},
+                    'Status': 'Enabled',
+                    'AbortIncompleteMultipartUpload': {'DaysAfterInitiation': UPLOAD_CLEANUP_DAYS},
+                },
+            ]
+            self.s3_client.put_bucket_lifecycle_configuration(
+                Bucket=self.bucket_name,
+                LifecycleConfiguration={'Rules': rules}
+            )
+            logger.info(f"S3 lifecycle rules for abandoned uploads added to {self.bucket_name}")
+            return True
+        except ClientError as e:
+            logger.warning(f"Could not set S3 lifecycle rules for abandoned uploads: {str(e)}")
+            return False
+    
     def delete_file(self, url: str) -> bool:
         """
         Delete file from S3 using URL
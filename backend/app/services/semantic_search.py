@@ -0,0 +1,216 @@
+"""
+Semantic Search Engine for the Knowledge Base
+
+In-process vector search over knowledge base chunks:
+- Chunk embeddings live in one contiguous float32 matrix
+- A query is scored against every chunk with a single matrix-vector product
+- Top-k selection uses argpartition instead of a full sort
+
+Embedders are pluggable. The default hashing embedder needs no model files or
+network access and is deterministic across processes; a sentence-transformers
+model can be selected with KB_EMBEDDER when that package is installed.
+
+NumPy is optional: without it, semantic retrieval is unavailable and callers
+fall back to BM25.
+"""
+
+import os
+import zlib
+import math
+from typing import Callable, Dict, List, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the deployment
+    np = None
+
+from app.services.knowledge_base import tokenize
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+HASHING_DIMENSION = 1024  # Width of the hashing embedder's vectors
+EMBED_BATCH_SIZE = 256  # Chunks embedded per call when building an index
+
+# "hashing" (default) or "sentence-transformers:<model name>"
+KB_EMBEDDER = os.getenv("KB_EMBEDDER", "hashing")
+
+
+def is_available() -> bool:
+    """True if NumPy is installed and semantic search can be used."""
+    return np is not None
+
+
+# ==============================================================================
+# EMBEDDERS
+# ==============================================================================
+
+class HashingEmbedder:
+    """
+    Deterministic feature-hashing embedder (keyword unigrams + bigrams).
+    
+    Each term is hashed with CRC32 into one of `dimension` buckets with a
+    hash-derived sign, weighted by log term frequency, and the vector is
+    L2-normalized. Works offline and gives identical vectors in every worker.
+    """
+    
+    name = "hashing"
+    
+    def __init__(self, dimension: int = HASHING_DIMENSION):
+        self.dimension = dimension
+    
+    def _features(self, text: str) -> Dict[int, float]:
+        words = tokenize(text)
+        terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        
+        features: Dict[int, float] = {}
+        for term, count in counts.items():
+            hashed = zlib.crc32(term.encode('utf-8'))
+            bucket = hashed % self.dimension
+            sign = 1.0 if (hashed >> 31) & 1 else -1.0
+            features[bucket] = features.get(bucket, 0.0) + sign * (1.0 + math.log(count))
+        return features
+    
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts into an (n, dimension) float32 matrix of unit vectors."""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, value in self._features(text).items():
+                matrix[row, bucket] = value
+        return _normalize_rows(matrix)
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (requires the sentence-transformers package)."""
+    
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        
+        self.name = f"sentence-transformers:{model_name}"
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+    
+    def embed(self, texts: List[str]) -> "np.ndarray":
+        """Embed texts into an (n, dimension) float32 matrix of unit vectors."""
+        vectors = self.model.encode(texts, batch_size=EMBED_BATCH_SIZE, convert_to_numpy=True)
+        return _normalize_rows(np.ascontiguousarray(vectors, dtype=np.float32))
+
+
+# Embedder factories by scheme; extra embedders can be registered at import time
+EMBEDDER_FACTORIES: Dict[str, Callable[[str], object]] = {
+    "hashing": lambda option: HashingEmbedder(int(option) if option else HASHING_DIMENSION),
+    "sentence-transformers": SentenceTransformerEmbedder,
+}
+
+_embedder = None
+
+
+def register_embedder(scheme: str, factory: Callable[[str], object]):
+    """Register an embedder factory selectable via KB_EMBEDDER=<scheme>:<option>."""
+    EMBEDDER_FACTORIES[scheme] = factory
+
+
+def get_embedder():
+    """
+    Return the process-wide embedder selected by KB_EMBEDDER.
+    Falls back to the hashing embedder if the configured one cannot be loaded.
+    """
+    global _embedder
+    
+    if _embedder is None:
+        scheme, _, option = KB_EMBEDDER.partition(":")
+        factory = EMBEDDER_FACTORIES.get(scheme)
+        try:
+            if factory is None:
+                raise ValueError(f"unknown embedder '{scheme}'")
+            _embedder = factory(option)
+        except Exception as e:
+            logger.warning(f"Could not load embedder {KB_EMBEDDER}: {e}. Using hashing embedder.")
+            _embedder = HashingEmbedder()
+        logger.info(f"Knowledge base embedder: {_embedder.name} ({_embedder.dimension} dimensions)")
+    
+    return _embedder
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    """L2-normalize each row in place; all-zero rows are left as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+
+# ==============================================================================
+# VECTOR INDEX
+# ==============================================================================
+
+class VectorIndex:
+    """
+    Immutable matrix of chunk embeddings.
+    
+    Row i of `matrix` is the unit embedding of `chunk_ids[i]`. Updates return
+    a new index (see patched), matching the copy-on-write SearchIndex.
+    """
+    
+    def __init__(self, chunk_ids: List[str], matrix: "np.ndarray", embedder):
+        self.chunk_ids = chunk_ids
+        self.matrix = matrix
+        self.embedder = embedder
+    
+    @classmethod
+    def build(cls, chunks, embedder=None) -> "VectorIndex":
+        """Embed chunks in batches into a single contiguous float32 matrix."""
+        embedder = embedder or get_embedder()
+        matrix = np.empty((len(chunks), embedder.dimension), dtype=np.float32)
+        for start in range(0, len(chunks), EMBED_BATCH_SIZE):
+            batch = chunks[start:start + EMBED_BATCH_SIZE]
+            matrix[start:start + len(batch)] = embedder.embed([chunk.content for chunk in batch])
+        return cls([chunk.chunk_id for chunk in chunks], matrix, embedder)
+    
+    def patched(self, removed, added) -> "VectorIndex":
+        """Return a new index without `removed` chunks and with `added` chunks appended."""
+        removed_ids = {chunk.chunk_id for chunk in removed}
+        keep = np.fromiter((chunk_id not in removed_ids for chunk_id in self.chunk_ids), dtype=bool,
+                           count=len(self.chunk_ids))
+        chunk_ids = [chunk_id for chunk_id, kept in zip(self.chunk_ids, keep) if kept]
+        matrix = self.matrix[keep]
+        
+        if added:
+            added_matrix = self.embedder.embed([chunk.content for chunk in added])
+            matrix = np.vstack([matrix, added_matrix])
+            chunk_ids += [chunk.chunk_id for chunk in added]
+        
+        return VectorIndex(chunk_ids, np.ascontiguousarray(matrix, dtype=np.float32), self.embedder)
+    
+    def search(self, query: str, top_k: int) -> List[Tuple[float, str]]:
+        """
+        Cosine similarity search.
+        
+        Args:
+            query: Query text
+            top_k: Number of results to return
+        
+        Returns:
+            List of (similarity, chunk_id), best first; non-positive matches are dropped
+        """
+        if not self.chunk_ids or top_k <= 0:
+            return []
+        
+        query_vector = self.embedder.embed([query])[0]
+        scores = self.matrix @ query_vector
+        
+        if len(scores) > top_k:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        
+        return [(float(scores[i]), self.chunk_ids[i]) for i in ranked if scores[i] > 0]
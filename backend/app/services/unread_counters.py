@@ -0,0 +1,333 @@
+"""
+Materialized unread counters
+
+Unread badges are polled every few seconds by every logged-in user, so they
+read counters instead of counting rows:
+- user_unread_counters: unread messages and notifications per user
+- conversations.user1_unread_count / user2_unread_count: per participant
+
+The counters change in the same transaction as the rows they count:
+- Notifications added, marked read or deleted through the ORM are picked up
+  by a session hook (they are created from many routes and services); bulk
+  UPDATE/DELETE statements adjust the counter explicitly
+- Messages are sent and marked read only by the messages routes, which call
+  record_message_sent / mark_conversation_read
+
+Each change is also pushed to the user's open connections as a "badge"
+event (app.services.realtime) once the transaction commits.
+
+repair_unread_counters recomputes every counter set-wise from messages and
+notifications every UNREAD_COUNTER_REPAIR_INTERVAL seconds to correct drift
+from changes made outside these paths (scripts, raw SQL, deleted
+conversations). At startup it only runs to fill an empty counters table.
+It writes only rows whose stored count differs from the recomputed one, and
+on Postgres holds an advisory lock so only one worker repairs at a time.
+"""
+
+import os
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, func, case, literal, union_all, event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.message import Conversation, Message
+from app.models.notification import Notification
+from app.models.unread_counter import UnreadCounter
+from app.services.realtime import queue_event
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# CONSTANTS
+# ==============================================================================
+
+# Seconds between repair runs; 0 disables the background repair
+UNREAD_COUNTER_REPAIR_INTERVAL = float(os.getenv("UNREAD_COUNTER_REPAIR_INTERVAL", "21600"))
+
+# pg_try_advisory_xact_lock key held for the duration of a repair
+_REPAIR_LOCK_KEY = 0x756E7265616431  # "unread1"
+
+
+# ==============================================================================
+# COUNTER UPDATES
+# ==============================================================================
+
+def _adjusted(column, delta: int):
+    """column + delta, never below zero."""
+    if delta >= 0:
+        return column + delta
+    return case((column + delta < 0, 0), else_=column + delta)
+
+
+def _adjust_counter(dialect_name: str, user_id: str, messages: int = 0, notifications: int = 0):
+    """Upsert adding deltas to a user's counters."""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    statement = dialect_insert(UnreadCounter).values(
+        user_id=user_id,
+        messages=max(messages, 0),
+        notifications=max(notifications, 0)
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[UnreadCounter.user_id],
+        set_={
+            "messages": _adjusted(UnreadCounter.messages, messages),
+            "notifications": _adjusted(UnreadCounter.notifications, notifications),
+            "updated_at": func.now(),
+        }
+    )
+
+
+def _badge_event(messages: int = 0, notifications: int = 0) -> dict:
+    return {"type": "badge", "messages": messages, "notifications": notifications}
+
+
+def _notification_event(notification: Notification) -> dict:
+    return {
+        "type": "notification",
+        "notification": {
+            "id": notification.id,
+            "type": notification.type.value if notification.type else None,
+            "title": notification.title,
+            "message": notification.message,
+            "avatar": notification.avatar,
+            "action_url": notification.action_url,
+            "related_id": notification.related_id,
+        }
+    }
+
+
+def _dialect_name(db) -> str:
+    return db.get_bind().dialect.name
+
+
+def _participant_unread_column(conversation: Conversation, user_id: str):
+    return Conversation.user1_unread_count if conversation.user1_id == user_id else Conversation.user2_unread_count
+
+
+async def get_unread_counts(db: AsyncSession, user_id: str) -> Dict[str, int]:
+    """A user's unread message and notification totals (one primary-key read)."""
+    row = (await db.execute(
+        select(UnreadCounter.messages, UnreadCounter.notifications).where(UnreadCounter.user_id == user_id)
+    )).first()
+    return {"messages": row.messages if row else 0, "notifications": row.notifications if row else 0}
+
+
+async def record_message_sent(db: AsyncSession, conversation: Conversation, sender_id: str):
+    """Count a new message as unread for the other participant."""
+    recipient_id = conversation.user2_id if conversation.user1_id == sender_id else conversation.user1_id
+    column = _participant_unread_column(conversation, recipient_id)
+    
+    await db.execute(
+        update(Conversation).where(Conversation.id == conversation.id).values({column: column + 1})
+    )
+    await db.execute(_adjust_counter(_dialect_name(db), recipient_id, messages=1))
+    queue_event(db, [recipient_id], _badge_event(messages=1))
+
+
+async def mark_conversation_read(db: AsyncSession, conversation: Conversation, user_id: str) -> int:
+    """
+    Mark the other participant's messages as read for user_id.
+    
+    Counters are decremented by the number of rows actually changed (not reset
+    to zero), so a message sent concurrently is never lost from the count.
+    
+    Returns:
+        Number of messages marked read
+    """
+    result = await db.execute(update(Message).where(
+        Message.conversation_id == conversation.id,
+        Message.sender_id != user_id,
+        Message.is_read == False
+    ).values(is_read=True))
+    cleared = result.rowcount
+    
+    if cleared:
+        column = _participant_unread_column(conversation, user_id)
+        await db.execute(
+            update(Conversation).where(Conversation.id == conversation.id).values({column: _adjusted(column, -cleared)})
+        )
+        await db.execute(_adjust_counter(_dialect_name(db), user_id, messages=-cleared))
+        queue_event(db, [user_id], _badge_event(messages=-cleared))
+    return cleared
+
+
+async def adjust_notification_unread(db: AsyncSession, user_id: str, delta: int):
+    """Apply a bulk change to a user's unread notifications (UPDATE/DELETE statements bypass the hook)."""
+    if delta:
+        await db.execute(_adjust_counter(_dialect_name(db), user_id, notifications=delta))
+        queue_event(db, [user_id], _badge_event(notifications=delta))
+
+
+@event.listens_for(Session, "after_flush")
+def _count_notification_changes(session, flush_context):
+    # Still pre-flush state here: new/dirty/deleted and attribute history
+    deltas = defaultdict(int)
+    
+    for obj in session.new:
+        if isinstance(obj, Notification):
+            queue_event(session, [obj.user_id], _notification_event(obj))
+            if not obj.read:
+                deltas[obj.user_id] += 1
+    
+    for obj in session.deleted:
+        if isinstance(obj, Notification) and not obj.read:
+            deltas[obj.user_id] -= 1
+    
+    for obj in session.dirty:
+        if not isinstance(obj, Notification):
+            continue
+        history = inspect(obj).attrs.read.history
+        if not history.has_changes():
+            continue
+        was_unread = not (history.deleted[0] if history.deleted else False)
+        if was_unread and obj.read:
+            deltas[obj.user_id] -= 1
+        elif not was_unread and not obj.read:
+            deltas[obj.user_id] += 1
+    
+    if not any(deltas.values()):
+        return
+    
+    connection = session.connection()
+    for user_id, delta in deltas.items():
+        if delta:
+            connection.execute(_adjust_counter(connection.dialect.name, user_id, notifications=delta))
+            queue_event(session, [user_id], _badge_event(notifications=delta))
+
+
+# ==============================================================================
+# REPAIR
+# ==============================================================================
+
+def _try_repair_lock(db: Session) -> bool:
+    """Take the repair lock for this transaction; always granted off Postgres."""
+    if _dialect_name(db) != "postgresql":
+        return True
+    return bool(db.scalar(select(func.pg_try_advisory_xact_lock(_REPAIR_LOCK_KEY))))
+
+
+def repair_unread_counters(db: Session) -> int:
+    """
+    Recompute all counters from messages and notifications, set-wise (two
+    UPDATEs and one INSERT ... SELECT ... ON CONFLICT), writing only rows
+    whose stored count is wrong.
+    
+    Skipped when another worker holds the repair lock. Changes committed
+    while the repair runs may be off by one until the next run.
+    
+    Returns:
+        Number of users whose counters were corrected
+    """
+    if not _try_repair_lock(db):
+        db.rollback()
+        logger.info("Unread counter repair already running in another worker; skipped")
+        return 0
+    
+    def unread_from(participant_id):
+        return select(func.count(Message.id)).where(
+            Message.conversation_id == Conversation.id,
+            Message.sender_id != participant_id,
+            Message.is_read == False
+        ).scalar_subquery()
+    
+    user1_unread = unread_from(Conversation.user1_id)
+    user2_unread = unread_from(Conversation.user2_id)
+    db.execute(
+        update(Conversation).where(
+            Conversation.user1_unread_count.is_distinct_from(user1_unread)
+            | Conversation.user2_unread_count.is_distinct_from(user2_unread)
+        ).values(
+            user1_unread_count=user1_unread,
+            user2_unread_count=user2_unread
+        ).execution_options(synchronize_session=False)
+    )
+    
+    per_user = union_all(
+        select(Conversation.user1_id.label("user_id"), Conversation.user1_unread_count.label("messages"), literal(0).label("notifications")),
+        select(Conversation.user2_id, Conversation.user2_unread_count, literal(0)),
+        select(Notification.user_id, literal(0), func.count(Notification.id)).where(
+            Notification.read == False
+        ).group_by(Notification.user_id),
+    ).subquery()
+    totals = select(
+        per_user.c.user_id.label("user_id"),
+        func.sum(per_user.c.messages).label("messages"),
+        func.sum(per_user.c.notifications).label("notifications")
+    ).group_by(per_user.c.user_id).subquery()
+    # Only users without a counter row or with a wrong one
+    changed = select(totals.c.user_id, totals.c.messages, totals.c.notifications).outerjoin(
+        UnreadCounter, UnreadCounter.user_id == totals.c.user_id
+    ).where(
+        UnreadCounter.user_id.is_(None)
+        | UnreadCounter.messages.is_distinct_from(totals.c.messages)
+        | UnreadCounter.notifications.is_distinct_from(totals.c.notifications)
+    )
+    
+    dialect_insert = postgresql.insert if _dialect_name(db) == "postgresql" else sqlite.insert
+    upsert = dialect_insert(UnreadCounter).from_select(["user_id", "messages", "notifications"], changed)
+    result = db.execute(upsert.on_conflict_do_update(
+        index_elements=[UnreadCounter.user_id],
+        set_={
+            "messages": upsert.excluded.messages,
+            "notifications": upsert.excluded.notifications,
+            "updated_at": func.now(),
+        }
+    ))
+    
+    # Users with nothing unread any more
+    cleared = db.execute(
+        update(UnreadCounter).where(
+            UnreadCounter.user_id.not_in(select(per_user.c.user_id)),
+            (UnreadCounter.messages != 0) | (UnreadCounter.notifications != 0)
+        ).values(messages=0, notifications=0).execution_options(synchronize_session=False)
+    )
+    db.commit()
+    
+    repaired = result.rowcount + cleared.rowcount
+    logger.info(f"Repaired unread counters for {repaired} users")
+    return repaired
+
+
+def repair_if_empty(db: Session) -> int:
+    """Fill the counters on first start (the table is new but messages may not be)."""
+    if db.scalar(select(UnreadCounter.user_id).limit(1)) is not None:
+        return 0
+    return repair_unread_counters(db)
+
+
+def _repair_with_new_session(repair=repair_unread_counters):
+    db = SessionLocal()
+    try:
+        return repair(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+async def run_unread_counter_repair(interval: float = UNREAD_COUNTER_REPAIR_INTERVAL):
+    """
+    Repair loop; started from the app lifespan and cancelled on shutdown.
+    
+    The first full repair waits one interval so restarts (and every worker
+    starting at once) do not each rewrite the counters.
+    """
+    repair = repair_if_empty
+    while True:
+        try:
+            await run_in_threadpool(_repair_with_new_session, repair)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Unread counter repair failed: {e}")
+        
+        repair = repair_unread_counters
+        await asyncio.sleep(interval)
@@ -0,0 +1,160 @@
+"""Benchmark for the lead analytics queries behind the superadmin dashboard.
+
+Usage:
+    python benchmark_lead_analytics.py --database-url postgresql://.../scratch [--sizes 10000,100000,1000000]
+
+Seeds a scratch database with synthetic lead activities in growing volumes
+and times get_lead_analytics_overview / get_monthly_trends at each size,
+recording the peak Python memory of each call (tracemalloc). The aggregations
+run in SQL, so peak memory should stay flat while the row count grows.
+
+Use a throwaway database: the script creates the tables it needs and adds
+benchmark rows without cleaning them up. A SQLite URL works for a quick
+local run (date_trunc is emulated).
+"""
+import os
+import sys
+import time
+import uuid
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, insert, func, select
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.user import User, UserRole
+from app.models.university import University
+from app.models.lead_intelligence import LeadActivity, LeadScore, EventType, LeadCategory
+from app.services.lead_intelligence_service import (
+    SCORE_WEIGHTS, get_lead_analytics_overview, get_monthly_trends
+)
+
+USERS = 1000
+INSERT_BATCH = 10000
+EVENT_CATEGORIES = {
+    EventType.AD_VIEW.value: 'ad',
+    EventType.AD_CLICK.value: 'ad',
+    EventType.ROADMAP_VIEW.value: 'career',
+    EventType.ROADMAP_GENERATE.value: 'career',
+    EventType.MENTOR_CONNECT.value: 'mentor',
+    EventType.POST_LIKE.value: 'feed',
+    EventType.POST_COMMENT.value: 'feed',
+    EventType.POST_SHARE.value: 'feed',
+}
+
+
+def _sqlite_date_trunc(unit, value):
+    if value is None:
+        return None
+    return value[:7] + "-01 00:00:00" if unit == 'month' else value
+
+
+def create_benchmark_engine(database_url: str):
+    engine = create_engine(database_url)
+    if engine.dialect.name == "sqlite":
+        @event.listens_for(engine, "connect")
+        def register_functions(dbapi_connection, connection_record):
+            dbapi_connection.create_function("date_trunc", 2, _sqlite_date_trunc)
+    return engine
+
+
+def seed(db, university_id: str, user_ids, count: int):
+    """Add `count` activities spread over the last year."""
+    now = datetime.utcnow()
+    event_types = list(EVENT_CATEGORIES)
+    remaining = count
+    while remaining > 0:
+        batch = min(INSERT_BATCH, remaining)
+        db.execute(insert(LeadActivity), [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": random.choice(user_ids),
+                "university_id": university_id,
+                "event_type": event_type,
+                "event_category": EVENT_CATEGORIES[event_type],
+                "base_score": SCORE_WEIGHTS.get(event_type, 0),
+                "created_at": now - timedelta(seconds=random.randint(0, 365 * 24 * 3600)),
+            }
+            for event_type in random.choices(event_types, k=batch)
+        ])
+        db.commit()
+        remaining -= batch
+
+
+def measure(fn):
+    """(seconds, peak bytes allocated) of one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run_benchmark(database_url: str, sizes):
+    engine = create_benchmark_engine(database_url)
+    Base.metadata.create_all(bind=engine, tables=[
+        University.__table__, User.__table__, LeadActivity.__table__, LeadScore.__table__
+    ])
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    
+    university = University(id=str(uuid.uuid4()), name=f"Benchmark University {uuid.uuid4().hex[:8]}")
+    db.add(university)
+    db.flush()
+    user_ids = [str(uuid.uuid4()) for _ in range(USERS)]
+    db.execute(insert(User), [
+        {
+            "id": user_id,
+            "email": f"bench-{user_id}@example.com",
+            "hashed_password": "-",
+            "name": "Benchmark Alumni",
+            "university_id": university.id,
+            "role": UserRole.ALUMNI,
+        }
+        for user_id in user_ids
+    ])
+    categories = [LeadCategory.HOT.value, LeadCategory.WARM.value, LeadCategory.COLD.value]
+    db.execute(insert(LeadScore), [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "university_id": university.id,
+            "overall_score": random.uniform(0, 100),
+            "lead_category": random.choice(categories),
+            "mentor_engagement_score": random.uniform(0, 100),
+        }
+        for user_id in user_ids
+    ])
+    db.commit()
+    
+    print(f"{'activities':>12} {'overview s':>11} {'overview peak':>14} {'trends s':>9} {'trends peak':>12}")
+    seeded = 0
+    for size in sorted(sizes):
+        seed(db, university.id, user_ids, size - seeded)
+        seeded = size
+        total = db.scalar(select(func.count(LeadActivity.id)).where(LeadActivity.university_id == university.id))
+        
+        overview_time, overview_peak = measure(lambda: get_lead_analytics_overview(db, university.id))
+        trends_time, trends_peak = measure(lambda: get_monthly_trends(db, university.id))
+        print(
+            f"{total:>12} {overview_time:>11.3f} {overview_peak / 1024:>11.0f} KB"
+            f" {trends_time:>9.3f} {trends_peak / 1024:>9.0f} KB"
+        )
+    
+    db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark lead analytics queries against growing activity volumes")
+    parser.add_argument("--database-url", required=True, help="Scratch database to seed (not production)")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma-separated activity counts")
+    args = parser.parse_args()
+    
+    run_benchmark(args.database_url, [int(size) for size in args.sizes.split(",")])
@@ -0,0 +1,95 @@
+"""Migration script to move base64 Media rows out of Postgres into a media storage backend.
+
+Usage:
+    python migrate_media.py [--backend local|s3] [--batch-size 20] [--limit N]
+
+Rows are processed in batches ordered by id; each batch loads only its own
+file_data, writes the raw bytes to the storage backend, then records the
+storage key and clears file_data in one transaction. The script can be
+stopped and re-run at any time: migrated rows are skipped.
+
+file_data is cleared once a file is stored, so the target must be durable:
+the local backend is refused unless MEDIA_STORAGE_PATH points at a
+persistent disk (set it explicitly), and S3 is the usual choice.
+"""
+import os
+import io
+import sys
+import base64
+import argparse
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select, text
+from app.core.database import SessionLocal, engine
+from app.models.media import Media
+from app.services.media_storage import (
+    get_media_storage, media_storage_key, MEDIA_STORAGE_BACKEND, MediaStorageNotConfigured
+)
+
+
+def migrate_media(backend: str = MEDIA_STORAGE_BACKEND, batch_size: int = 20, limit: int = None):
+    """Move legacy base64 media files into the storage backend, batch by batch."""
+    storage = get_media_storage(backend)
+    print(f"Starting media migration to '{storage.name}' storage (batch size {batch_size})...")
+    
+    migrated = 0
+    failed = 0
+    last_id = ""
+    
+    while limit is None or migrated + failed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - migrated - failed)
+        db = SessionLocal()
+        try:
+            batch = db.execute(
+                select(Media.id, Media.content_type, Media.file_data)
+                .where(Media.storage_backend.is_(None), Media.id > last_id)
+                .order_by(Media.id)
+                .limit(size)
+            ).all()
+            if not batch:
+                break
+            
+            for media_id, content_type, file_data in batch:
+                last_id = media_id
+                key = media_storage_key(media_id)
+                try:
+                    content = base64.b64decode(file_data or "")
+                    stored_size, etag = storage.save(key, io.BytesIO(content), content_type)
+                    db.execute(
+                        Media.__table__.update()
+                        .where(Media.id == media_id)
+                        .values(storage_backend=storage.name, storage_key=key, etag=etag,
+                                file_size=stored_size, file_data=None)
+                    )
+                    migrated += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"  ! Could not migrate media {media_id}: {e}")
+            
+            db.commit()
+            print(f"  = Migrated {migrated} files so far ({failed} failed)")
+        finally:
+            db.close()
+    
+    print(f"Migration completed! {migrated} files moved, {failed} failed.")
+    if migrated and engine.dialect.name == "postgresql":
+        # Make the space of the cleared base64 values reusable
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM ANALYZE media"))
+        print("  = Vacuumed media table")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move base64 Media rows into a media storage backend")
+    parser.add_argument("--backend", default=MEDIA_STORAGE_BACKEND, help="Storage backend: local or s3")
+    parser.add_argument("--batch-size", type=int, default=20, help="Rows per transaction")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many rows")
+    args = parser.parse_args()
+    
+    try:
+        migrate_media(args.backend, args.batch_size, args.limit)
+    except MediaStorageNotConfigured as e:
+        print(f"Refusing to migrate: {e}")
+        sys.exit(1)
@@ -94,10 +94,13 @@ const UniversityChatbot = () => {
   // Call the actual Knowledge Base API
   const fetchKnowledgeBaseAnswer = async (question: string): Promise<{ answer: string; sources: string[] }> => {
     try {
+      // Send the token when logged in so the answer comes from the user's university
+      const token = localStorage.getItem('auth_token');
       const response = await fetch(`${API_BASE_URL}/chat/query`, {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
         },
         body: JSON.stringify({ question }),
       });